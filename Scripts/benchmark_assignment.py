@@ -0,0 +1,87 @@
+# benchmark_assignment.py
+"""
+Measures automatic technician assignment throughput (api/assignment.py).
+
+Runs against a throwaway test database, so it never touches db.sqlite3:
+    python Scripts/benchmark_assignment.py --technicians 300 --reports 5000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+import django
+
+# --- CRUCIAL DJANGO SETUP ---
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'urja_setu_backend.settings')
+django.setup()
+# -----------------------------
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import connection
+from api.assignment import auto_assign_reports, load_technicians, plan_assignments, unassigned_reports
+from api.models import Profile, Report
+
+# Rough bounding box around Gujarat.
+LAT_RANGE, LNG_RANGE = (20.1, 24.7), (68.2, 74.5)
+CLASSIFICATIONS = ['Transformer', 'Electric Pole', 'Fallen Line', 'Vegetation Overgrowth', 'Unclassified']
+SPECIALIZATIONS = ['Line Repair', 'Transformer Maintenance', 'Pole Replacement', 'Tree Trimming', 'Emergency Response']
+
+def seed(num_technicians, num_reports, rng):
+    password = make_password('Password123')
+    citizen = User.objects.create(username='bench-citizen@example.com', email='bench-citizen@example.com', password=password)
+    Profile.objects.create(user=citizen, role='citizen')
+    techs = User.objects.bulk_create([
+        User(username=f'bench-tech{i}@example.com', email=f'bench-tech{i}@example.com', password=password)
+        for i in range(num_technicians)
+    ])
+    Profile.objects.bulk_create([
+        Profile(
+            user=tech, role='technician', specialization=rng.choice(SPECIALIZATIONS),
+            base_latitude=round(rng.uniform(*LAT_RANGE), 6), base_longitude=round(rng.uniform(*LNG_RANGE), 6),
+        ) for tech in techs
+    ])
+    Report.objects.bulk_create([
+        Report(
+            citizen=citizen, status='Received', latitude=round(rng.uniform(*LAT_RANGE), 6),
+            longitude=round(rng.uniform(*LNG_RANGE), 6), ai_classification=rng.choice(CLASSIFICATIONS),
+            ai_priority=rng.choice(['High', 'Medium', 'Low']),
+        ) for _ in range(num_reports)
+    ], batch_size=1000)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--technicians', type=int, default=300)
+    parser.add_argument('--reports', type=int, default=5000)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        seed(args.technicians, args.reports, random.Random(args.seed))
+        # Room for every report, so the benchmark measures scoring rather than saturation.
+        from django.conf import settings
+        settings.AUTO_ASSIGN_MAX_OPEN_REPORTS = args.reports
+
+        rows = list(unassigned_reports().values_list('id', 'latitude', 'longitude', 'ai_classification'))
+        start = time.perf_counter()
+        plan_assignments(rows, load_technicians())
+        plan_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        plan = auto_assign_reports(unassigned_reports())
+        total_seconds = time.perf_counter() - start
+        assigned = sum(1 for _, tech_id, _ in plan if tech_id)
+
+        print(f"Technicians: {args.technicians}, reports: {args.reports}")
+        print(f"Scoring only:      {plan_seconds:8.3f}s  ({args.reports / plan_seconds:10.0f} reports/s)")
+        print(f"End-to-end (DB):   {total_seconds:8.3f}s  ({assigned / total_seconds:10.0f} reports/s, {assigned} assigned)")
+        print(f"Projected hourly capacity: {assigned / total_seconds * 3600:,.0f} reports/hour")
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+if __name__ == '__main__':
+    main()
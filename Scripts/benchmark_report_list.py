@@ -0,0 +1,85 @@
+# benchmark_report_list.py
+"""
+Measures ReportListView at scale: query + serialisation time, JSON rendering
+with DRF's JSONRenderer vs the orjson FastJSONRenderer (api/renderers.py), and
+bytes on the wire with gzip and brotli (api/compression.py).
+
+Runs against a throwaway test database seeded by `seed_data`, so it never
+touches db.sqlite3:
+    python Scripts/benchmark_report_list.py --reports 10000
+"""
+import argparse
+import gzip
+import io
+import os
+import sys
+import time
+
+import django
+
+# --- CRUCIAL DJANGO SETUP ---
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'urja_setu_backend.settings')
+django.setup()
+# -----------------------------
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory, force_authenticate
+from api.compression import brotli
+from api.renderers import FastJSONRenderer, orjson
+from api.views import ReportListView
+
+def best_of(repeat, func):
+    """(fastest seconds, result) over `repeat` runs."""
+    best, result = None, None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--reports', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        call_command('seed_data', citizens=1000, technicians=100, admins=1, reports=args.reports, suggestions=0, images=0, seed=args.seed, stdout=io.StringIO())
+        admin = User.objects.get(username='admin0@seed.urjasetu.test')
+        factory, view = APIRequestFactory(), ReportListView.as_view()
+
+        def list_reports():
+            request = factory.get('/api/reports/')
+            force_authenticate(request, user=admin)
+            return view(request).data
+        serialise_seconds, data = best_of(args.repeat, list_reports)
+        print(f"ReportListView, {len(data)} reports (best of {args.repeat})")
+        print(f"Query + serialise:        {serialise_seconds * 1000:9.1f} ms")
+
+        renderers = [('DRF JSONRenderer', JSONRenderer())]
+        if orjson is not None: renderers.append(('FastJSONRenderer (orjson)', FastJSONRenderer()))
+        else: print("orjson is not installed; FastJSONRenderer would fall back to JSONRenderer.")
+        for label, renderer in renderers:
+            seconds, body = best_of(args.repeat, lambda: renderer.render(data, 'application/json', {}))
+            print(f"Render, {label:<27}{seconds * 1000:9.1f} ms  {len(body) / 1024:10.1f} KiB")
+
+        print("\nBytes on the wire:")
+        print(f"  identity                {len(body) / 1024:10.1f} KiB")
+        encoders = [(f'gzip -{level}', lambda level=level: gzip.compress(body, compresslevel=level, mtime=0)) for level in (1, 6, 9)]
+        if brotli is not None: encoders += [(f'br q{quality}', lambda quality=quality: brotli.compress(body, quality=quality)) for quality in (1, 5, 11)]
+        else: print("  (brotli is not installed; br skipped)")
+        for label, encode in encoders:
+            seconds, compressed = best_of(args.repeat, encode)
+            print(f"  {label:<22}{len(compressed) / 1024:10.1f} KiB  ({len(compressed) / len(body):6.1%})  {seconds * 1000:8.1f} ms")
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+# benchmark_sqlite_concurrency.py
+"""
+Measures SQLite read and write throughput with concurrent worker processes,
+with the connection tuning (the pragmas from api/db.py and the OPTIONS in
+settings.DATABASES) disabled ("before") and enabled ("after"). Each phase uses a fresh temporary database file, never db.sqlite3:
+    python Scripts/benchmark_sqlite_concurrency.py --readers 4 --writers 2 --seconds 10
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def _setup_django(env):
+    # --- CRUCIAL DJANGO SETUP ---
+    sys.path.insert(0, ROOT)
+    os.environ.update(env)
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'urja_setu_backend.settings')
+    import django
+    django.setup()
+    if env['SQLITE_PRAGMAS_ENABLED'] == 'False':
+        # The baseline connection as originally configured: no OPTIONS, so no IMMEDIATE
+        # transactions and the driver's default lock timeout.
+        from django.db import connections
+        connections['default'].settings_dict['OPTIONS'] = {}
+
+def _prepare(env, seed_reports):
+    _setup_django(env)
+    from django.contrib.auth.models import User
+    from django.core.management import call_command
+    from api.models import Profile, Report
+    call_command('migrate', verbosity=0)
+    citizen = User.objects.create_user('bench@example.com', 'bench@example.com', 'Password123')
+    Profile.objects.create(user=citizen, role='citizen')
+    Report.objects.bulk_create([Report(citizen=citizen, latitude=23.02, longitude=72.57, description='seed') for _ in range(seed_reports)], batch_size=1000)
+
+def _worker(role, env, seconds, results):
+    _setup_django(env)
+    from django.contrib.auth.models import User
+    from django.db import OperationalError, transaction
+    from api.models import Report
+    citizen = User.objects.get(username='bench@example.com')
+    ops = errors = 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        try:
+            if role == 'reader':
+                list(Report.objects.order_by('-created_at').values('id', 'status', 'created_at')[:50])
+            else:
+                with transaction.atomic():
+                    report = Report.objects.create(citizen=citizen, latitude=23.02, longitude=72.57, description='bench')
+                    Report.objects.filter(pk=report.pk).update(status='Received')
+            ops += 1
+        except OperationalError:
+            errors += 1
+    results.put((role, ops, errors))
+
+def run_phase(label, pragmas_enabled, args):
+    ctx = multiprocessing.get_context('spawn')
+    db_path = os.path.join(tempfile.mkdtemp(), 'bench.sqlite3')
+    env = {'SQLITE_PATH': db_path, 'SQLITE_PRAGMAS_ENABLED': str(pragmas_enabled), 'EMAIL_OUTBOX_SENDER_THREAD': 'False'}
+    setup = ctx.Process(target=_prepare, args=(env, args.seed_reports))
+    setup.start(); setup.join()
+
+    results = ctx.Queue()
+    workers = [ctx.Process(target=_worker, args=('reader', env, args.seconds, results)) for _ in range(args.readers)]
+    workers += [ctx.Process(target=_worker, args=('writer', env, args.seconds, results)) for _ in range(args.writers)]
+    for worker in workers: worker.start()
+    totals = {'reader': [0, 0], 'writer': [0, 0]}
+    for _ in workers:
+        role, ops, errors = results.get()
+        totals[role][0] += ops
+        totals[role][1] += errors
+    for worker in workers: worker.join()
+
+    print(f"{label:<8} reads/s: {totals['reader'][0] / args.seconds:9.1f}   writes/s: {totals['writer'][0] / args.seconds:8.1f}   "
+          f"locked errors: {totals['reader'][1] + totals['writer'][1]}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--readers', type=int, default=4)
+    parser.add_argument('--writers', type=int, default=2)
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--seed-reports', type=int, default=5000)
+    args = parser.parse_args()
+    print(f"{args.readers} reader and {args.writers} writer processes, {args.seconds}s per phase")
+    run_phase('before', False, args)
+    run_phase('after', True, args)
+
+if __name__ == '__main__':
+    main()
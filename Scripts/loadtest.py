@@ -0,0 +1,281 @@
+# loadtest.py
+r"""
+HTTP load test for a running server (runserver or gunicorn), using the
+accounts created by `manage.py seed_data`. Virtual users log in as citizens,
+technicians and admins and loop through weighted request mixes until the
+time is up. Throughput, errors and p50/p95/p99 latency are printed per route
+and written to a JSON file, so runs on different commits can be compared:
+    python manage.py seed_data --reports 20000
+    python Scripts/loadtest.py --base-url http://127.0.0.1:8000 --seconds 60 --output before.json
+    python Scripts/loadtest.py --seconds 60 --output after.json --compare before.json
+Report and suggestion creation are rate limited per user (30 and 20 an hour by
+default), which a closed-loop run uses up within seconds; from then on those
+routes only measure 429s. Start the server under test with load-run limits:
+    THROTTLE_REPORT_CREATE=100000/minute THROTTLE_REPORT_CREATE_GLOBAL=100000/minute \
+    THROTTLE_SUGGESTION_CREATE=100000/minute THROTTLE_SUGGESTION_CREATE_GLOBAL=100000/minute \
+    python manage.py runserver --noreload
+The AI backlog backpressure (AI_BACKLOG_* settings) can still answer 429 on
+reports/create/; that is the behaviour under test, not a limit to lift.
+Only the standard library and Pillow are needed.
+"""
+import argparse
+import io
+import json
+import math
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+from collections import defaultdict
+from datetime import datetime, timezone
+
+from PIL import Image
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SEED_DOMAIN = 'seed.urjasetu.test' # Matches api/management/commands/seed_data.py
+PERCENTILES = [50, 95, 99]
+
+# ================================================================
+# HTTP CLIENT
+# ================================================================
+
+class Stats:
+    """Latencies (ms), status codes and bytes per route label, shared by all virtual users."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.statuses = defaultdict(lambda: defaultdict(int))
+        self.bytes = defaultdict(int)
+
+    def record(self, route, ms, status, size):
+        with self.lock:
+            self.latencies[route].append(ms)
+            self.statuses[route][status] += 1
+            self.bytes[route] += size
+
+def _multipart(fields, files):
+    boundary = uuid.uuid4().hex
+    body = io.BytesIO()
+    for name, value in fields.items():
+        body.write(f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode())
+    for name, (filename, content, content_type) in files.items():
+        body.write(f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"; filename="{filename}"\r\nContent-Type: {content_type}\r\n\r\n'.encode())
+        body.write(content)
+        body.write(b'\r\n')
+    body.write(f'--{boundary}--\r\n'.encode())
+    return body.getvalue(), f'multipart/form-data; boundary={boundary}'
+
+class Client:
+    def __init__(self, base_url, stats, timeout):
+        self.base_url, self.stats, self.timeout = base_url.rstrip('/'), stats, timeout
+        self.token = None
+
+    def request(self, route, method, path, json_body=None, fields=None, files=None):
+        """Sends one request and records it under `route`. Returns (status, body bytes)."""
+        headers, data = {'Accept': 'application/json'}, None
+        if self.token: headers['Authorization'] = f'Token {self.token}'
+        if json_body is not None:
+            data, headers['Content-Type'] = json.dumps(json_body).encode(), 'application/json'
+        elif fields is not None or files:
+            data, headers['Content-Type'] = _multipart(fields or {}, files or {})
+        req = urllib.request.Request(f'{self.base_url}{path}', data=data, headers=headers, method=method)
+        started = time.perf_counter()
+        try:
+            with urllib.request.urlopen(req, timeout=self.timeout) as response:
+                status, body = response.status, response.read()
+        except urllib.error.HTTPError as error:
+            status, body = error.code, error.read()
+        except (urllib.error.URLError, OSError):
+            status, body = 0, b'' # Connection refused, reset or timed out
+        self.stats.record(route, (time.perf_counter() - started) * 1000, status, len(body))
+        return status, body
+
+    def json(self, route, method, path, **kwargs):
+        status, body = self.request(route, method, path, **kwargs)
+        try: return status, json.loads(body) if body else None
+        except ValueError: return status, None
+
+    def login(self, email, password):
+        status, data = self.json('POST auth/login/', 'POST', '/api/auth/login/', json_body={'email': email, 'password': password})
+        if status != 200: raise RuntimeError(f"Login failed for {email} (HTTP {status}).")
+        self.token = data['token']
+
+def _photo(rng):
+    """A small random JPEG; each one differs so duplicate detection does not short-circuit the analysis."""
+    img = Image.new('RGB', (320, 240), tuple(rng.randrange(256) for _ in range(3)))
+    img.putdata([tuple(rng.randrange(256) for _ in range(3)) for _ in range(320 * 240)])
+    buffer = io.BytesIO()
+    img.save(buffer, 'JPEG', quality=70)
+    return buffer.getvalue()
+
+# ================================================================
+# REQUEST MIXES
+# ================================================================
+# Each action takes (client, rng, state) where `state` is the virtual user's own scratch dict.
+
+def _items(data):
+    return data.get('results', []) if isinstance(data, dict) else (data or [])
+
+def citizen_create_report(client, rng, state):
+    fields = {'category': rng.choice(['Safety Hazard', 'Maintenance', 'Other']), 'description': 'Load test: wires hanging low near the market.',
+              'latitude': f'{rng.uniform(21.0, 23.5):.6f}', 'longitude': f'{rng.uniform(70.0, 73.2):.6f}', 'address': 'Load test'}
+    status, data = client.json('POST reports/create/', 'POST', '/api/reports/create/', fields=fields, files={'image': ('photo.jpg', _photo(rng), 'image/jpeg')})
+    if status == 201 and data: state.setdefault('reports', []).append(data.get('id'))
+
+def citizen_my_reports(client, rng, state):
+    client.request('GET reports/my-reports/', 'GET', '/api/reports/my-reports/')
+
+def citizen_report_detail(client, rng, state):
+    reports = [pk for pk in state.get('reports', []) if pk]
+    if reports: client.request('GET reports/<pk>/', 'GET', f'/api/reports/{rng.choice(reports)}/')
+    else: citizen_my_reports(client, rng, state)
+
+def citizen_create_suggestion(client, rng, state):
+    client.request('POST suggestions/create/', 'POST', '/api/suggestions/create/', json_body={'suggestion_text': 'Load test: send SMS alerts before planned power cuts.'})
+
+def technician_assigned(client, rng, state):
+    status, data = client.json('GET reports/assigned/', 'GET', '/api/reports/assigned/')
+    if status == 200: state['assigned'] = [report['id'] for report in _items(data)]
+
+def technician_add_remark(client, rng, state):
+    if 'assigned' not in state: technician_assigned(client, rng, state)
+    if state['assigned']:
+        client.request('POST reports/<pk>/remarks/', 'POST', f"/api/reports/{rng.choice(state['assigned'])}/remarks/", fields={'remark': 'Load test: site inspected.'})
+
+def technician_report_detail(client, rng, state):
+    if 'assigned' not in state: technician_assigned(client, rng, state)
+    if state['assigned']: client.request('GET reports/<pk>/', 'GET', f"/api/reports/{rng.choice(state['assigned'])}/")
+
+def admin_dashboard(client, rng, state):
+    client.request('GET stats/dashboard/', 'GET', '/api/stats/dashboard/')
+
+def admin_report_list(client, rng, state):
+    client.request('GET reports/', 'GET', '/api/reports/')
+
+def admin_search(client, rng, state):
+    status, data = client.json('GET reports/search/', 'GET', f"/api/reports/search/?q={rng.choice(['transformer', 'pole', 'wires', 'streetlight', 'sparks'])}")
+    if status == 200: state['found'] = [report['id'] for report in _items(data)]
+
+def admin_download_pdf(client, rng, state):
+    if not state.get('found'): admin_search(client, rng, state)
+    if state.get('found'): client.request('GET admin/reports/<pk>/download/', 'GET', f"/api/admin/reports/{rng.choice(state['found'])}/download/")
+
+def admin_incidents(client, rng, state):
+    client.request('GET incidents/', 'GET', '/api/incidents/')
+
+# Routes behind the per-user create throttles (THROTTLE_* settings).
+THROTTLED_ROUTES = ['POST reports/create/', 'POST suggestions/create/']
+
+# (action, weight) per role
+MIXES = {
+    'citizen': [(citizen_create_report, 2), (citizen_my_reports, 6), (citizen_report_detail, 3), (citizen_create_suggestion, 1)],
+    'technician': [(technician_assigned, 6), (technician_report_detail, 3), (technician_add_remark, 2)],
+    'admin': [(admin_dashboard, 4), (admin_search, 3), (admin_report_list, 1), (admin_download_pdf, 1), (admin_incidents, 1)],
+}
+
+def virtual_user(role, index, args, stats, deadline, errors):
+    rng = random.Random(f'{args.seed}-{role}-{index}')
+    client = Client(args.base_url, stats, args.timeout)
+    try: client.login(f'{role}{index}@{SEED_DOMAIN}', args.password)
+    except RuntimeError as error:
+        errors.append(str(error))
+        return
+    actions, weights = zip(*MIXES[role])
+    state = {}
+    while time.perf_counter() < deadline:
+        rng.choices(actions, weights)[0](client, rng, state)
+        if args.think_ms: time.sleep(rng.uniform(0, 2 * args.think_ms) / 1000)
+
+# ================================================================
+# RESULTS
+# ================================================================
+
+def percentile(sorted_values, q):
+    """Nearest-rank percentile of an already sorted list."""
+    return sorted_values[max(math.ceil(q / 100 * len(sorted_values)) - 1, 0)]
+
+def summarise(stats, elapsed):
+    routes = {}
+    for route, latencies in sorted(stats.latencies.items()):
+        values = sorted(latencies)
+        statuses = dict(stats.statuses[route])
+        routes[route] = {
+            'requests': len(values),
+            'errors': sum(count for code, count in statuses.items() if code == 0 or code >= 400),
+            'rps': round(len(values) / elapsed, 2),
+            'mean_ms': round(sum(values) / len(values), 1),
+            **{f'p{q}_ms': round(percentile(values, q), 1) for q in PERCENTILES},
+            'max_ms': round(values[-1], 1),
+            'mean_bytes': round(stats.bytes[route] / len(values)),
+            'statuses': {str(code): count for code, count in sorted(statuses.items())},
+        }
+    return routes
+
+def _git_commit():
+    try: return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError): return None
+
+def print_table(routes, baseline=None):
+    header = f"{'route':<34}{'reqs':>7}{'err':>6}{'rps':>8}{'p50':>9}{'p95':>9}{'p99':>9}"
+    print(header + ('   p95 vs baseline' if baseline else ''))
+    for route, row in routes.items():
+        line = f"{route:<34}{row['requests']:>7}{row['errors']:>6}{row['rps']:>8.1f}{row['p50_ms']:>9.1f}{row['p95_ms']:>9.1f}{row['p99_ms']:>9.1f}"
+        before = (baseline or {}).get(route)
+        if before: line += f"   {before['p95_ms']:.1f} -> {row['p95_ms']:.1f} ms ({(row['p95_ms'] - before['p95_ms']) / before['p95_ms'] * 100:+.0f}%)"
+        print(line)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--base-url', default='http://127.0.0.1:8000')
+    parser.add_argument('--seconds', type=float, default=30)
+    parser.add_argument('--citizens', type=int, default=8, help="Concurrent citizen users (citizen0..N-1@ seeded accounts).")
+    parser.add_argument('--technicians', type=int, default=4)
+    parser.add_argument('--admins', type=int, default=1)
+    parser.add_argument('--password', default='Password123')
+    parser.add_argument('--think-ms', type=float, default=0, help="Mean pause between a user's requests (0 = closed loop).")
+    parser.add_argument('--timeout', type=float, default=60)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--output', default=None, help="JSON results file (default: loadtest-<commit>-<time>.json).")
+    parser.add_argument('--compare', default=None, help="Earlier results file to compare p95 latency against.")
+    args = parser.parse_args()
+
+    stats, errors = Stats(), []
+    deadline = time.perf_counter() + args.seconds
+    users = [threading.Thread(target=virtual_user, args=(role, i, args, stats, deadline, errors), daemon=True)
+             for role in MIXES for i in range(getattr(args, f'{role}s'))]
+    print(f"{len(users)} virtual users against {args.base_url} for {args.seconds}s")
+    started = time.perf_counter()
+    for user in users: user.start()
+    for user in users: user.join()
+    elapsed = time.perf_counter() - started
+    for error in errors: print(error, file=sys.stderr)
+
+    routes = summarise(stats, elapsed)
+    total = sum(row['requests'] for row in routes.values())
+    commit = _git_commit()
+    result = {
+        'commit': commit, 'started_at': datetime.now(timezone.utc).isoformat(), 'base_url': args.base_url,
+        'seconds': round(elapsed, 2), 'users': {role: getattr(args, f'{role}s') for role in MIXES}, 'think_ms': args.think_ms,
+        'requests': total, 'rps': round(total / elapsed, 2), 'login_errors': len(errors), 'routes': routes,
+    }
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f: baseline = json.load(f)['routes']
+    print_table(routes, baseline)
+    print(f"Total: {total} requests, {result['rps']:.1f} req/s")
+    for route in THROTTLED_ROUTES:
+        throttled = routes.get(route, {}).get('statuses', {}).get('429', 0)
+        if throttled: print(f"{route}: {throttled} of {routes[route]['requests']} requests got 429; see the throttle overrides in this script's docstring.", file=sys.stderr)
+
+    output = args.output or f"loadtest-{commit or 'nogit'}-{datetime.now():%Y%m%dT%H%M%S}.json"
+    with open(output, 'w') as f: json.dump(result, f, indent=2)
+    print(f"Results written to {output}")
+
+if __name__ == '__main__':
+    main()
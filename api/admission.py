@@ -0,0 +1,146 @@
+# api/admission.py
+from datetime import timedelta
+from types import SimpleNamespace
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Avg
+from django.utils import timezone
+from rest_framework.throttling import BaseThrottle, ScopedRateThrottle, SimpleRateThrottle
+
+from .clustering import claim_duplicates, stranded_duplicates
+from .metrics import REPORT_ADMISSIONS
+from .models import Report, ReportAnalysisTiming
+
+ACCEPT, DEFER, REJECT = 'accept', 'defer', 'reject'
+BACKLOG_CACHE_KEY = 'admission:analysis-backlog'
+
+# ================================================================
+# RATE LIMITS
+# ================================================================
+
+class GlobalScopedRateThrottle(ScopedRateThrottle):
+    """
+    Like ScopedRateThrottle, but one bucket shared by every client, at the
+    '<throttle_scope>_global' rate. Counts live in the default cache, so with
+    several worker processes set a shared CACHES backend for a true global limit.
+    """
+
+    def allow_request(self, request, view):
+        scope = getattr(view, self.scope_attr, None)
+        if not scope: return True
+        self.scope = f'{scope}_global'
+        self.rate = self.get_rate()
+        self.num_requests, self.duration = self.parse_rate(self.rate)
+        return SimpleRateThrottle.allow_request(self, request, view)
+
+    def get_cache_key(self, request, view):
+        return self.cache_format % {'scope': self.scope, 'ident': 'all'}
+
+# ================================================================
+# ANALYSIS BACKPRESSURE
+# ================================================================
+
+def awaiting_analysis():
+    """
+    Reports that are actually waiting for the AI workers: Pending Analysis with
+    an image (imageless reports are never analysed), and queued within the last
+    AI_BACKLOG_QUEUED_WINDOW_SECONDS. Older rows were orphaned by a restart or
+    are duplicates waiting on their primary; counting them would hold the
+    service in backpressure for good.
+    """
+    since = timezone.now() - timedelta(seconds=settings.AI_BACKLOG_QUEUED_WINDOW_SECONDS)
+    return Report.objects.filter(status='Pending Analysis', image__isnull=False, updated_at__gte=since).exclude(image='')
+
+def analysis_backlog(fresh=False):
+    """
+    {'queued', 'deferred', 'lag_seconds'}: reports queued for analysis (see
+    awaiting_analysis) or deferred, and the mean queue wait of analysis runs
+    finished in the last AI_BACKLOG_WINDOW_SECONDS. Lag is measured on finished
+    runs (their sojourn time) rather than on the oldest waiting report, for the
+    same reason. Cached for AI_BACKLOG_CACHE_SECONDS to keep it off the hot path.
+    """
+    backlog = None if fresh else cache.get(BACKLOG_CACHE_KEY)
+    if backlog is None:
+        queued = awaiting_analysis().filter(analysis_deferred=False).count()
+        deferred = Report.objects.filter(status='Pending Analysis', analysis_deferred=True, image__isnull=False).exclude(image='').count()
+        since = timezone.now() - timedelta(seconds=settings.AI_BACKLOG_WINDOW_SECONDS)
+        wait_ms = ReportAnalysisTiming.objects.filter(finished_at__gte=since).aggregate(wait=Avg('queue_wait_ms'))['wait']
+        backlog = {'queued': queued, 'deferred': deferred, 'lag_seconds': (wait_ms or 0.0) / 1000}
+        cache.set(BACKLOG_CACHE_KEY, backlog, settings.AI_BACKLOG_CACHE_SECONDS)
+    return backlog
+
+def _over(value, limit):
+    return bool(limit) and value >= limit
+
+def workers_behind(backlog):
+    """True while too many reports are queued, or queued reports wait too long."""
+    return _over(backlog['queued'], settings.AI_BACKLOG_DEFER_DEPTH) or _over(backlog['lag_seconds'], settings.AI_BACKLOG_DEFER_SECONDS)
+
+def admission_decision():
+    """
+    (decision, retry_after_seconds) for a new report: ACCEPT queues analysis now,
+    DEFER stores the report but leaves analysis for later, REJECT answers 429.
+    A threshold of 0 disables that check.
+    """
+    backlog = analysis_backlog()
+    if _over(backlog['queued'] + backlog['deferred'], settings.AI_BACKLOG_REJECT_DEPTH) or _over(backlog['lag_seconds'], settings.AI_BACKLOG_REJECT_SECONDS):
+        return REJECT, settings.AI_BACKLOG_RETRY_AFTER_SECONDS
+    if workers_behind(backlog): return DEFER, None
+    return ACCEPT, None
+
+class AnalysisBacklogThrottle(BaseThrottle):
+    """Turns new reports away with 429 and Retry-After while the analysis backlog is past the reject thresholds."""
+
+    def allow_request(self, request, view):
+        if request.method != 'POST': return True
+        decision, self.retry_after = admission_decision()
+        if decision == REJECT: REPORT_ADMISSIONS.inc(REJECT)
+        return decision != REJECT
+
+    def wait(self):
+        return self.retry_after
+
+REPORT_CREATE_THROTTLES = [ScopedRateThrottle, GlobalScopedRateThrottle, AnalysisBacklogThrottle]
+
+def throttle_wait(user, remote_addr, scope, throttle_classes=REPORT_CREATE_THROTTLES):
+    """
+    Applies DRF throttles outside a DRF view (the ASGI upload endpoint).
+    Returns None if the request may proceed, else the seconds to wait.
+    """
+    request = SimpleNamespace(user=user, method='POST', META={'REMOTE_ADDR': remote_addr})
+    view = SimpleNamespace(throttle_scope=scope)
+    waits = [throttle.wait() for throttle in (cls() for cls in throttle_classes) if not throttle.allow_request(request, view)]
+    return max((wait or 0 for wait in waits), default=0) if waits else None
+
+def queue_or_defer(report_id):
+    """Queues analysis for a new report, or marks it deferred while the AI workers are behind."""
+    from .tasks import enqueue_analysis
+
+    decision, _ = admission_decision()
+    if decision == DEFER:
+        Report.objects.filter(pk=report_id).update(analysis_deferred=True)
+    else:
+        enqueue_analysis(report_id)
+    REPORT_ADMISSIONS.inc(DEFER if decision == DEFER else ACCEPT)
+
+def claim_deferred(limit):
+    """Clears the deferred flag on up to `limit` of the oldest deferred reports and returns their ids."""
+    candidates = Report.objects.filter(status='Pending Analysis', analysis_deferred=True).order_by('created_at').values_list('id', flat=True)[:limit]
+    # One conditional update per id, so two processes never claim the same report.
+    # updated_at marks when it was queued (see awaiting_analysis).
+    now = timezone.now()
+    return [pk for pk in candidates if Report.objects.filter(pk=pk, analysis_deferred=True).update(analysis_deferred=False, updated_at=now)]
+
+def resume_deferred():
+    """
+    Queues a batch of deferred reports, and duplicates stranded by a lost primary
+    analysis, once the backlog allows new work. Returns how many were queued.
+    """
+    from .tasks import enqueue_analysis
+
+    if workers_behind(analysis_backlog(fresh=True)): return 0
+    batch = settings.AI_ANALYSIS_WORKERS * 2
+    claimed = claim_deferred(batch) + claim_duplicates(stranded_duplicates()[:batch])
+    for report_id in claimed: enqueue_analysis(report_id)
+    return len(claimed)
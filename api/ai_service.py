@@ -1,4 +1,5 @@
 # api/ai_service.py
+from PIL import Image
 from ultralytics import YOLO
 
 MODEL_PATH = "api\best.pt"
@@ -10,11 +11,21 @@ except Exception as e:
     MODEL = None
     print(f"🚨 ERROR: Failed to load YOLOv8 model. AI features will be disabled. Error: {e}")
 
-def run_ai_analysis(image_path):
-    if MODEL is None:
+def load_image(image_path):
+    """Reads and decodes the report image up front, so loading is timed apart from inference."""
+    try:
+        with Image.open(image_path) as img:
+            return img.convert('RGB')
+    except Exception as e:
+        print(f"Could not load image for AI analysis: {e}")
+        return None
+
+def run_ai_analysis(image):
+    """`image` is a file path or an image returned by load_image."""
+    if MODEL is None or image is None:
         return None
     try:
-        results = MODEL(image_path, conf=0.4)
+        results = MODEL(image, conf=0.4)
     except Exception as e:
         print(f"AI analysis failed during model prediction: {e}")
         return None
@@ -0,0 +1,203 @@
+# api/analytics.py
+import hashlib
+import json
+from datetime import datetime, timezone as dt_timezone
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+from django.db.models import CharField, F, Value
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Cast, Coalesce
+from django.utils import timezone
+
+from .models import Report
+from .search import FTS_TABLE, fts_available, fts_query
+
+PERCENTILES = [50, 90, 95]
+OPEN_AGE_BUCKETS = [('<1d', 24), ('1-3d', 72), ('3-7d', 168), ('7-30d', 720), ('>30d', None)] # upper bounds in hours
+DONE_STATUSES = ('Resolved', 'Closed')
+UNSPECIFIED = 'Unspecified'
+US_PER_HOUR = 3600 * 10 ** 6
+# 1970-01-01 was a Thursday; shifting by three days makes weeks start on Monday.
+WEEK_SHIFT_US = 3 * 24 * US_PER_HOUR
+WEEK_US = 7 * 24 * US_PER_HOUR
+
+# ================================================================
+# LOADING
+# ================================================================
+
+def _datetimes(values):
+    """datetime64[us] (UTC) array from raw DB values: ISO strings or datetimes; None -> NaT."""
+    sample = next((value for value in values if value is not None), None)
+    if isinstance(sample, datetime) and sample.tzinfo:
+        values = [value and value.astimezone(dt_timezone.utc).replace(tzinfo=None) for value in values]
+    return np.array(values, dtype='datetime64[us]')
+
+def _factorize(values, dtype=str):
+    """(codes, labels): integer codes per row into the sorted distinct labels."""
+    labels, codes = np.unique(np.array(values, dtype=dtype), return_inverse=True)
+    return codes.astype(np.int64), labels.tolist()
+
+def load_columns(queryset):
+    """
+    Fetches the columns the analytics need in one query, on a raw cursor so
+    Django builds no model rows. On SQLite timestamps are selected as text for
+    NumPy to parse, which skips the per-row datetime converters, the dominant
+    cost for hundreds of thousands of rows.
+    """
+    connection = connections[queryset.db]
+    timestamp = (lambda name: Cast(name, CharField())) if connection.vendor == 'sqlite' else F
+    sql, params = queryset.order_by().values_list(
+        timestamp('created_at'), timestamp('resolved_at'), 'status',
+        Coalesce('category', Value(UNSPECIFIED)), Coalesce('ai_classification', Value(UNSPECIFIED)),
+        Coalesce('assigned_technician_id', Value(0)), 'assigned_technician__profile__full_name',
+    ).query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+    created, resolved, statuses, categories, classifications, technicians, names = zip(*rows) if rows else ((),) * 7
+    return {
+        'created': _datetimes(created), 'resolved': _datetimes(resolved),
+        'done': np.isin(np.array(statuses, dtype=str), DONE_STATUSES),
+        'category': _factorize(categories),
+        'classification': _factorize(classifications),
+        'technician': _factorize(technicians, dtype=np.int64), # 0: unassigned
+        'technician_names': dict(zip(technicians, names)),
+    }
+
+# ================================================================
+# VECTORISED STATISTICS
+# ================================================================
+
+def grouped_percentiles(codes, values, groups, percentiles=PERCENTILES):
+    """
+    Nearest-rank percentiles of `values` per group code in one pass: rows are
+    sorted by (group, value) once, then every group's q-th value is picked by
+    index arithmetic. Returns {q: array over groups}, NaN for empty groups.
+    """
+    counts = np.bincount(codes, minlength=groups)
+    ordered = values[np.lexsort((values, codes))]
+    starts = np.cumsum(counts) - counts
+    result = {}
+    for q in percentiles:
+        ranks = np.maximum(np.ceil(q / 100 * counts).astype(np.int64) - 1, 0)
+        picked = ordered[np.minimum(starts + ranks, max(len(ordered) - 1, 0))] if len(ordered) else np.zeros(groups)
+        result[q] = np.where(counts > 0, picked, np.nan)
+    return result
+
+def _round(value, digits=1):
+    return None if value is None or np.isnan(value) else round(float(value), digits)
+
+def _summaries(codes, groups, hours, resolved_mask, open_mask, sla_hours):
+    """Per-group report, resolved and open counts with resolution-time statistics."""
+    reports = np.bincount(codes, minlength=groups)
+    resolved_codes, resolved_hours = codes[resolved_mask], hours[resolved_mask]
+    resolved = np.bincount(resolved_codes, minlength=groups)
+    opened = np.bincount(codes[open_mask], minlength=groups)
+    totals = np.bincount(resolved_codes, weights=resolved_hours, minlength=groups)
+    quantiles = grouped_percentiles(resolved_codes, resolved_hours, groups)
+    within = np.bincount(resolved_codes[resolved_hours <= sla_hours], minlength=groups) if sla_hours else None
+    rows = []
+    for group in range(groups):
+        row = {
+            'reports': int(reports[group]), 'resolved': int(resolved[group]), 'open': int(opened[group]),
+            'resolution_hours': {
+                'mean': _round(totals[group] / resolved[group]) if resolved[group] else None,
+                **{f'p{q}': _round(quantiles[q][group]) for q in PERCENTILES},
+            },
+        }
+        if within is not None: row['within_sla'] = round(within[group] / resolved[group], 4) if resolved[group] else None
+        rows.append(row)
+    return rows
+
+def _by(key, labels, summaries):
+    rows = [{key: label, **summary} for label, summary in zip(labels, summaries)]
+    return sorted(rows, key=lambda row: -row['reports'])
+
+# ================================================================
+# REPORT
+# ================================================================
+
+def compute_resolution_analytics(columns, now, sla_hours=None):
+    created, resolved = columns['created'], columns['resolved']
+    hours = np.maximum((resolved - created).astype('timedelta64[us]').astype(np.float64) / US_PER_HOUR, 0.0)
+    # A reopened report keeps its old resolved_at, so only count it while it is done.
+    resolved_mask = ~np.isnat(resolved) & columns['done']
+    open_mask = ~columns['done']
+    n = len(created)
+
+    overall = _summaries(np.zeros(n, dtype=np.int64), 1, hours, resolved_mask, open_mask, sla_hours)[0]
+
+    # Backlog ageing: how long the still-open reports have been waiting.
+    ages = (np.datetime64(now.astimezone(dt_timezone.utc).replace(tzinfo=None), 'us') - created[open_mask]).astype(np.float64) / US_PER_HOUR
+    bounds = [upper for _, upper in OPEN_AGE_BUCKETS[:-1]]
+    bucket_counts = np.bincount(np.searchsorted(bounds, ages, side='right'), minlength=len(OPEN_AGE_BUCKETS))
+    age_quantiles = grouped_percentiles(np.zeros(len(ages), dtype=np.int64), ages, 1)
+    backlog = {
+        'open': int(open_mask.sum()),
+        'age_hours': {**{f'p{q}': _round(age_quantiles[q][0]) for q in PERCENTILES}, 'max': _round(ages.max()) if len(ages) else None},
+        'age_buckets': {label: int(count) for (label, _), count in zip(OPEN_AGE_BUCKETS, bucket_counts)},
+    }
+
+    dimensions = {}
+    for key, column in (('category', 'category'), ('ai_classification', 'classification')):
+        codes, labels = columns[column]
+        dimensions[key] = _by(key, labels, _summaries(codes, len(labels), hours, resolved_mask, open_mask, sla_hours))
+    codes, technician_ids = columns['technician']
+    rows = _summaries(codes, len(technician_ids), hours, resolved_mask, open_mask, sla_hours)
+    dimensions['technician'] = _by('technician_id', [pk or None for pk in technician_ids], rows)
+    for row in dimensions['technician']: row['name'] = columns['technician_names'].get(row['technician_id'] or 0)
+
+    # Weekly throughput: reports created and resolved in each week, with resolution
+    # percentiles of the reports created that week.
+    created_week = (created.astype(np.int64) + WEEK_SHIFT_US) // WEEK_US
+    resolved_week = (resolved[resolved_mask].astype(np.int64) + WEEK_SHIFT_US) // WEEK_US
+    first = int(min(created_week.min(), resolved_week.min() if len(resolved_week) else created_week.min())) if n else 0
+    weeks = int(max(created_week.max(), resolved_week.max() if len(resolved_week) else created_week.max())) - first + 1 if n else 0
+    week_rows = _summaries(created_week - first, weeks, hours, resolved_mask, open_mask, sla_hours) if n else []
+    resolved_in_week = np.bincount(resolved_week - first, minlength=weeks) if n else []
+    by_week = []
+    for offset, row in enumerate(week_rows):
+        start = np.datetime64((first + offset) * WEEK_US - WEEK_SHIFT_US, 'us').astype(datetime).date()
+        by_week.append({'week': start.isoformat(), 'created': row['reports'], 'resolved': int(resolved_in_week[offset]), 'open': row['open'], 'resolution_hours': row['resolution_hours']})
+
+    return {
+        'overall': overall,
+        'backlog': backlog,
+        'by_category': dimensions['category'],
+        'by_classification': dimensions['ai_classification'],
+        'by_technician': dimensions['technician'],
+        'by_week': by_week,
+    }
+
+def in_district(queryset, district):
+    """
+    Reports whose address mentions `district`. On SQLite this goes through the
+    address column of the full-text index, which avoids a LIKE scan over every
+    address; elsewhere it is a case-insensitive substring match.
+    """
+    if not fts_available(queryset.db): return queryset.filter(address__icontains=district)
+    match = RawSQL(f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s', [f'address : ({fts_query(district)})'])
+    return queryset.filter(id__in=match)
+
+def resolution_analytics(since, until=None, category=None, district=None, sla_hours=None):
+    """
+    Resolution-time percentiles, backlog ageing and throughput for reports created
+    in [since, until), overall and by category, AI classification, technician and
+    week. `district` narrows to reports whose address names it. Results are cached for
+    ANALYTICS_CACHE_SECONDS per distinct set of parameters.
+    """
+    params = {'since': since.isoformat(), 'until': until.isoformat() if until else None, 'category': category, 'district': district, 'sla_hours': sla_hours}
+    key = 'analytics:resolution:' + hashlib.md5(json.dumps(params, sort_keys=True).encode()).hexdigest()
+    result = cache.get(key)
+    if result is not None: return result
+
+    now = timezone.now()
+    queryset = Report.objects.filter(created_at__gte=since, created_at__lt=until or now)
+    if category: queryset = queryset.filter(category=category)
+    if district: queryset = in_district(queryset, district)
+    result = {'filters': params, 'generated_at': now.isoformat(), **compute_resolution_analytics(load_columns(queryset), now, sla_hours)}
+    cache.set(key, result, settings.ANALYTICS_CACHE_SECONDS)
+    return result
@@ -0,0 +1,124 @@
+# api/archive.py
+import datetime
+import json
+import zlib
+from collections import Counter
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.http import Http404
+from rest_framework import permissions
+
+from .models import ArchivedReport, ArchivedReportUpdate, Report, ReportUpdate
+from .storage import adjust_blob_refs
+
+# Columns kept on the archive rows; every other concrete field goes into the payload.
+REPORT_COLUMNS = ('id', 'citizen_id', 'assigned_technician_id', 'status', 'image', 'thumbnail', 'created_at', 'resolved_at')
+UPDATE_COLUMNS = ('id', 'report_id', 'technician_id', 'image', 'thumbnail')
+
+def _payload_fields(model, columns):
+    return [field for field in model._meta.concrete_fields if field.attname not in columns]
+
+class _ArchiveEncoder(DjangoJSONEncoder):
+    def default(self, o):
+        # DjangoJSONEncoder drops microseconds; keep them so archived timestamps are exact.
+        if isinstance(o, datetime.datetime): return o.isoformat()
+        return super().default(o)
+
+def pack(values):
+    return zlib.compress(json.dumps(values, cls=_ArchiveEncoder, separators=(',', ':')).encode(), 9)
+
+def unpack(payload):
+    return json.loads(zlib.decompress(payload))
+
+# ================================================================
+# ARCHIVING
+# ================================================================
+
+def archivable_reports(cutoff):
+    """Closed reports untouched since `cutoff`."""
+    return Report.objects.filter(status='Closed', updated_at__lt=cutoff)
+
+@transaction.atomic
+def archive_reports(report_ids):
+    """
+    Moves the given reports and their updates into the archive tables and deletes
+    the live rows. Returns the number of reports archived; reports that are no
+    longer Closed by the time they are locked are left alone.
+    """
+    report_fields = _payload_fields(Report, REPORT_COLUMNS)
+    update_fields = _payload_fields(ReportUpdate, UPDATE_COLUMNS)
+    reports = list(Report.objects.select_for_update().filter(pk__in=report_ids, status='Closed').values(*REPORT_COLUMNS, *[f.attname for f in report_fields]))
+    if not reports: return 0
+    updates = list(ReportUpdate.objects.filter(report_id__in=[r['id'] for r in reports]).values(*UPDATE_COLUMNS, *[f.attname for f in update_fields]))
+
+    media = Counter()
+    archived = []
+    for row in reports:
+        archived.append(ArchivedReport(
+            id=row['id'], citizen_id=row['citizen_id'], assigned_technician_id=row['assigned_technician_id'],
+            status=row['status'], image=row['image'] or '', thumbnail=row['thumbnail'] or '',
+            created_at=row['created_at'], resolved_at=row['resolved_at'],
+            payload=pack({f.attname: row[f.attname] for f in report_fields}),
+        ))
+        media.update(name for name in (row['image'], row['thumbnail']) if name)
+    archived_updates = []
+    for row in updates:
+        archived_updates.append(ArchivedReportUpdate(
+            id=row['id'], report_id=row['report_id'], technician_id=row['technician_id'],
+            image=row['image'] or '', thumbnail=row['thumbnail'] or '',
+            payload=pack({f.attname: row[f.attname] for f in update_fields}),
+        ))
+        media.update(name for name in (row['image'], row['thumbnail']) if name)
+
+    ArchivedReport.objects.bulk_create(archived, batch_size=500)
+    ArchivedReportUpdate.objects.bulk_create(archived_updates, batch_size=500)
+    Report.objects.filter(pk__in=[r['id'] for r in reports]).delete()
+    # The post_delete signals released the live rows' media; the archive rows reference it now.
+    for name, count in media.items(): adjust_blob_refs(name, count)
+    return len(archived)
+
+# ================================================================
+# READING ARCHIVED REPORTS
+# ================================================================
+
+def _rebuild(model, archived, columns, fields):
+    values = {column: getattr(archived, column) for column in columns}
+    packed = unpack(archived.payload)
+    values.update({field.attname: field.to_python(packed[field.attname]) for field in fields if field.attname in packed})
+    return model(**values)
+
+def load_archived_report(pk):
+    """
+    Rebuilds an unsaved Report (with its updates prefetched) from the archive, so
+    serializers and templates written for live reports render it unchanged.
+    Returns None if no such archived report exists.
+    """
+    archived = ArchivedReport.objects.filter(pk=pk).select_related('citizen', 'assigned_technician').first()
+    if archived is None: return None
+    report = _rebuild(Report, archived, REPORT_COLUMNS, _payload_fields(Report, REPORT_COLUMNS))
+    report.citizen, report.assigned_technician = archived.citizen, archived.assigned_technician
+    update_fields = _payload_fields(ReportUpdate, UPDATE_COLUMNS)
+    updates = []
+    for archived_update in archived.updates.select_related('technician').order_by('id'):
+        update = _rebuild(ReportUpdate, archived_update, UPDATE_COLUMNS, update_fields)
+        update.technician, update.report = archived_update.technician, report
+        updates.append(update)
+    report._prefetched_objects_cache = {'reportupdate_set': updates}
+    return report
+
+class ArchivedReportFallbackMixin:
+    """
+    For report detail views: when the live report is gone, safe requests are
+    answered from the archive, with the view's own object permissions.
+    """
+
+    def get_object(self):
+        try:
+            return super().get_object()
+        except Http404:
+            if self.request.method not in permissions.SAFE_METHODS: raise
+            report = load_archived_report(self.kwargs[self.lookup_url_kwarg or self.lookup_field])
+            if report is None: raise
+            self.check_object_permissions(self.request, report)
+            return report
@@ -0,0 +1,157 @@
+# api/assignment.py
+import math
+from collections import defaultdict
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from .models import Report
+from .outbox import queue_status_notifications
+
+# Statuses that count towards a technician's open workload.
+OPEN_STATUSES = ['Assigned', 'In Progress']
+
+# Keywords in Profile.specialization that qualify a technician for an AI classification.
+SPECIALIZATION_KEYWORDS = {
+    'Transformer': ['transformer'],
+    'Damaged Transformer': ['transformer'],
+    'Electric Pole': ['pole', 'line'],
+    'Broken Pole': ['pole', 'line'],
+    'Leaning Pole': ['pole', 'line'],
+    'Fallen Line': ['line', 'wire', 'cable'],
+    'Sparks': ['line', 'wire', 'cable', 'emergency'],
+    'Fire': ['emergency'],
+    'Vegetation Overgrowth': ['vegetation', 'tree'],
+}
+
+@dataclass
+class TechnicianCandidate:
+    id: int
+    specialization: str = ''
+    lat_rad: float = None
+    lng_rad: float = None
+    cos_lat: float = None
+    open_load: int = 0
+
+# ================================================================
+# SCORING
+# ================================================================
+
+def specialization_matches(specialization, ai_classification):
+    if not specialization or not ai_classification:
+        return False
+    specialization = specialization.lower()
+    keywords = SPECIALIZATION_KEYWORDS.get(ai_classification, [ai_classification.lower()])
+    return any(keyword in specialization for keyword in keywords)
+
+def plan_assignments(reports, technicians):
+    """
+    Picks a technician for each report, greedily in the order given (callers pass
+    the most urgent first). Workloads are updated in memory as reports are placed,
+    so one batch spreads across the team. No database access happens here.
+
+    A technician's score (lower is better) is travel distance plus open workload,
+    minus a bonus when their specialization matches the report's AI classification.
+
+    `reports` is an iterable of (report_id, latitude, longitude, ai_classification).
+    Returns a list of (report_id, technician_id, score); technician_id is None when
+    every technician is at AUTO_ASSIGN_MAX_OPEN_REPORTS.
+    """
+    max_load = settings.AUTO_ASSIGN_MAX_OPEN_REPORTS
+    distance_weight = settings.AUTO_ASSIGN_DISTANCE_WEIGHT
+    load_weight = settings.AUTO_ASSIGN_LOAD_WEIGHT
+    bonus = settings.AUTO_ASSIGN_SPECIALIZATION_BONUS
+    unknown_distance = settings.AUTO_ASSIGN_UNKNOWN_DISTANCE_KM * distance_weight
+    sin, asin, sqrt = math.sin, math.asin, math.sqrt
+
+    # Specialization matches only depend on the classification, so compute them once per class.
+    matches_by_classification = {}
+    plan = []
+    for report_id, latitude, longitude, ai_classification in reports:
+        matching = matches_by_classification.get(ai_classification)
+        if matching is None:
+            matching = {tech.id for tech in technicians if specialization_matches(tech.specialization, ai_classification)}
+            matches_by_classification[ai_classification] = matching
+        lat_rad, lng_rad = math.radians(float(latitude)), math.radians(float(longitude))
+        cos_lat = math.cos(lat_rad)
+
+        best, best_score = None, None
+        for tech in technicians:
+            if tech.open_load >= max_load:
+                continue
+            if tech.lat_rad is None:
+                score = unknown_distance
+            else:
+                a = sin((lat_rad - tech.lat_rad) / 2) ** 2 + tech.cos_lat * cos_lat * sin((lng_rad - tech.lng_rad) / 2) ** 2
+                score = 12742 * asin(sqrt(a)) * distance_weight
+            score += tech.open_load * load_weight
+            if tech.id in matching:
+                score -= bonus
+            if best is None or score < best_score:
+                best, best_score = tech, score
+        if best is None:
+            plan.append((report_id, None, None))
+            continue
+        best.open_load += 1
+        plan.append((report_id, best.id, round(best_score, 3)))
+    return plan
+
+# ================================================================
+# DATABASE ENTRY POINTS
+# ================================================================
+
+def load_technicians():
+    """Loads every active technician with their open workload in two queries."""
+    loads = dict(
+        Report.objects.filter(assigned_technician__isnull=False, status__in=OPEN_STATUSES)
+        .values('assigned_technician').annotate(count=Count('id')).values_list('assigned_technician', 'count')
+    )
+    rows = User.objects.filter(profile__role='technician', is_active=True).values_list(
+        'id', 'profile__specialization', 'profile__base_latitude', 'profile__base_longitude'
+    )
+    technicians = []
+    for tech_id, specialization, latitude, longitude in rows:
+        tech = TechnicianCandidate(id=tech_id, specialization=specialization or '', open_load=loads.get(tech_id, 0))
+        if latitude is not None and longitude is not None:
+            tech.lat_rad, tech.lng_rad = math.radians(float(latitude)), math.radians(float(longitude))
+            tech.cos_lat = math.cos(tech.lat_rad)
+        technicians.append(tech)
+    return technicians
+
+def unassigned_reports():
+    """Reports that have been triaged by the AI but not yet given to anyone."""
+    return Report.objects.filter(status='Received', assigned_technician__isnull=True)
+
+def auto_assign_reports(queryset):
+    """
+    Assigns every report in `queryset` that is triaged but has no technician yet
+    (see unassigned_reports), in a single transaction; others are left alone.
+    High-priority reports are placed first so they get the closest technicians.
+    Returns the plan from plan_assignments.
+    """
+    priority_rank = {'High': 0, 'Medium': 1, 'Low': 2}
+    with transaction.atomic():
+        # Pending Analysis reports are excluded: the analysis task saves the whole row
+        # when it finishes and would put the status and technician back.
+        rows = list(
+            queryset.filter(status='Received', assigned_technician__isnull=True).select_for_update()
+            .values_list('id', 'latitude', 'longitude', 'ai_classification', 'ai_priority', 'created_at')
+        )
+        rows.sort(key=lambda row: (priority_rank.get(row[4], 3), row[5]))
+        plan = plan_assignments([row[:4] for row in rows], load_technicians())
+
+        # One UPDATE per technician is far cheaper than a per-row CASE expression,
+        # and stays bounded by the number of technicians.
+        now = timezone.now()
+        groups = defaultdict(list)
+        for report_id, tech_id, _ in plan:
+            if tech_id is not None: groups[tech_id].append(report_id)
+        for tech_id, report_ids in groups.items():
+            Report.objects.filter(pk__in=report_ids).update(assigned_technician_id=tech_id, status='Assigned', updated_at=now)
+        newly_assigned = [report_id for report_ids in groups.values() for report_id in report_ids]
+        queue_status_notifications(Report.objects.filter(pk__in=newly_assigned).select_related('citizen'))
+    return plan
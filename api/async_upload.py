@@ -0,0 +1,223 @@
+# api/async_upload.py
+import hashlib
+import io
+import os
+import tempfile
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.core.handlers.asgi import ASGIRequest
+from django.db import close_old_connections
+from django.http import HttpResponse
+from django.utils.http import parse_header_parameters
+from rest_framework.authtoken.models import Token
+
+from .renderers import FastJSONRenderer
+
+UPLOAD_PATH = '/api/reports/create/stream/'
+ROUTE_NAME = 'report-create-stream'
+MAX_HEADER_BYTES = 8 * 1024
+
+class UploadError(Exception):
+    def __init__(self, status, detail, retry_after=None):
+        super().__init__(detail)
+        self.status, self.detail, self.retry_after = status, detail, retry_after
+
+# ================================================================
+# STREAMING MULTIPART
+# ================================================================
+
+async def _body(receive):
+    while True:
+        message = await receive()
+        if message['type'] == 'http.disconnect': raise UploadError(400, "Client disconnected.")
+        if message.get('body'): yield message['body']
+        if not message.get('more_body'): return
+
+async def parse_multipart(chunks, boundary):
+    """
+    Incremental multipart/form-data parser. Yields ('part', (name, filename,
+    content_type)) at the start of each part, then ('data', bytes) for its body
+    as it arrives, so a file never has to be held in memory.
+    """
+    delimiter = b'\r\n--' + boundary
+    buffer, state = b'\r\n', 'preamble' # The leading CRLF lets the first boundary match `delimiter`
+    async for chunk in chunks:
+        buffer += chunk
+        while True:
+            if state in ('preamble', 'data'):
+                index = buffer.find(delimiter)
+                if index < 0:
+                    # Keep a tail that could be the start of a delimiter split across chunks.
+                    keep = len(delimiter) - 1
+                    if state == 'data' and len(buffer) > keep: yield 'data', buffer[:-keep]
+                    buffer = buffer[-keep:] if len(buffer) > keep else buffer
+                    break
+                if state == 'data' and index: yield 'data', buffer[:index]
+                buffer, state = buffer[index + len(delimiter):], 'boundary'
+            elif state == 'boundary':
+                if len(buffer) < 2: break
+                if buffer.startswith(b'--'): return
+                if not buffer.startswith(b'\r\n'): raise UploadError(400, "Malformed multipart body.")
+                buffer, state = buffer[2:], 'headers'
+            elif state == 'headers':
+                index = buffer.find(b'\r\n\r\n')
+                if index < 0:
+                    if len(buffer) > MAX_HEADER_BYTES: raise UploadError(400, "Multipart part headers too large.")
+                    break
+                headers = {}
+                for line in buffer[:index].decode('utf-8', 'replace').split('\r\n'):
+                    key, _, value = line.partition(':')
+                    headers[key.strip().lower()] = value.strip()
+                _, params = parse_header_parameters(headers.get('content-disposition', ''))
+                yield 'part', (params.get('name'), params.get('filename'), headers.get('content-type'))
+                buffer, state = buffer[index + 4:], 'data'
+    raise UploadError(400, "Incomplete multipart body.")
+
+# ================================================================
+# REPORT CREATION (SYNC PARTS, RUN OFF THE EVENT LOOP)
+# ================================================================
+
+async def _in_thread(func, *args):
+    # File I/O blocks, so it runs on the shared thread pool rather than the event loop.
+    return await sync_to_async(func, thread_sensitive=False)(*args)
+
+def _incoming_file():
+    if hasattr(default_storage, 'incoming_file'): return default_storage.incoming_file()
+    return tempfile.NamedTemporaryFile(dir=settings.FILE_UPLOAD_TEMP_DIR, delete=False)
+
+def _authenticate(key):
+    close_old_connections()
+    token = Token.objects.select_related('user').filter(key=key).first()
+    return token.user if token and token.user.is_active else None
+
+def _create_report(user, fields, upload, absolute_uri):
+    """Validates the form, stores the photo and creates the report. Returns (status, body, report_id or None)."""
+    from .serializers import ReportCreateSerializer
+    from .uploads import INVALID_IMAGE, create_report, is_valid_image, store_incoming_image
+
+    close_old_connections()
+    serializer = ReportCreateSerializer(data=fields, context={'request': absolute_uri})
+    if not serializer.is_valid(): return 400, serializer.errors, None
+    image = None
+    if upload:
+        if not is_valid_image(upload['path']): return 400, {'image': [INVALID_IMAGE]}, None
+        image = store_incoming_image(upload['path'], upload['digest'], upload['size'], upload['filename'])
+        upload.clear() # Owned by storage now
+    report, needs_analysis = create_report(serializer, user, image)
+    return 201, ReportCreateSerializer(report, context={'request': absolute_uri}).data, report.pk if needs_analysis else None
+
+def _cors_headers(scope):
+    """The CORS headers CorsMiddleware would add to this response, as ASGI header pairs."""
+    if 'corsheaders.middleware.CorsMiddleware' not in settings.MIDDLEWARE: return []
+    from corsheaders.middleware import CorsMiddleware
+
+    response = CorsMiddleware(lambda request: None).add_response_headers(ASGIRequest(scope, io.BytesIO()), HttpResponse())
+    return [(key.lower().encode('latin-1'), value.encode('latin-1')) for key, value in response.items() if key.lower() != 'content-type']
+
+class _AbsoluteURI:
+    """Stands in for the request in serializer context, so image URLs are absolute like in ReportCreateView."""
+
+    def __init__(self, scope, headers):
+        self.base = f"{scope.get('scheme', 'http')}://{headers.get(b'host', b'localhost').decode('latin-1')}"
+
+    def build_absolute_uri(self, location):
+        return location if '://' in location else self.base + location
+
+# ================================================================
+# ASGI APPLICATION
+# ================================================================
+
+class StreamingReportUploadApp:
+    """
+    Serves POST /api/reports/create/stream/ natively under ASGI; every other
+    request goes to the wrapped Django application.
+
+    Accepts the same multipart form and Token auth as reports/create/. The
+    token is checked before the body is read. The photo is then hashed and
+    written straight into the storage's incoming directory as chunks arrive,
+    so a slow mobile upload only costs an awaiting coroutine, not a worker
+    thread. Only validation, the storage rename and the row insert run in a
+    thread. Analysis is queued on the AI pool (api.tasks.enqueue_analysis).
+    Under WSGI the same path is served by ReportCreateView. Other methods,
+    including CORS preflight OPTIONS, are passed to Django, and POST responses
+    carry the same CORS headers CorsMiddleware adds elsewhere.
+    """
+
+    def __init__(self, django_app):
+        self.django_app = django_app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http' or scope['path'] != UPLOAD_PATH or scope['method'] != 'POST':
+            return await self.django_app(scope, receive, send)
+        from .metrics import REQUEST_SECONDS
+
+        started, extra_headers = time.perf_counter(), []
+        try:
+            status, body = await self.handle(scope, receive)
+        except UploadError as error:
+            status, body = error.status, {'detail': error.detail}
+            if error.retry_after is not None: extra_headers.append((b'retry-after', str(int(error.retry_after)).encode()))
+        payload = FastJSONRenderer().render(body)
+        await send({'type': 'http.response.start', 'status': status, 'headers': [
+            (b'content-type', b'application/json'), (b'content-length', str(len(payload)).encode()), *extra_headers, *_cors_headers(scope),
+        ]})
+        await send({'type': 'http.response.body', 'body': payload})
+        REQUEST_SECONDS.observe(time.perf_counter() - started, ROUTE_NAME, scope['method'], str(status))
+
+    async def handle(self, scope, receive):
+        from .admission import queue_or_defer, throttle_wait
+
+        headers = dict(scope['headers'])
+        keyword, _, key = headers.get(b'authorization', b'').decode('latin-1').partition(' ')
+        if keyword.lower() != 'token' or not key: raise UploadError(401, "Authentication credentials were not provided.")
+        user = await sync_to_async(_authenticate)(key.strip())
+        if user is None: raise UploadError(401, "Invalid token.")
+        wait = await sync_to_async(throttle_wait)(user, (scope.get('client') or ('', 0))[0], 'report_create')
+        if wait is not None: raise UploadError(429, f"Request was throttled. Expected available in {int(wait)} seconds.", retry_after=wait)
+
+        try: length = int(headers.get(b'content-length', b'0') or 0)
+        except ValueError: raise UploadError(400, "Invalid Content-Length header.")
+        if length > settings.REPORT_UPLOAD_MAX_BYTES: raise UploadError(413, "Upload too large.")
+        content_type, params = parse_header_parameters(headers.get(b'content-type', b'').decode('latin-1'))
+        if content_type != 'multipart/form-data' or not params.get('boundary'):
+            raise UploadError(415, f"Unsupported media type \"{content_type}\" in request.")
+
+        fields, upload, current, received = {}, None, None, 0
+        try:
+            async for kind, value in parse_multipart(_body(receive), params['boundary'].encode('latin-1')):
+                if kind == 'part':
+                    name, filename, _ = value
+                    if filename is None:
+                        current = fields[name] = bytearray()
+                    elif name == 'image' and upload is None:
+                        tmp = await _in_thread(_incoming_file)
+                        upload = {'file': tmp, 'path': tmp.name, 'filename': os.path.basename(filename) or 'upload.jpg', 'sha256': hashlib.sha256(), 'size': 0}
+                        current = upload
+                    else:
+                        raise UploadError(400, f"Unexpected file field \"{name}\".")
+                    continue
+                received += len(value)
+                if received > settings.REPORT_UPLOAD_MAX_BYTES: raise UploadError(413, "Upload too large.")
+                if current is upload:
+                    upload['sha256'].update(value)
+                    upload['size'] += len(value)
+                    await _in_thread(upload['file'].write, value)
+                else:
+                    if len(current) + len(value) > settings.DATA_UPLOAD_MAX_MEMORY_SIZE: raise UploadError(413, "Form field too large.")
+                    current += value
+            if upload:
+                await _in_thread(upload['file'].close)
+                upload['digest'] = upload.pop('sha256').hexdigest()
+                del upload['file']
+            try: fields = {name: value.decode('utf-8') for name, value in fields.items()}
+            except UnicodeDecodeError: raise UploadError(400, "Form fields must be UTF-8 encoded.")
+            status, body, analyse_id = await sync_to_async(_create_report)(user, fields, upload, _AbsoluteURI(scope, headers))
+        finally:
+            if upload and 'path' in upload:
+                if 'file' in upload: upload['file'].close()
+                if os.path.exists(upload['path']): os.unlink(upload['path'])
+        if analyse_id is not None: await sync_to_async(queue_or_defer)(analyse_id)
+        return status, body
@@ -0,0 +1,120 @@
+# api/bulk.py
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Report, ReportUpdate
+from .outbox import queue_status_notifications
+
+# ================================================================
+# HELPERS
+# ================================================================
+
+def _unique(ids):
+    """De-duplicates ids while keeping the order the client sent them in."""
+    return list(dict.fromkeys(ids))
+
+def _ok(report):
+    return {"report_id": report.id, "ok": True, "status": report.status, "assigned_technician": report.assigned_technician_id}
+
+def _error(report_id, message, **extra):
+    return {"report_id": report_id, "ok": False, "error": message, **extra}
+
+def _all_or_nothing(results):
+    """True if every item is valid; otherwise the valid items are marked as not applied."""
+    if all(result["ok"] for result in results): return True
+    for i, result in enumerate(results):
+        if result["ok"]: results[i] = _error(result["report_id"], "Not applied: another report in the batch was rejected.")
+    return False
+
+# ================================================================
+# BULK OPERATIONS
+# ================================================================
+# Each operation loads all target reports in one query, validates every item,
+# then writes them with bulk_update/bulk_create inside a single transaction.
+# A batch is all-or-nothing: if any item is invalid nothing is written, and the
+# per-item results say which items were rejected and why.
+
+def bulk_assign(assignments):
+    """
+    Applies [{'report_id': .., 'assigned_technician': ..}, ...] with the same rules
+    as ReportAssignView: Received reports move to Assigned, reports already being
+    worked change technician. Pending Analysis reports are rejected, because the
+    analysis task saves the whole row when it finishes and would undo the
+    assignment. A report listed more than once is an error.
+    """
+    now = timezone.now()
+    technician_ids = set(
+        User.objects.filter(pk__in={item['assigned_technician'] for item in assignments}, profile__role='technician')
+        .values_list('id', flat=True)
+    )
+    results, to_update, newly_assigned = [], [], []
+    with transaction.atomic():
+        reports = Report.objects.select_for_update().select_related('citizen').in_bulk(_unique(item['report_id'] for item in assignments))
+        seen = set()
+        for item in assignments:
+            report = reports.get(item['report_id'])
+            if report is None:
+                results.append(_error(item['report_id'], "Report not found."))
+                continue
+            if report.id in seen:
+                results.append(_error(report.id, "Report repeated within the batch."))
+                continue
+            if item['assigned_technician'] not in technician_ids:
+                results.append(_error(report.id, "Technician not found."))
+                continue
+            if report.status == 'Pending Analysis':
+                results.append(_error(report.id, "Report is still being analysed; assign it once it is Received."))
+                continue
+            seen.add(report.id)
+            report.assigned_technician_id = item['assigned_technician']
+            if report.status == 'Received':
+                report.status = 'Assigned'
+                newly_assigned.append(report)
+            report.updated_at = now
+            to_update.append(report)
+            results.append(_ok(report))
+        if not _all_or_nothing(results): return results
+        Report.objects.bulk_update(to_update, ['assigned_technician', 'status', 'updated_at'], batch_size=500)
+        queue_status_notifications(newly_assigned)
+    return results
+
+def bulk_transition(user, report_ids, requested_status, remark=None):
+    """
+    Moves many reports to `requested_status`, validated per report against
+    Report.STATUS_TRANSITIONS exactly like ReportStatusUpdateView. If `remark` is
+    given (technicians only), it is recorded as a ReportUpdate by `user` on every
+    report that moved.
+    Returns None if the user's role cannot change statuses at all.
+    """
+    role = user.profile.role
+    if role not in Report.STATUS_TRANSITIONS: return None
+    transitions = Report.STATUS_TRANSITIONS[role]
+    now = timezone.now()
+    results, to_update = [], []
+    with transaction.atomic():
+        report_ids = _unique(report_ids)
+        reports = Report.objects.select_for_update().select_related('citizen').in_bulk(report_ids)
+        for report_id in report_ids:
+            report = reports.get(report_id)
+            if report is None:
+                results.append(_error(report_id, "Report not found."))
+                continue
+            if role == 'technician' and report.assigned_technician_id != user.id:
+                results.append(_error(report_id, "You are not assigned to this report."))
+                continue
+            allowed_next_statuses = transitions.get(report.status)
+            if not allowed_next_statuses or requested_status not in allowed_next_statuses:
+                results.append(_error(report_id, f"Cannot change status from '{report.status}' to '{requested_status}'.", allowed_next_statuses=allowed_next_statuses or []))
+                continue
+            report.status = requested_status
+            if requested_status == 'Resolved': report.resolved_at = now
+            report.updated_at = now
+            to_update.append(report)
+            results.append(_ok(report))
+        if not _all_or_nothing(results): return results
+        Report.objects.bulk_update(to_update, ['status', 'resolved_at', 'updated_at'], batch_size=500)
+        if remark and role == 'technician':
+            ReportUpdate.objects.bulk_create([ReportUpdate(report=report, technician=user, remark=remark) for report in to_update], batch_size=500)
+        queue_status_notifications(to_update)
+    return results
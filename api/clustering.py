@@ -0,0 +1,191 @@
+# api/clustering.py
+import logging
+import math
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from PIL import Image
+
+from .models import Incident, Report
+
+logger = logging.getLogger(__name__)
+
+EARTH_RADIUS_M = 6371000
+METERS_PER_DEGREE_LAT = 111320
+
+# Reports in these states no longer count as an open hazard.
+CLOSED_STATUSES = ['Resolved', 'Closed']
+
+# ================================================================
+# GEOMETRY & IMAGE HELPERS
+# ================================================================
+
+def haversine_m(lat1, lng1, lat2, lng2):
+    """Great-circle distance in metres between two (lat, lng) points."""
+    lat1, lng1, lat2, lng2 = map(math.radians, (float(lat1), float(lng1), float(lat2), float(lng2)))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lng2 - lng1) / 2) ** 2
+    return 2 * EARTH_RADIUS_M * math.asin(math.sqrt(a))
+
+def bounding_box(lat, lng, radius_m):
+    """Returns (min_lat, max_lat, min_lng, max_lng) enclosing a circle of radius_m."""
+    lat, lng = float(lat), float(lng)
+    d_lat = radius_m / METERS_PER_DEGREE_LAT
+    d_lng = radius_m / (METERS_PER_DEGREE_LAT * max(math.cos(math.radians(lat)), 0.01))
+    return lat - d_lat, lat + d_lat, lng - d_lng, lng + d_lng
+
+def compute_image_hash(image_file):
+    """
+    Computes a 64-bit difference hash (dHash) of an image, returned as 16 hex chars.
+    Returns None if the file cannot be read as an image.
+    """
+    try:
+        with Image.open(image_file) as img:
+            pixels = list(img.convert('L').resize((9, 8), Image.LANCZOS).getdata())
+    except Exception:
+        logger.warning("Could not hash image for clustering", exc_info=True)
+        return None
+    bits = 0
+    for row in range(8):
+        for col in range(8):
+            bits = (bits << 1) | (pixels[row * 9 + col] > pixels[row * 9 + col + 1])
+    return f'{bits:016x}'
+
+def hamming_distance(hash_a, hash_b):
+    return bin(int(hash_a, 16) ^ int(hash_b, 16)).count('1')
+
+# ================================================================
+# CLUSTERING STAGE
+# ================================================================
+
+def find_matching_incident(report, lock=False, older_than=None):
+    """
+    Finds the closest open incident within the configured radius and time window.
+    Candidates are narrowed with an indexed bounding-box query, then checked with
+    the exact haversine distance and, if enabled, the image hash distance.
+    `lock` locks the candidates (inside a transaction); `older_than` only considers
+    incidents with a lower id.
+    """
+    radius_m = settings.INCIDENT_CLUSTER_RADIUS_M
+    max_hash_distance = settings.INCIDENT_IMAGE_HASH_MAX_DISTANCE
+    window_start = timezone.now() - timedelta(minutes=settings.INCIDENT_CLUSTER_WINDOW_MINUTES)
+    min_lat, max_lat, min_lng, max_lng = bounding_box(report.latitude, report.longitude, radius_m)
+
+    candidates = (
+        Incident.objects
+        .filter(latitude__range=(min_lat, max_lat), longitude__range=(min_lng, max_lng), last_reported_at__gte=window_start)
+        .exclude(primary_report__status__in=CLOSED_STATUSES)
+        .exclude(primary_report__isnull=True)
+    )
+    if lock: candidates = candidates.select_for_update(of=('self',))
+    if older_than is not None: candidates = candidates.filter(pk__lt=older_than)
+    best, best_distance = None, None
+    for incident in candidates:
+        distance = haversine_m(report.latitude, report.longitude, incident.latitude, incident.longitude)
+        if distance > radius_m:
+            continue
+        if max_hash_distance is not None and report.image_hash and incident.image_hash:
+            if hamming_distance(report.image_hash, incident.image_hash) > max_hash_distance:
+                continue
+        if best is None or distance < best_distance:
+            best, best_distance = incident, distance
+    return best
+
+def attach_to_incident(report):
+    """
+    Links a freshly created report to an existing open incident, or opens a new one.
+    Returns (incident, is_duplicate).
+    """
+    if report.image and not report.image_hash:
+        report.image_hash = compute_image_hash(report.image.path)
+
+    with transaction.atomic():
+        incident = find_matching_incident(report, lock=True)
+        is_duplicate = incident is not None
+        if incident is None:
+            incident = Incident.objects.create(
+                primary_report=report, latitude=report.latitude, longitude=report.longitude,
+                image_hash=report.image_hash,
+            )
+            # Locking cannot stop two reports of a new hazard from each finding nothing
+            # (SQLite's IMMEDIATE transactions do serialise this). If another incident
+            # for it committed meanwhile, the older one is kept and this report joins it.
+            earlier = find_matching_incident(report, lock=True, older_than=incident.pk)
+            if earlier is not None:
+                incident.delete()
+                incident, is_duplicate = earlier, True
+        if is_duplicate:
+            Incident.objects.filter(pk=incident.pk).update(report_count=F('report_count') + 1, last_reported_at=timezone.now())
+            incident.refresh_from_db()
+        report.incident = incident
+        report.save(update_fields=['incident', 'image_hash'])
+    return incident, is_duplicate
+
+def _awaiting_primary(since):
+    """Q for reports whose incident's primary is still queued (since `since`) or deferred for analysis."""
+    pending = Q(incident__primary_report__status='Pending Analysis')
+    return pending & (Q(incident__primary_report__analysis_deferred=True) | Q(incident__primary_report__updated_at__gte=since))
+
+def _queued_since():
+    # Same window admission uses to tell queued reports from ones orphaned by a restart.
+    return timezone.now() - timedelta(seconds=settings.AI_BACKLOG_QUEUED_WINDOW_SECONDS)
+
+def share_primary_analysis(report, incident):
+    """
+    Lets a duplicate reuse the AI results of its incident's primary report instead
+    of running its own inference. Returns True if no analysis run is needed: either
+    the results were copied, or the primary is still queued or deferred and will
+    pass its results on when done (see propagate_analysis_to_duplicates). A primary
+    without an image, or whose analysis was lost, leaves the duplicate to be analysed itself.
+    """
+    primary = Report.objects.filter(pk=incident.primary_report_id).first()
+    if primary is None or not primary.image:
+        return False
+    if primary.status == 'Pending Analysis':
+        return Report.objects.filter(_awaiting_primary(_queued_since()), pk=report.pk).exists()
+    report.ai_classification = primary.ai_classification
+    report.ai_suggestion = primary.ai_suggestion
+    report.status = 'Received'
+    report.save(update_fields=['ai_classification', 'ai_suggestion', 'status', 'updated_at'])
+    return True
+
+def waiting_duplicates(primary_id):
+    """Duplicates of a primary report still waiting for its analysis."""
+    return Report.objects.filter(incident__primary_report_id=primary_id, status='Pending Analysis').exclude(pk=primary_id)
+
+def propagate_analysis_to_duplicates(report):
+    """Copies a primary report's AI results onto duplicates still waiting for analysis."""
+    return waiting_duplicates(report.pk).update(
+        ai_classification=report.ai_classification, ai_suggestion=report.ai_suggestion, status='Received', updated_at=timezone.now(),
+    )
+
+def stranded_duplicates():
+    """
+    Duplicates left waiting on a primary that will never pass results on: its
+    analysis run died with the process, or it was analysed without reaching them.
+    Duplicates released within the queued window are left to their own run.
+    """
+    since = _queued_since()
+    return (
+        Report.objects
+        .filter(status='Pending Analysis', analysis_deferred=False, incident__isnull=False, updated_at__lt=since)
+        .exclude(incident__primary_report=F('id'))
+        .exclude(_awaiting_primary(since))
+        .exclude(image='').exclude(image__isnull=True)
+    )
+
+def claim_duplicates(queryset):
+    """
+    Releases waiting duplicates to be analysed on their own and returns their ids.
+    Bumping updated_at marks them as queued, and the conditional update per id
+    keeps two callers from claiming the same report.
+    """
+    now = timezone.now()
+    ids = list(queryset.values_list('id', flat=True))
+    return [pk for pk in ids if Report.objects.filter(pk=pk, status='Pending Analysis', updated_at__lt=now).update(updated_at=now)]
+
+def collapse_duplicates(queryset):
+    """Keeps one row per incident (its primary report) plus any unclustered reports."""
+    return queryset.filter(Q(incident__isnull=True) | Q(incident__primary_report=F('id')))
@@ -0,0 +1,75 @@
+# api/compression.py
+import gzip
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.utils.cache import patch_vary_headers
+
+try:
+    import brotli
+except ImportError: # Optional: without it only gzip is offered.
+    brotli = None
+
+# JSON only. HTML (Django admin, the browsable API) is session-authenticated, embeds
+# csrfmiddlewaretoken and reflects query input, the setup BREACH exploits.
+COMPRESSIBLE_TYPES = ('application/json',)
+
+def accepted_encodings(header):
+    """{coding: q} from an Accept-Encoding header. q=0 entries are kept: they refuse a coding '*' would allow."""
+    encodings = {}
+    for part in header.split(','):
+        coding, _, params = part.strip().partition(';')
+        q = 1.0
+        for param in params.split(';'):
+            name, _, value = param.strip().partition('=')
+            if name == 'q':
+                try: q = float(value)
+                except ValueError: q = 0.0
+        if coding: encodings[coding.lower()] = max(q, 0.0)
+    return encodings
+
+def choose_encoding(header):
+    """Picks 'br' or 'gzip' for an Accept-Encoding header, preferring brotli on a tie; None for identity."""
+    accepted = accepted_encodings(header)
+    offered = (['br'] if brotli is not None else []) + ['gzip']
+    candidates = [(accepted.get(coding, accepted.get('*', 0)), -index, coding) for index, coding in enumerate(offered)]
+    q, _, coding = max(candidates)
+    return coding if q > 0 else None
+
+def compress(body, encoding):
+    if encoding == 'br': return brotli.compress(body, quality=settings.COMPRESSION_BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=settings.COMPRESSION_GZIP_LEVEL, mtime=0)
+
+class CompressionMiddleware:
+    """
+    Compresses JSON responses of at least COMPRESSION_MIN_BYTES with brotli
+    (when installed) or gzip, whichever the client's Accept-Encoding prefers.
+    Streaming responses (PDFs, media files), bodies that are already encoded
+    and all other content types are passed through. Unlike Django's
+    GZipMiddleware there is no per-response padding against BREACH: JSON API
+    responses carry no CSRF token, and auth tokens travel in the Authorization
+    header, not the body. HTML pages, which do carry one, are never compressed.
+    """
+
+    def __init__(self, get_response):
+        if not settings.COMPRESSION_ENABLED: raise MiddlewareNotUsed()
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if response.streaming or response.has_header('Content-Encoding'): return response
+        if not response.get('Content-Type', '').startswith(COMPRESSIBLE_TYPES): return response
+        patch_vary_headers(response, ('Accept-Encoding',))
+        if len(response.content) < settings.COMPRESSION_MIN_BYTES: return response
+        encoding = choose_encoding(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        if encoding is None: return response
+
+        compressed = compress(response.content, encoding)
+        if len(compressed) >= len(response.content): return response
+        response.content = compressed
+        response['Content-Length'] = str(len(compressed))
+        response['Content-Encoding'] = encoding
+        # The representation changed, so a strong ETag must not be reused for it.
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'): response['ETag'] = 'W/' + etag
+        return response
@@ -0,0 +1,16 @@
+# api/db.py
+from django.conf import settings
+
+def apply_sqlite_pragmas(sender, connection, **kwargs):
+    """
+    connection_created handler that tunes every new SQLite connection using
+    settings.SQLITE_PRAGMAS (WAL journal, busy timeout, synchronous, mmap, cache).
+    """
+    if connection.vendor != 'sqlite' or not settings.SQLITE_PRAGMAS_ENABLED:
+        return
+    with connection.cursor() as cursor:
+        for pragma, value in settings.SQLITE_PRAGMAS.items():
+            if value in (None, ''):
+                continue
+            # In-memory test databases cannot use WAL; SQLite quietly keeps 'memory' mode.
+            cursor.execute(f'PRAGMA {pragma} = {value}')
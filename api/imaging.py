@@ -0,0 +1,46 @@
+# api/imaging.py
+"""
+Image re-encoding used by the `recompress_media` command. Functions here run in
+worker processes, so they only touch files and never import Django models.
+"""
+import os
+import tempfile
+
+from PIL import Image, ImageOps
+
+def reencode_image(job):
+    """
+    Re-encodes one image to a compact format at bounded dimensions and writes a
+    thumbnail next to it.
+
+    `job` is a dict with: path, work_dir, format ('WEBP' or 'AVIF'), max_dimension,
+    quality, thumbnail_size. Returns a dict with the original size and the paths
+    and sizes of the encoded image and thumbnail, or an `error` message.
+    """
+    extension = '.' + job['format'].lower()
+    result = {'path': job['path'], 'original_bytes': os.path.getsize(job['path'])}
+    try:
+        with Image.open(job['path']) as img:
+            img = ImageOps.exif_transpose(img)
+            if img.mode not in ('RGB', 'RGBA'):
+                img = img.convert('RGBA' if 'transparency' in img.info else 'RGB')
+            img.thumbnail((job['max_dimension'], job['max_dimension']), Image.LANCZOS)
+            with tempfile.NamedTemporaryFile(dir=job['work_dir'], suffix=extension, delete=False) as out:
+                img.save(out, job['format'], quality=job['quality'], method=6) if job['format'] == 'WEBP' else img.save(out, job['format'], quality=job['quality'])
+            img.thumbnail((job['thumbnail_size'], job['thumbnail_size']), Image.LANCZOS)
+            with tempfile.NamedTemporaryFile(dir=job['work_dir'], suffix=extension, delete=False) as thumb:
+                img.save(thumb, job['format'], quality=job['quality'])
+    except Exception as e:
+        result['error'] = str(e)
+        return result
+    result.update(
+        encoded_path=out.name, encoded_bytes=os.path.getsize(out.name),
+        thumbnail_path=thumb.name, thumbnail_bytes=os.path.getsize(thumb.name),
+    )
+    return result
+
+def lower_worker_priority():
+    """Process-pool initializer: yields CPU to the web workers serving live traffic."""
+    if hasattr(os, 'nice'):
+        try: os.nice(10)
+        except OSError: pass
@@ -0,0 +1,32 @@
+# api/management/commands/analyze_deferred.py
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from api.admission import analysis_backlog, claim_deferred, workers_behind
+from api.tasks import analyze_report_image_task
+
+class Command(BaseCommand):
+    help = (
+        "Analyses reports deferred while the AI backlog was high, oldest first. "
+        "Runs the models in this process, so it can act as a dedicated catch-up worker."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=10)
+        parser.add_argument('--loop', action='store_true', help="Keep polling instead of exiting once nothing is deferred.")
+        parser.add_argument('--poll-seconds', type=float, default=30)
+        parser.add_argument('--force', action='store_true', help="Run even while the request path is still deferring.")
+
+    def handle(self, *args, **options):
+        total = 0
+        while True:
+            claimed = [] if not options['force'] and workers_behind(analysis_backlog(fresh=True)) else claim_deferred(options['batch_size'])
+            for report_id in claimed: analyze_report_image_task(report_id, timezone.now())
+            total += len(claimed)
+            if claimed: self.stdout.write(f"Analysed {len(claimed)} deferred report(s).")
+            if not claimed:
+                if not options['loop']: break
+                time.sleep(options['poll_seconds'])
+        self.stdout.write(f"Done: {total} report(s) analysed.")
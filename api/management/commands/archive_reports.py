@@ -0,0 +1,33 @@
+# api/management/commands/archive_reports.py
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from api.archive import archivable_reports, archive_reports
+
+class Command(BaseCommand):
+    help = (
+        "Moves Closed reports untouched for --older-than-days, with their updates, into the "
+        "compressed archive tables. Archived reports stay readable through the detail and PDF endpoints."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--older-than-days', type=int, default=settings.REPORT_ARCHIVE_AFTER_DAYS)
+        parser.add_argument('--batch-size', type=int, default=500, help="Reports moved per transaction.")
+        parser.add_argument('--dry-run', action='store_true', help="Count archivable reports without moving them.")
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options['older_than_days'])
+        if options['dry_run']:
+            self.stdout.write(f"{archivable_reports(cutoff).count()} report(s) would be archived.")
+            return
+        archived = 0
+        while True:
+            # Short transactions, so live traffic is only blocked for one batch at a time.
+            batch = list(archivable_reports(cutoff).order_by('id').values_list('id', flat=True)[:options['batch_size']])
+            if not batch: break
+            archived += archive_reports(batch)
+            self.stdout.write(f"Archived {archived} report(s) so far.")
+        self.stdout.write(self.style.SUCCESS(f"Archived {archived} report(s)."))
@@ -0,0 +1,28 @@
+# api/management/commands/cluster_suggestions.py
+from django.core.management.base import BaseCommand
+
+from api.minhash import cluster_suggestion
+from api.models import Suggestion, SuggestionBucket, SuggestionCluster
+
+class Command(BaseCommand):
+    help = (
+        "Clusters suggestions that are not indexed yet (e.g. created before clustering existed). "
+        "New suggestions are clustered as they are created. Use --rebuild after changing the similarity threshold."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rebuild', action='store_true', help="Drop all clusters and LSH buckets and cluster every suggestion again.")
+
+    def handle(self, *args, **options):
+        if options['rebuild']:
+            SuggestionBucket.objects.all().delete()
+            Suggestion.objects.update(cluster=None, minhash=None)
+            SuggestionCluster.objects.all().delete()
+        pending = Suggestion.objects.filter(minhash__isnull=True).order_by('created_at', 'id').only('id', 'suggestion_text', 'created_at')
+        clustered = 0
+        # Clustered suggestions drop out of `pending`, so each batch is simply its head.
+        while batch := list(pending[:1000]):
+            for suggestion in batch: cluster_suggestion(suggestion)
+            clustered += len(batch)
+            self.stdout.write(f"Clustered {clustered} suggestion(s)...")
+        self.stdout.write(self.style.SUCCESS(f"Clustered {clustered} suggestion(s) into {SuggestionCluster.objects.count()} cluster(s)."))
@@ -0,0 +1,68 @@
+# api/management/commands/gc_media_blobs.py
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from api.models import ArchivedReport, ArchivedReportUpdate, MediaBlob, Report, ReportUpdate
+from api.storage import is_blob
+
+class Command(BaseCommand):
+    help = (
+        "Recounts media blob references and deletes blobs no live or archived report or update uses any more. "
+        "Safe to run while uploads continue: blobs referenced within MEDIA_BLOB_GC_GRACE_SECONDS are left alone."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help="Report what would be deleted without deleting.")
+
+    def handle(self, *args, **options):
+        dry_run = options['dry_run']
+        # Blobs referenced before the cutoff cannot belong to a save still in flight.
+        cutoff = timezone.now() - timedelta(seconds=settings.MEDIA_BLOB_GC_GRACE_SECONDS)
+
+        # Recount from the source of truth, which also repairs counts left by failed saves.
+        references = Counter()
+        for model in (Report, ReportUpdate, ArchivedReport, ArchivedReportUpdate):
+            for field in ('image', 'thumbnail'):
+                names = model.objects.exclude(**{field: ''}).exclude(**{f'{field}__isnull': True}).values_list(field, flat=True)
+                for name in names.iterator(chunk_size=2000):
+                    if is_blob(name): references[name] += 1
+
+        # Counts change concurrently (uploads add, deletes release), so never write back a
+        # stale value: raise under-counts, and lower a count only if it is unchanged since
+        # it was read and the blob has not been referenced within the grace period.
+        fixed, orphans = 0, []
+        for blob in MediaBlob.objects.only('id', 'name', 'ref_count', 'size', 'created_at', 'last_referenced_at').iterator(chunk_size=2000):
+            actual, settled = references.get(blob.name, 0), blob.last_referenced_at < cutoff
+            if actual > blob.ref_count:
+                repair = MediaBlob.objects.filter(pk=blob.pk, ref_count__lt=actual)
+            elif actual < blob.ref_count and settled:
+                repair = MediaBlob.objects.filter(pk=blob.pk, ref_count=blob.ref_count, last_referenced_at=blob.last_referenced_at)
+            else:
+                repair = None
+            if repair is not None: fixed += 1 if dry_run else repair.update(ref_count=actual)
+            if actual == 0 and settled and blob.created_at < cutoff: orphans.append(blob)
+
+        deleted, freed = 0, 0
+        for blob in orphans:
+            if dry_run:
+                deleted, freed = deleted + 1, freed + blob.size
+                continue
+            with transaction.atomic():
+                # Locked and re-checked: an upload adding a reference now either committed
+                # first (so the row no longer matches) or waits and finds the row gone.
+                locked = MediaBlob.objects.select_for_update().filter(
+                    pk=blob.pk, ref_count=0, created_at__lt=cutoff, last_referenced_at__lt=cutoff,
+                ).first()
+                if locked is None: continue
+                default_storage.delete(locked.name)
+                locked.delete()
+            deleted, freed = deleted + 1, freed + blob.size
+
+        verb = "Would delete" if dry_run else "Deleted"
+        self.stdout.write(f"Corrected {fixed} reference count(s). {verb} {deleted} blob(s), {freed / 1024 / 1024:.1f} MB.")
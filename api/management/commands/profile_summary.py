@@ -0,0 +1,63 @@
+# api/management/commands/profile_summary.py
+import glob
+import io
+import json
+import os
+import pstats
+import re
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+def normalize_sql(sql):
+    """Collapses literals and IN lists so the same query shape groups together."""
+    sql = re.sub(r"'(?:[^']|'')*'", '?', sql)
+    sql = re.sub(r'\b\d+(?:\.\d+)?\b', '?', sql)
+    sql = re.sub(r'\(\s*(?:%s|\?)(?:\s*,\s*(?:%s|\?))*\s*\)', '(...)', sql)
+    return ' '.join(sql.split())
+
+class Command(BaseCommand):
+    help = "Summarises requests captured by ProfilingMiddleware: slowest routes, hottest functions and SQL."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dir', default=str(settings.PROFILING_DIR), help="Directory holding the captures.")
+        parser.add_argument('--route', help="Only captures of this URL name.")
+        parser.add_argument('--top', type=int, default=20, help="Rows per section.")
+        parser.add_argument('--sort', choices=['cumulative', 'tottime', 'ncalls'], default='cumulative')
+
+    def handle(self, *args, **options):
+        captures = []
+        for path in sorted(glob.glob(os.path.join(options['dir'], '*.json'))):
+            with open(path) as f: capture = json.load(f)
+            prof = path[:-len('.json')] + '.prof'
+            if os.path.exists(prof) and (not options['route'] or capture.get('route') == options['route']):
+                captures.append((capture, prof))
+        if not captures: raise CommandError(f"No profiles found in {options['dir']}.")
+        top = options['top']
+
+        self.stdout.write(self.style.MIGRATE_HEADING(f"{len(captures)} capture(s) by route"))
+        routes = defaultdict(list)
+        for capture, _ in captures: routes[capture.get('route') or capture['path']].append(capture)
+        for route, items in sorted(routes.items(), key=lambda item: -max(c['duration_ms'] for c in item[1])):
+            durations = [c['duration_ms'] for c in items]
+            self.stdout.write(
+                f"  {route}: {len(items)} capture(s), avg {sum(durations) / len(durations):.1f} ms, max {max(durations):.1f} ms, "
+                f"avg {sum(c['query_count'] for c in items) / len(items):.1f} queries / {sum(c['query_ms'] for c in items) / len(items):.1f} ms SQL"
+            )
+
+        self.stdout.write(self.style.MIGRATE_HEADING(f"\nTop {top} functions by {options['sort']} (all captures merged)"))
+        buffer = io.StringIO()
+        stats = pstats.Stats(*[prof for _, prof in captures], stream=buffer)
+        stats.strip_dirs().sort_stats(options['sort']).print_stats(top)
+        self.stdout.write(buffer.getvalue().lstrip('\n'))
+
+        self.stdout.write(self.style.MIGRATE_HEADING(f"Top {top} SQL statements by total time"))
+        sql = defaultdict(lambda: [0, 0.0])
+        for capture, _ in captures:
+            for query in capture['queries']:
+                entry = sql[normalize_sql(query['sql'])]
+                entry[0] += 1
+                entry[1] += query['ms']
+        for statement, (count, total_ms) in sorted(sql.items(), key=lambda item: -item[1][1])[:top]:
+            self.stdout.write(f"  {total_ms:9.1f} ms  {count:6d}x  {statement[:200]}")
@@ -0,0 +1,22 @@
+# api/management/commands/prune_report_uploads.py
+from django.core.management.base import BaseCommand
+
+from api.uploads import expired_uploads
+
+class Command(BaseCommand):
+    help = "Deletes resumable report uploads idle for longer than REPORT_UPLOAD_EXPIRY_HOURS, with their partial files."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help="Report what would be deleted without deleting.")
+
+    def handle(self, *args, **options):
+        uploads = expired_uploads()
+        if options['dry_run']:
+            self.stdout.write(f"Would delete {uploads.count()} upload(s).")
+            return
+        # Deleted one by one so the post_delete signal removes each partial file.
+        deleted = 0
+        for upload in uploads.iterator():
+            upload.delete()
+            deleted += 1
+        self.stdout.write(f"Deleted {deleted} upload(s).")
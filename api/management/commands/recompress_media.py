@@ -0,0 +1,142 @@
+# api/management/commands/recompress_media.py
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from PIL import features
+
+from api.imaging import lower_worker_priority, reencode_image
+from api.models import MediaRecompression, Report, ReportUpdate
+from api.storage import adjust_blob_refs, is_blob, release_blob
+
+class Command(BaseCommand):
+    help = (
+        "Re-encodes photos of Closed reports older than --age-days into compact WebP/AVIF "
+        "at bounded dimensions, adds thumbnails and records the bytes saved. Safe to stop "
+        "and re-run: processed originals are skipped."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--age-days', type=int, default=settings.MEDIA_RECOMPRESS_AGE_DAYS)
+        parser.add_argument('--format', choices=['webp', 'avif'], default=settings.MEDIA_RECOMPRESS_FORMAT)
+        parser.add_argument('--max-dimension', type=int, default=settings.MEDIA_RECOMPRESS_MAX_DIMENSION)
+        parser.add_argument('--quality', type=int, default=settings.MEDIA_RECOMPRESS_QUALITY)
+        parser.add_argument('--thumbnail-size', type=int, default=settings.MEDIA_THUMBNAIL_SIZE)
+        parser.add_argument('--workers', type=int, default=max((os.cpu_count() or 2) // 2, 1))
+        parser.add_argument('--max-per-minute', type=int, default=0, help="Throttle: images per minute (0 = unlimited).")
+        parser.add_argument('--limit', type=int, default=0, help="Stop after this many images (0 = all).")
+        parser.add_argument('--dry-run', action='store_true', help="List candidate images without changing anything.")
+
+    def handle(self, *args, **options):
+        image_format = options['format'].upper()
+        if not features.check(options['format']):
+            raise CommandError(f"This Pillow build cannot encode {image_format}.")
+
+        rows, reuse = self.candidates(options['age_days'])
+        candidates = sorted(rows)
+        if options['limit']: candidates = candidates[:options['limit']]
+        self.stdout.write(f"{len(candidates)} image(s) to recompress, {len(reuse)} already recompressed for other rows.")
+        if options['dry_run']:
+            for name in candidates: self.stdout.write(f"  {name}")
+            return
+        # Rows that became eligible after their (shared) original was processed.
+        for name, (selected, record) in reuse.items():
+            self.repoint(name, selected, record.new_name, record.thumbnail_name, counted=0)
+        if not candidates: return
+
+        work_dir = os.path.join(settings.MEDIA_ROOT, '.incoming')
+        os.makedirs(work_dir, exist_ok=True)
+        jobs = [{
+            'name': name, 'path': default_storage.path(name), 'work_dir': work_dir, 'format': image_format,
+            'max_dimension': options['max_dimension'], 'quality': options['quality'], 'thumbnail_size': options['thumbnail_size'],
+        } for name in candidates]
+
+        # Work in batches of one image per worker; sleeping between batches keeps
+        # the rate under --max-per-minute while web workers serve live traffic.
+        batch_size = options['workers']
+        min_batch_seconds = 60 * batch_size / options['max_per_minute'] if options['max_per_minute'] else 0
+        processed = saved = 0
+        with ProcessPoolExecutor(max_workers=options['workers'], initializer=lower_worker_priority) as pool:
+            for start in range(0, len(jobs), batch_size):
+                batch_started = time.monotonic()
+                batch = jobs[start:start + batch_size]
+                for job, result in zip(batch, pool.map(reencode_image, batch)):
+                    saved += self.apply_result(job['name'], rows[job['name']], result)
+                    processed += 1
+                self.stdout.write(f"{processed}/{len(jobs)} done, {saved / 1024 / 1024:.1f} MB saved so far.")
+                elapsed = time.monotonic() - batch_started
+                if elapsed < min_batch_seconds: time.sleep(min_batch_seconds - elapsed)
+        self.stdout.write(self.style.SUCCESS(f"Recompressed {processed} image(s), saved {saved / 1024 / 1024:.1f} MB."))
+
+    def candidates(self, age_days):
+        """
+        Photos of old Closed reports and their updates, as ({original name: {model: [pks]}}
+        for originals not processed yet, {original name: (rows, MediaRecompression)} for
+        rows whose original was already recompressed for other rows). A deduplicated
+        blob can be shared with open reports, so rows are selected by pk, not by name.
+        """
+        cutoff = timezone.now() - timedelta(days=age_days)
+        closed = Report.objects.filter(status='Closed', updated_at__lt=cutoff)
+        rows = {}
+        for model, queryset in ((Report, closed), (ReportUpdate, ReportUpdate.objects.filter(report__in=closed))):
+            for pk, name in queryset.exclude(image='').exclude(image__isnull=True).values_list('pk', 'image'):
+                if not name.lower().endswith(('.webp', '.avif')): rows.setdefault(name, {Report: [], ReportUpdate: []})[model].append(pk)
+        outputs = set(MediaRecompression.objects.filter(new_name__in=rows).values_list('new_name', flat=True))
+        reuse = {}
+        for record in MediaRecompression.objects.filter(original_name__in=rows):
+            selected = rows.pop(record.original_name)
+            # Reused only while the re-encoded blobs exist; gc_media_blobs removes them once unreferenced.
+            if record.new_name and default_storage.exists(record.new_name) and default_storage.exists(record.thumbnail_name):
+                reuse[record.original_name] = (selected, record)
+        return {name: selected for name, selected in rows.items() if name not in outputs}, reuse
+
+    def apply_result(self, name, rows, result):
+        """Stores the re-encoded blobs and repoints the selected rows using `name`. Returns bytes saved."""
+        temp_paths = [result.get('encoded_path'), result.get('thumbnail_path')]
+        try:
+            if 'error' in result:
+                MediaRecompression.objects.create(original_name=name, original_bytes=result['original_bytes'], skipped_reason=result['error'][:255])
+                return 0
+            if result['encoded_bytes'] >= result['original_bytes']:
+                MediaRecompression.objects.create(original_name=name, original_bytes=result['original_bytes'], skipped_reason="Re-encoded file was not smaller.")
+                return 0
+            with open(result['encoded_path'], 'rb') as f: new_name = default_storage.save(os.path.basename(result['encoded_path']), File(f))
+            with open(result['thumbnail_path'], 'rb') as f: thumbnail_name = default_storage.save(os.path.basename(result['thumbnail_path']), File(f))
+
+            with transaction.atomic():
+                # Storage.save counted one reference each; the rows repointed below are the real ones.
+                self.repoint(name, rows, new_name, thumbnail_name, counted=1)
+                MediaRecompression.objects.create(
+                    original_name=name, new_name=new_name, thumbnail_name=thumbnail_name,
+                    original_bytes=result['original_bytes'], new_bytes=result['encoded_bytes'],
+                )
+            return result['original_bytes'] - result['encoded_bytes']
+        finally:
+            for path in temp_paths:
+                if path and os.path.exists(path): os.unlink(path)
+
+    def repoint(self, name, rows, new_name, thumbnail_name, counted):
+        """
+        Points the selected rows that still use `name` (and still qualify) at the re-encoded
+        blobs, and moves their blob references; `counted` references were already added by
+        saving the new files. Other rows sharing the original are left untouched.
+        """
+        with transaction.atomic():
+            references = Report.objects.filter(pk__in=rows[Report], image=name, status='Closed').update(image=new_name, thumbnail=thumbnail_name)
+            references += ReportUpdate.objects.filter(pk__in=rows[ReportUpdate], image=name, report__status='Closed').update(image=new_name, thumbnail=thumbnail_name)
+            adjust_blob_refs(new_name, references - counted)
+            adjust_blob_refs(thumbnail_name, references - counted)
+            release_blob(name, references)
+            # Blobs are deleted by gc_media_blobs; a pre-blob file goes once nothing uses it.
+            if not is_blob(name) and references: transaction.on_commit(lambda: self.delete_if_unused(name))
+        return references
+
+    def delete_if_unused(self, name):
+        if not any(model.objects.filter(image=name).exists() for model in (Report, ReportUpdate)): default_storage.delete(name)
@@ -0,0 +1,241 @@
+# api/management/commands/seed_data.py
+import io
+import random
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, time, timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from PIL import Image
+
+from api.ai_service import determine_classification_and_suggestion
+from api.clustering import compute_image_hash
+from api.models import Profile, Report, ReportUpdate, Suggestion
+from api.storage import adjust_blob_refs
+
+SEED_DOMAIN = 'seed.urjasetu.test'
+PASSWORD = 'Password123'
+
+# (name, lat, lng, weight): reports cluster around the big cities, scattered by a few km.
+CITIES = [
+    ('Ahmedabad', 23.0225, 72.5714, 30), ('Surat', 21.1702, 72.8311, 22), ('Vadodara', 22.3072, 73.1812, 10),
+    ('Rajkot', 22.3039, 70.8022, 8), ('Bhavnagar', 21.7645, 72.1519, 4), ('Jamnagar', 22.4707, 70.0577, 4),
+    ('Gandhinagar', 23.2156, 72.6369, 4), ('Junagadh', 21.5222, 70.4579, 3), ('Anand', 22.5645, 72.9289, 3),
+    ('Navsari', 20.9467, 72.9520, 2), ('Mehsana', 23.5880, 72.3693, 2), ('Bhuj', 23.2420, 69.6669, 2),
+    ('Morbi', 22.8173, 70.8377, 2), ('Nadiad', 22.6916, 72.8634, 2), ('Vapi', 20.3893, 72.9106, 2),
+]
+# Share of reports in villages, spread over the state rather than around a city.
+RURAL_SHARE = 0.12
+RURAL_BOX = ((20.6, 24.2), (69.0, 74.2))
+
+DETECTIONS = [
+    ({'Transformer'}, 18), ({'Transformer', 'Damaged Transformer'}, 6), ({'Electric Pole'}, 20),
+    ({'Electric Pole', 'Leaning Pole'}, 8), ({'Electric Pole', 'Broken Pole'}, 3), ({'Fallen Line'}, 5),
+    ({'Transformer', 'Sparks'}, 3), ({'Fire'}, 1), ({'Electric Pole', 'Vegetation Overgrowth'}, 9), (set(), 6),
+]
+CATEGORIES = [('Safety Hazard', 35), ('Maintenance', 45), ('Power Theft', 5), ('Other', 15)]
+PRIORITIES = [('High', 20), ('Medium', 50), ('Low', 30)]
+SPECIALIZATIONS = ['Line Repair', 'Transformer Maintenance', 'Pole Replacement', 'Tree Trimming', 'Emergency Response']
+DESCRIPTIONS = [
+    "Sparks coming from the transformer near {place}.", "Tree branch lying on the power lines near {place}.",
+    "Streetlight out for {n} days near {place}.", "Electric pole leaning dangerously after the storm near {place}.",
+    "Meter box broken and open outside {place}.", "Wires hanging very low over the footpath near {place}.",
+    "Frequent power cuts in the area around {place}.", "Transformer making a loud humming noise near {place}.",
+]
+PLACES = ['the main park', 'the bus stand', 'the school', 'the temple', 'the market', 'the railway crossing', 'the hospital', 'the society gate']
+REMARKS = [
+    "Acknowledged. On my way to the site for initial inspection.",
+    "Site inspected. The issue is confirmed. Required equipment has been requested.",
+    "Work is in progress. Estimated time to resolution is 2 hours.",
+    "Replaced the damaged component and tested the supply.",
+    "The issue has been resolved. Closing the task from my end.",
+]
+IDEAS = [
+    "Install solar panels on government buildings", "Send SMS alerts before planned power cuts",
+    "Add more EV charging stations in {city}", "Replace old street lights with LED lights in {city}",
+    "Show live outage maps in the app", "Allow paying electricity bills through UPI in the app",
+    "Trim trees near power lines before the monsoon", "Put covers on open meter boxes in {city}",
+    "Offer subsidies for rooftop solar in {city}", "Give complaint numbers by SMS after reporting",
+]
+IDEA_VARIANTS = ['{idea}', '{idea}.', 'Please {idea_lower}', '{idea} as soon as possible', 'I suggest we {idea_lower}', '{idea}!!']
+
+def _weighted(rng, pairs):
+    return rng.choices([value for value, _ in pairs], weights=[weight for _, weight in pairs])[0]
+
+def _point(rng):
+    if rng.random() < RURAL_SHARE:
+        return rng.uniform(*RURAL_BOX[0]), rng.uniform(*RURAL_BOX[1]), 'village'
+    name, lat, lng, _ = rng.choices(CITIES, weights=[city[3] for city in CITIES])[0]
+    return rng.gauss(lat, 0.04), rng.gauss(lng, 0.04), name
+
+def _status(rng, age_days):
+    """Older reports are mostly closed; recent ones are still moving through the workflow."""
+    if age_days > 30: return _weighted(rng, [('Closed', 70), ('Resolved', 25), ('In Progress', 3), ('Assigned', 2)])
+    if age_days > 3: return _weighted(rng, [('Closed', 25), ('Resolved', 35), ('In Progress', 20), ('Assigned', 15), ('Received', 5)])
+    return _weighted(rng, [('Resolved', 10), ('In Progress', 20), ('Assigned', 25), ('Received', 35), ('Pending Analysis', 10)])
+
+def _created_at(rng, until, days):
+    # More reports by day than at night.
+    day = until - timedelta(days=int(rng.random() * days) + 1)
+    hour = rng.choices(range(24), weights=[1, 1, 1, 1, 1, 2, 4, 6, 8, 9, 9, 9, 8, 8, 8, 8, 9, 9, 8, 7, 5, 4, 2, 1])[0]
+    return day + timedelta(hours=hour, seconds=rng.randrange(3600))
+
+def _uuid(rng):
+    return uuid.UUID(int=rng.getrandbits(128), version=4)
+
+@contextmanager
+def explicit_timestamps(*models):
+    """bulk_create would overwrite auto_now/auto_now_add values with now(); switch them off meanwhile."""
+    fields = [field for model in models for field in model._meta.concrete_fields if getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False)]
+    saved = [(field, field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields: field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in saved: field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+class Command(BaseCommand):
+    help = (
+        "Seeds large volumes of realistic synthetic data (users, reports, updates, suggestions) with bulk_create. "
+        f"Seeded users have @{SEED_DOMAIN} emails and the password '{PASSWORD}'. Output is deterministic for a "
+        "given --seed and --until."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--citizens', type=int, default=5000)
+        parser.add_argument('--technicians', type=int, default=300)
+        parser.add_argument('--admins', type=int, default=5)
+        parser.add_argument('--reports', type=int, default=100000)
+        parser.add_argument('--suggestions', type=int, default=20000)
+        parser.add_argument('--images', type=int, default=8, help="Distinct sample images shared by all reports (0 = no images).")
+        parser.add_argument('--days', type=int, default=730, help="Spread report timestamps over this many days.")
+        parser.add_argument('--until', default=None, help="Last day of generated data, YYYY-MM-DD (default: today).")
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--flush', action='store_true', help=f"Delete previously seeded @{SEED_DOMAIN} users and their data first.")
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        until = datetime.strptime(options['until'], '%Y-%m-%d').date() if options['until'] else timezone.localdate()
+        until = timezone.make_aware(datetime.combine(until, time.min)) + timedelta(days=1)
+        self.batch_size = options['batch_size']
+
+        if options['flush']:
+            # The cascade sends post_delete for every report and update, and those receivers
+            # (api/signals.py) release the sample blobs' references; no adjustment needed here.
+            deleted, _ = User.objects.filter(email__endswith=f'@{SEED_DOMAIN}').delete()
+            self.stdout.write(f"Deleted {deleted} seeded row(s).")
+        elif User.objects.filter(email__endswith=f'@{SEED_DOMAIN}').exists():
+            raise CommandError("Seeded users already exist; use --flush to replace them.")
+
+        with explicit_timestamps(Profile, Report, ReportUpdate, Suggestion):
+            users = self.seed_users(rng, options, until)
+            images = self.seed_images(rng, options['images'])
+            self.seed_reports(rng, options, until, users, images)
+            self.seed_suggestions(rng, options, until, users['citizen'])
+        self.stdout.write(self.style.SUCCESS("Seeding complete. Run `manage.py cluster_suggestions` to cluster the new suggestions."))
+
+    def seed_users(self, rng, options, until):
+        # Hashing is deliberately slow; every seeded user shares one hash.
+        password = make_password(PASSWORD, salt=f"seed{options['seed']}")
+        users = {}
+        for role in ('citizen', 'technician', 'admin'):
+            count = options[f'{role}s']
+            with transaction.atomic():
+                created = User.objects.bulk_create([
+                    User(username=f'{role}{i}@{SEED_DOMAIN}', email=f'{role}{i}@{SEED_DOMAIN}', password=password,
+                         date_joined=until - timedelta(days=options['days'] + 30))
+                    for i in range(count)
+                ], batch_size=self.batch_size)
+                profiles = []
+                for i, user in enumerate(created):
+                    lat, lng, city = _point(rng)
+                    profiles.append(Profile(
+                        user=user, role=role, full_name=f'{role.title()} {i} ({city})', phone_number=f'9{rng.randrange(10 ** 9):09d}',
+                        updated_at=until, specialization=rng.choice(SPECIALIZATIONS) if role == 'technician' else None,
+                        base_latitude=round(lat, 6) if role == 'technician' else None, base_longitude=round(lng, 6) if role == 'technician' else None,
+                        employee_id=f'SEED-{role[0].upper()}{i:06d}' if role != 'citizen' else None,
+                    ))
+                Profile.objects.bulk_create(profiles, batch_size=self.batch_size)
+            users[role] = [user.pk for user in created]
+            self.stdout.write(f"Created {count} {role}(s).")
+        return users
+
+    def seed_images(self, rng, count):
+        """Stores a few sample photos once; reports reuse them, so upload and hashing happen once per image."""
+        images = []
+        for i in range(count):
+            img = Image.new('RGB', (640, 480), tuple(rng.randrange(256) for _ in range(3)))
+            img.putdata([tuple(rng.randrange(256) for _ in range(3)) for _ in range(64 * 48)] * 100)
+            buffer = io.BytesIO()
+            img.save(buffer, 'JPEG', quality=80)
+            name = default_storage.save(f'reports/seed/sample{i}.jpg', ContentFile(buffer.getvalue()))
+            buffer.seek(0)
+            images.append({'name': name, 'hash': compute_image_hash(buffer), 'uses': 0})
+        return images
+
+    def seed_reports(self, rng, options, until, users, images):
+        total, done, updates_done = options['reports'], 0, 0
+        while done < total:
+            reports, plans = [], []
+            for _ in range(min(self.batch_size, total - done)):
+                created_at = _created_at(rng, until, options['days'])
+                status = _status(rng, (until - created_at).days)
+                lat, lng, city = _point(rng)
+                detected = _weighted(rng, DETECTIONS)
+                analysed = status != 'Pending Analysis'
+                ai = determine_classification_and_suggestion(detected) if analysed else {}
+                technician = rng.choice(users['technician']) if status not in ('Received', 'Pending Analysis') and users['technician'] else None
+                resolved_at = created_at + timedelta(hours=rng.lognormvariate(3, 1)) if status in ('Resolved', 'Closed') else None
+                if resolved_at and resolved_at > until: resolved_at = until
+                updated_at = resolved_at + timedelta(days=rng.uniform(0, 7)) if status == 'Closed' else (resolved_at or created_at + timedelta(minutes=rng.uniform(1, 600)))
+                image = rng.choice(images) if images else None
+                if image: image['uses'] += 1
+                reports.append(Report(
+                    upload_id=_uuid(rng), citizen_id=rng.choice(users['citizen']), assigned_technician_id=technician,
+                    category=_weighted(rng, CATEGORIES), description=rng.choice(DESCRIPTIONS).format(place=rng.choice(PLACES), n=rng.randint(2, 9)),
+                    image=image['name'] if image else None, image_hash=image['hash'] if image else None,
+                    latitude=round(lat, 6), longitude=round(lng, 6), address=f"{rng.randint(1, 400)} {rng.choice(PLACES).title()} Road, {city.title()}",
+                    status=status, ai_classification=ai.get('ai_classification'), ai_suggestion=ai.get('ai_suggestion'),
+                    ai_priority=_weighted(rng, PRIORITIES) if analysed else None,
+                    created_at=created_at, updated_at=min(updated_at, until), resolved_at=resolved_at,
+                ))
+                remark_count = {'Assigned': rng.randint(0, 1), 'In Progress': rng.randint(1, 2)}.get(status, rng.randint(2, 4)) if technician else 0
+                plans.append((technician, created_at, resolved_at or min(updated_at, until), remark_count))
+
+            with transaction.atomic():
+                Report.objects.bulk_create(reports, batch_size=self.batch_size)
+                updates = []
+                for report, (technician, start, end, remark_count) in zip(reports, plans):
+                    for step in range(remark_count):
+                        at = start + (end - start) * (step + 1) / (remark_count + 1)
+                        updates.append(ReportUpdate(report_id=report.pk, technician_id=technician, remark=REMARKS[min(step, len(REMARKS) - 1)], created_at=at, updated_at=at))
+                ReportUpdate.objects.bulk_create(updates, batch_size=self.batch_size)
+            done += len(reports)
+            updates_done += len(updates)
+            self.stdout.write(f"Reports: {done}/{total} ({updates_done} updates)")
+
+        # One reference per report using a sample image (storage.save counted one already).
+        for image in images: adjust_blob_refs(image['name'], image['uses'] - 1)
+
+    def seed_suggestions(self, rng, options, until, citizens):
+        total, done = options['suggestions'], 0
+        while done < total:
+            batch = []
+            for _ in range(min(self.batch_size, total - done)):
+                idea = rng.choice(IDEAS).format(city=rng.choice(CITIES)[0])
+                text = rng.choice(IDEA_VARIANTS).format(idea=idea, idea_lower=idea[0].lower() + idea[1:])
+                created_at = _created_at(rng, until, options['days'])
+                batch.append(Suggestion(
+                    citizen_id=rng.choice(citizens), suggestion_text=text, created_at=created_at, updated_at=created_at,
+                    status=_weighted(rng, [('Submitted', 70), ('In Review', 15), ('Implemented', 5), ('Archived', 10)]),
+                ))
+            Suggestion.objects.bulk_create(batch, batch_size=self.batch_size)
+            done += len(batch)
+            self.stdout.write(f"Suggestions: {done}/{total}")
@@ -0,0 +1,20 @@
+# api/management/commands/send_outbox.py
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from api.outbox import drain_outbox
+
+class Command(BaseCommand):
+    help = "Sends queued emails from the outbox. Use --loop to run as a long-lived worker."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true', help="Keep polling instead of exiting once the outbox is empty.")
+
+    def handle(self, *args, **options):
+        while True:
+            sent = drain_outbox()
+            if sent: self.stdout.write(f"Processed {sent} email(s).")
+            if not options['loop']: break
+            time.sleep(settings.EMAIL_OUTBOX_POLL_SECONDS)
@@ -0,0 +1,116 @@
+# api/media.py
+import mimetypes
+import os
+import re
+import time
+
+from django.conf import settings
+from django.http import FileResponse, HttpResponse, HttpResponseNotModified, StreamingHttpResponse
+from django.utils.crypto import constant_time_compare, salted_hmac
+from django.utils.http import http_date, parse_http_date_safe
+
+from .storage import is_blob
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# ================================================================
+# SIGNED MEDIA URLS
+# ================================================================
+# Media URLs handed out in API responses carry a signature, so <img> tags work
+# without an Authorization header. The signature covers a time bucket rather
+# than an exact expiry, so the URL stays identical (and browser-cacheable) for
+# MEDIA_URL_SIGNATURE_TTL seconds; the previous bucket is still accepted.
+
+def _signature(name, bucket):
+    return salted_hmac('api.media', f'{name}:{bucket}').hexdigest()[:32]
+
+def signed_query(name):
+    bucket = int(time.time() // settings.MEDIA_URL_SIGNATURE_TTL)
+    return f'e={bucket}&s={_signature(name, bucket)}'
+
+def has_valid_signature(name, bucket, signature):
+    try: bucket = int(bucket)
+    except (TypeError, ValueError): return False
+    current = int(time.time() // settings.MEDIA_URL_SIGNATURE_TTL)
+    return bucket in (current, current - 1) and constant_time_compare(_signature(name, bucket), signature or '')
+
+# ================================================================
+# RESPONSES
+# ================================================================
+
+def _cache_headers(response, name, stat):
+    if is_blob(name):
+        # Blob paths are content hashes: the bytes behind a name never change.
+        response['Cache-Control'] = f'private, max-age={settings.MEDIA_IMMUTABLE_MAX_AGE}, immutable'
+        response['ETag'] = f'"{os.path.splitext(os.path.basename(name))[0]}"'
+    else:
+        response['Cache-Control'] = f'private, max-age={settings.MEDIA_MUTABLE_MAX_AGE}'
+        response['ETag'] = f'"{int(stat.st_mtime)}-{stat.st_size}"'
+    response['Last-Modified'] = http_date(stat.st_mtime)
+    response['Accept-Ranges'] = 'bytes'
+    return response
+
+def _not_modified(request, name, stat):
+    etag = f'"{os.path.splitext(os.path.basename(name))[0]}"' if is_blob(name) else f'"{int(stat.st_mtime)}-{stat.st_size}"'
+    if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+    if if_none_match:
+        return etag in [tag.strip() for tag in if_none_match.split(',')] or if_none_match.strip() == '*'
+    if_modified_since = parse_http_date_safe(request.META.get('HTTP_IF_MODIFIED_SINCE', ''))
+    return if_modified_since is not None and int(stat.st_mtime) <= if_modified_since
+
+def _parse_range(header, size):
+    """Returns (start, end) inclusive for a single byte range, None if absent, or False if unsatisfiable."""
+    if not header: return None
+    match = RANGE_RE.match(header.strip())
+    if not match or (not match.group(1) and not match.group(2)): return None  # Multi-range or malformed: send whole file
+    if match.group(1):
+        start = int(match.group(1))
+        end = min(int(match.group(2)), size - 1) if match.group(2) else size - 1
+    else:
+        start, end = max(size - int(match.group(2)), 0), size - 1
+    if start >= size or start > end: return False
+    return start, end
+
+def _iter_range(path, start, length):
+    with open(path, 'rb') as f:
+        f.seek(start)
+        while length > 0:
+            chunk = f.read(min(STREAM_CHUNK_SIZE, length))
+            if not chunk: break
+            length -= len(chunk)
+            yield chunk
+
+def serve_media_file(request, name, path):
+    """
+    Returns the response for an already-authorised media file: an X-Accel-Redirect
+    or X-Sendfile header for the front proxy when configured, otherwise a
+    FileResponse with conditional GET, single-range support and cache headers.
+    """
+    stat = os.stat(path)
+    content_type = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+
+    if settings.MEDIA_ACCEL_REDIRECT_PREFIX:
+        response = HttpResponse(content_type=content_type)
+        response['X-Accel-Redirect'] = settings.MEDIA_ACCEL_REDIRECT_PREFIX.rstrip('/') + '/' + name
+        return _cache_headers(response, name, stat)
+    if settings.MEDIA_X_SENDFILE:
+        response = HttpResponse(content_type=content_type)
+        response['X-Sendfile'] = path
+        return _cache_headers(response, name, stat)
+
+    if _not_modified(request, name, stat):
+        return _cache_headers(HttpResponseNotModified(), name, stat)
+
+    byte_range = _parse_range(request.META.get('HTTP_RANGE'), stat.st_size)
+    if byte_range is False:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{stat.st_size}'
+        return response
+    if byte_range:
+        start, end = byte_range
+        response = StreamingHttpResponse(_iter_range(path, start, end - start + 1), status=206, content_type=content_type)
+        response['Content-Length'] = str(end - start + 1)
+        response['Content-Range'] = f'bytes {start}-{end}/{stat.st_size}'
+        return _cache_headers(response, name, stat)
+    return _cache_headers(FileResponse(open(path, 'rb'), content_type=content_type), name, stat)
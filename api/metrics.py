@@ -0,0 +1,182 @@
+# api/metrics.py
+import bisect
+import threading
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.http import HttpResponse, HttpResponseForbidden
+from django.utils.crypto import constant_time_compare
+
+# ================================================================
+# METRIC TYPES
+# ================================================================
+# A minimal in-process registry rendering the Prometheus text format (0.0.4).
+# Each worker process keeps its own values, like prometheus_client without its
+# multiprocess mode, so scrape every worker or run one worker per target.
+
+REGISTRY = []
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+def _labels(names, values, extra=None):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra: pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+class _Metric:
+    kind = ''
+
+    def __init__(self, name, help_text, labelnames=()):
+        self.name, self.help_text, self.labelnames = name, help_text, tuple(labelnames)
+        self._series = {}
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} {self.kind}']
+        with self._lock:
+            series = {labels: (list(value) if isinstance(value, list) else value) for labels, value in self._series.items()}
+        for labels, value in sorted(series.items()):
+            lines.extend(self._render_series(labels, value))
+        return lines
+
+    def _render_series(self, labels, value):
+        return [f'{self.name}{_labels(self.labelnames, labels)} {value}']
+
+class Counter(_Metric):
+    kind = 'counter'
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._series[labels] = self._series.get(labels, 0) + amount
+
+class Gauge(_Metric):
+    """A gauge set by the code (inc/dec), or computed at scrape time when `collect` is given."""
+    kind = 'gauge'
+
+    def __init__(self, name, help_text, labelnames=(), collect=None):
+        super().__init__(name, help_text, labelnames)
+        self.collect = collect
+        if not self.labelnames: self._series[()] = 0
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._series[labels] = self._series.get(labels, 0) + amount
+
+    def dec(self, *labels, amount=1):
+        self.inc(*labels, amount=-amount)
+
+    def render(self):
+        if self.collect is not None:
+            with self._lock: self._series = {(): self.collect()}
+        return super().render()
+
+class Histogram(_Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, help_text, labelnames=(), buckets=()):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, *labels):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None: series = self._series[labels] = [0] * (len(self.buckets) + 2) # per-bucket counts, +Inf, sum
+            series[index] += 1
+            series[-1] += value
+
+    def _render_series(self, labels, series):
+        lines, cumulative = [], 0
+        for bound, count in zip(self.buckets + (float('inf'),), series[:-1]):
+            cumulative += count
+            le = 'le="+Inf"' if bound == float('inf') else f'le="{float(bound)!r}"'
+            lines.append(f'{self.name}_bucket{_labels(self.labelnames, labels, le)} {cumulative}')
+        lines.append(f'{self.name}_sum{_labels(self.labelnames, labels)} {series[-1]}')
+        lines.append(f'{self.name}_count{_labels(self.labelnames, labels)} {cumulative}')
+        return lines
+
+def render_registry():
+    lines = []
+    for metric in REGISTRY: lines.extend(metric.render())
+    return '\n'.join(lines) + '\n'
+
+# ================================================================
+# METRICS
+# ================================================================
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+REQUEST_LABELS = ('route', 'method', 'status')
+
+REQUEST_SECONDS = Histogram('urja_http_request_duration_seconds', "Request latency by URL name.", REQUEST_LABELS, LATENCY_BUCKETS)
+REQUEST_DB_QUERIES = Histogram('urja_http_request_db_queries', "Database queries per request.", ('route', 'method'), (0, 1, 2, 5, 10, 20, 50, 100, 200, 500))
+REQUEST_DB_SECONDS = Histogram('urja_http_request_db_seconds', "Database time per request.", ('route', 'method'), LATENCY_BUCKETS)
+RESPONSE_BYTES = Histogram('urja_http_response_bytes', "Response body size, when known.", ('route', 'method'), (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216))
+
+AI_INFERENCE_SECONDS = Histogram('urja_ai_inference_seconds', "Model inference time per report image.", ('outcome',), (0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10, 30))
+AI_TASKS_RUNNING = Gauge('urja_ai_tasks_running', "Analysis tasks currently running in this process.")
+
+def _pending_analysis_count():
+    # The backlog admission control acts on, not every Pending Analysis row.
+    from .admission import awaiting_analysis
+    return awaiting_analysis().count()
+
+AI_QUEUE_DEPTH = Gauge('urja_ai_queue_depth', "Reports queued for analysis (admission.awaiting_analysis).", collect=_pending_analysis_count)
+REPORT_ADMISSIONS = Counter('urja_report_admissions_total', "New reports by admission decision (accept, defer, reject).", ('decision',))
+
+# ================================================================
+# REQUEST INTEGRATION
+# ================================================================
+
+class MetricsMiddleware:
+    """
+    Records latency, DB query count and time, and response size per URL name.
+    Queries are counted with an execute_wrapper, so nothing is stored per query.
+    Routes are labelled by URL name (not path) to keep label cardinality bounded.
+    """
+
+    def __init__(self, get_response):
+        if not settings.METRICS_ENABLED: raise MiddlewareNotUsed()
+        self.get_response = get_response
+
+    def __call__(self, request):
+        db = [0, 0.0] # queries, seconds
+
+        def count_query(execute, sql, params, many, context):
+            started = time.perf_counter()
+            try:
+                return execute(sql, params, many, context)
+            finally:
+                db[0] += 1
+                db[1] += time.perf_counter() - started
+
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(count_query))
+            response = self.get_response(request)
+        elapsed = time.perf_counter() - started
+
+        match = getattr(request, 'resolver_match', None)
+        route = (match.view_name if match else None) or '<unmatched>'
+        REQUEST_SECONDS.observe(elapsed, route, request.method, str(response.status_code))
+        REQUEST_DB_QUERIES.observe(db[0], route, request.method)
+        REQUEST_DB_SECONDS.observe(db[1], route, request.method)
+        size = len(response.content) if not response.streaming else response.get('Content-Length')
+        if size is not None: RESPONSE_BYTES.observe(int(size), route, request.method)
+        return response
+
+def metrics_view(request):
+    """
+    Prometheus scrape endpoint. With METRICS_AUTH_TOKEN set, the scraper must send
+    'Authorization: Bearer <token>'; otherwise only METRICS_ALLOWED_IPS may scrape.
+    """
+    if settings.METRICS_AUTH_TOKEN:
+        if not constant_time_compare(request.META.get('HTTP_AUTHORIZATION', ''), f'Bearer {settings.METRICS_AUTH_TOKEN}'): return HttpResponseForbidden()
+    elif request.META.get('REMOTE_ADDR') not in settings.METRICS_ALLOWED_IPS:
+        return HttpResponseForbidden()
+    return HttpResponse(render_registry(), content_type='text/plain; version=0.0.4; charset=utf-8')
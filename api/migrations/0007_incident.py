@@ -0,0 +1,46 @@
+# Generated by Django 5.2.18 on 2026-10-19 02:16
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0006_report_ai_suggestion'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='report',
+            name='image_hash',
+            field=models.CharField(blank=True, max_length=16, null=True),
+        ),
+        migrations.CreateModel(
+            name='Incident',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('latitude', models.DecimalField(decimal_places=6, max_digits=9)),
+                ('longitude', models.DecimalField(decimal_places=6, max_digits=9)),
+                ('image_hash', models.CharField(blank=True, max_length=16, null=True)),
+                ('report_count', models.PositiveIntegerField(default=1)),
+                ('first_reported_at', models.DateTimeField(auto_now_add=True)),
+                ('last_reported_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('primary_report', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='api.report')),
+            ],
+        ),
+        migrations.AddField(
+            model_name='report',
+            name='incident',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='reports', to='api.incident'),
+        ),
+        migrations.AddIndex(
+            model_name='incident',
+            index=models.Index(fields=['latitude', 'longitude'], name='incident_lat_lng_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='incident',
+            index=models.Index(fields=['last_reported_at'], name='incident_last_reported_idx'),
+        ),
+    ]
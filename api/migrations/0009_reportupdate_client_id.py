@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 02:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0008_technician_base_location'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reportupdate',
+            name='client_id',
+            field=models.UUIDField(blank=True, null=True, unique=True),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-19 02:33
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0012_mediablob'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='report',
+            index=models.Index(fields=['image'], name='report_image_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='reportupdate',
+            index=models.Index(fields=['image'], name='reportupdate_image_idx'),
+        ),
+    ]
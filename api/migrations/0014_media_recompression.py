@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-19 02:34
+
+import api.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0013_media_image_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MediaRecompression',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('original_name', models.CharField(max_length=1000, unique=True)),
+                ('new_name', models.CharField(blank=True, max_length=1000)),
+                ('thumbnail_name', models.CharField(blank=True, max_length=1000)),
+                ('original_bytes', models.PositiveBigIntegerField(default=0)),
+                ('new_bytes', models.PositiveBigIntegerField(default=0)),
+                ('skipped_reason', models.CharField(blank=True, max_length=255)),
+                ('processed_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='report',
+            name='thumbnail',
+            field=models.ImageField(blank=True, max_length=1000, null=True, upload_to=api.models.get_report_image_path),
+        ),
+        migrations.AddField(
+            model_name='reportupdate',
+            name='thumbnail',
+            field=models.ImageField(blank=True, max_length=1000, null=True, upload_to=api.models.get_update_image_path),
+        ),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 5.2.18 on 2026-10-19 02:38
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0014_media_recompression'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedReport',
+            fields=[
+                ('id', models.IntegerField(primary_key=True, serialize=False)),
+                ('status', models.CharField(max_length=20)),
+                ('image', models.CharField(blank=True, max_length=1000)),
+                ('thumbnail', models.CharField(blank=True, max_length=1000)),
+                ('created_at', models.DateTimeField()),
+                ('resolved_at', models.DateTimeField(blank=True, null=True)),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('payload', models.BinaryField()),
+                ('assigned_technician', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('citizen', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ArchivedReportUpdate',
+            fields=[
+                ('id', models.IntegerField(primary_key=True, serialize=False)),
+                ('image', models.CharField(blank=True, max_length=1000)),
+                ('thumbnail', models.CharField(blank=True, max_length=1000)),
+                ('payload', models.BinaryField()),
+                ('report', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='updates', to='api.archivedreport')),
+                ('technician', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='archivedreport',
+            index=models.Index(fields=['image'], name='archivedreport_image_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='archivedreportupdate',
+            index=models.Index(fields=['image'], name='archivedupdate_image_idx'),
+        ),
+    ]
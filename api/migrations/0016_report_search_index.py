@@ -0,0 +1,59 @@
+from django.db import migrations
+
+# SQLite only: an FTS5 index over report text, kept in sync by triggers so that
+# every write path (save, queryset.update, bulk operations, deletes) updates it
+# incrementally. Other backends use the icontains fallback in api/search.py.
+
+REMARKS = "(SELECT coalesce(group_concat(remark, ' '), '') FROM api_reportupdate WHERE report_id = {report_id})"
+
+CREATE_SQL = [
+    "CREATE VIRTUAL TABLE api_report_fts USING fts5("
+    "description, address, ai_classification, remarks, tokenize = 'porter unicode61 remove_diacritics 2')",
+    "INSERT INTO api_report_fts(rowid, description, address, ai_classification, remarks) "
+    "SELECT id, description, coalesce(address, ''), coalesce(ai_classification, ''), " + REMARKS.format(report_id='api_report.id') + " FROM api_report",
+
+    "CREATE TRIGGER api_report_fts_insert AFTER INSERT ON api_report BEGIN "
+    "INSERT INTO api_report_fts(rowid, description, address, ai_classification, remarks) "
+    "VALUES (NEW.id, NEW.description, coalesce(NEW.address, ''), coalesce(NEW.ai_classification, ''), ''); END",
+    # Only text columns: status changes and assignments never touch the index.
+    "CREATE TRIGGER api_report_fts_update AFTER UPDATE OF description, address, ai_classification ON api_report BEGIN "
+    "UPDATE api_report_fts SET description = NEW.description, address = coalesce(NEW.address, ''), "
+    "ai_classification = coalesce(NEW.ai_classification, '') WHERE rowid = NEW.id; END",
+    "CREATE TRIGGER api_report_fts_delete AFTER DELETE ON api_report BEGIN "
+    "DELETE FROM api_report_fts WHERE rowid = OLD.id; END",
+
+    "CREATE TRIGGER api_reportupdate_fts_insert AFTER INSERT ON api_reportupdate BEGIN "
+    "UPDATE api_report_fts SET remarks = " + REMARKS.format(report_id='NEW.report_id') + " WHERE rowid = NEW.report_id; END",
+    "CREATE TRIGGER api_reportupdate_fts_update AFTER UPDATE OF remark, report_id ON api_reportupdate BEGIN "
+    "UPDATE api_report_fts SET remarks = " + REMARKS.format(report_id='OLD.report_id') + " WHERE rowid = OLD.report_id; "
+    "UPDATE api_report_fts SET remarks = " + REMARKS.format(report_id='NEW.report_id') + " WHERE rowid = NEW.report_id; END",
+    "CREATE TRIGGER api_reportupdate_fts_delete AFTER DELETE ON api_reportupdate BEGIN "
+    "UPDATE api_report_fts SET remarks = " + REMARKS.format(report_id='OLD.report_id') + " WHERE rowid = OLD.report_id; END",
+]
+
+DROP_SQL = [
+    "DROP TRIGGER IF EXISTS api_reportupdate_fts_delete",
+    "DROP TRIGGER IF EXISTS api_reportupdate_fts_update",
+    "DROP TRIGGER IF EXISTS api_reportupdate_fts_insert",
+    "DROP TRIGGER IF EXISTS api_report_fts_delete",
+    "DROP TRIGGER IF EXISTS api_report_fts_update",
+    "DROP TRIGGER IF EXISTS api_report_fts_insert",
+    "DROP TABLE IF EXISTS api_report_fts",
+]
+
+def _run(statements):
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor != 'sqlite': return
+        for statement in statements: schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0015_report_archive'),
+    ]
+
+    operations = [
+        migrations.RunPython(_run(CREATE_SQL), _run(DROP_SQL)),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 5.2.18 on 2026-10-19 02:49
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0016_report_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='suggestion',
+            name='minhash',
+            field=models.BinaryField(blank=True, null=True),
+        ),
+        migrations.CreateModel(
+            name='SuggestionCluster',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('size', models.PositiveIntegerField(default=1)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('last_suggested_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('representative', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='api.suggestion')),
+            ],
+        ),
+        migrations.AddField(
+            model_name='suggestion',
+            name='cluster',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='suggestions', to='api.suggestioncluster'),
+        ),
+        migrations.CreateModel(
+            name='SuggestionBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.BigIntegerField()),
+                ('suggestion', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='api.suggestion')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['key'], name='suggestionbucket_key_idx')],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='suggestioncluster',
+            index=models.Index(fields=['size', 'last_suggested_at'], name='suggestioncluster_size_idx'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-19 02:55
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0017_suggestion_clusters'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReportAnalysisTiming',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('outcome', models.CharField(choices=[('ok', 'Analysed'), ('failed', 'Failed')], max_length=10)),
+                ('queue_wait_ms', models.FloatField()),
+                ('image_load_ms', models.FloatField()),
+                ('inference_ms', models.FloatField()),
+                ('db_save_ms', models.FloatField()),
+                ('pending_ms', models.FloatField()),
+                ('finished_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('report', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='analysis_timing', to='api.report')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['finished_at'], name='analysistiming_finished_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-19 03:16
+
+from importlib import import_module
+
+from django.db import migrations, models
+
+# SQLite applies AddField/RemoveField by rebuilding api_report, which drops the
+# FTS triggers from 0016, so they are recreated after the rebuild either way.
+# api/tests.py SearchTests fails if a later migration loses them again.
+search_index = import_module('api.migrations.0016_report_search_index')
+TRIGGERS = [statement for statement in search_index.CREATE_SQL if statement.startswith('CREATE TRIGGER')]
+DROP_TRIGGERS = [statement for statement in search_index.DROP_SQL if statement.startswith('DROP TRIGGER')]
+
+def restore_search_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite': return
+    for statement in DROP_TRIGGERS + TRIGGERS: schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0019_report_upload'),
+    ]
+
+    operations = [
+        # Reversed last, after RemoveField has rebuilt the table.
+        migrations.RunPython(migrations.RunPython.noop, restore_search_triggers),
+        migrations.AddField(
+            model_name='report',
+            name='analysis_deferred',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.RunPython(restore_search_triggers, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-19 04:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0022_outboundemail_kind'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='archivedreport',
+            name='id',
+            field=models.BigIntegerField(primary_key=True, serialize=False),
+        ),
+        migrations.AlterField(
+            model_name='archivedreportupdate',
+            name='id',
+            field=models.BigIntegerField(primary_key=True, serialize=False),
+        ),
+    ]
@@ -0,0 +1,105 @@
+# api/minhash.py
+import hashlib
+import random
+import re
+from array import array
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Suggestion, SuggestionBucket, SuggestionCluster
+
+# 64 hash functions split into 16 LSH bands of 4 rows: two texts share at least
+# one band with probability 1 - (1 - s^4)^16, i.e. ~50% at similarity 0.42 and
+# ~96% at 0.6, so near-duplicates almost always become candidates.
+NUM_PERMUTATIONS = 64
+BANDS = 16
+ROWS_PER_BAND = NUM_PERMUTATIONS // BANDS
+SHINGLE_SIZE = 5
+# Similarity is verified against at most this many of the newest candidates.
+MAX_CANDIDATES = 200
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+_rng = random.Random(20240601) # Fixed seed: signatures must stay comparable across processes and restarts
+_PERMUTATIONS = [(_rng.randrange(1, _MERSENNE_PRIME), _rng.randrange(0, _MERSENNE_PRIME)) for _ in range(NUM_PERMUTATIONS)]
+
+# ================================================================
+# SIGNATURES
+# ================================================================
+
+def shingles(text):
+    """Character 5-grams of the lower-cased text with punctuation and extra spaces removed."""
+    normalized = ' '.join(re.sub(r'[^\w\s]', ' ', text.lower()).split())
+    if len(normalized) <= SHINGLE_SIZE: return {normalized}
+    return {normalized[i:i + SHINGLE_SIZE] for i in range(len(normalized) - SHINGLE_SIZE + 1)}
+
+def minhash_signature(text):
+    hashes = [int.from_bytes(hashlib.blake2b(shingle.encode(), digest_size=4).digest(), 'little') for shingle in shingles(text)]
+    return array('I', [min(((a * h + b) % _MERSENNE_PRIME) & _MAX_HASH for h in hashes) for a, b in _PERMUTATIONS])
+
+def signature_bytes(signature):
+    return signature.tobytes()
+
+def signature_from_bytes(data):
+    signature = array('I')
+    signature.frombytes(bytes(data))
+    return signature
+
+def similarity(signature_a, signature_b):
+    """Estimated Jaccard similarity of the two texts' shingle sets."""
+    return sum(1 for a, b in zip(signature_a, signature_b) if a == b) / NUM_PERMUTATIONS
+
+def band_keys(signature):
+    """One signed 64-bit key per band; the band number is mixed in so bands never collide."""
+    keys = []
+    for band in range(BANDS):
+        rows = signature[band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND]
+        digest = hashlib.blake2b(bytes([band]) + rows.tobytes(), digest_size=8).digest()
+        keys.append(int.from_bytes(digest, 'little', signed=True))
+    return keys
+
+# ================================================================
+# SUGGESTION CLUSTERS
+# ================================================================
+
+def cluster_suggestion(suggestion):
+    """
+    Indexes a suggestion and puts it in the cluster of its most similar earlier
+    suggestion (at least SUGGESTION_CLUSTER_SIMILARITY), or in a new cluster.
+    Returns the cluster.
+    """
+    signature = minhash_signature(suggestion.suggestion_text)
+    keys = band_keys(signature)
+    with transaction.atomic():
+        candidate_ids = (
+            SuggestionBucket.objects.filter(key__in=keys).exclude(suggestion_id=suggestion.pk)
+            .order_by('-suggestion_id').values_list('suggestion_id', flat=True).distinct()[:MAX_CANDIDATES]
+        )
+        candidates = Suggestion.objects.filter(pk__in=list(candidate_ids), cluster__isnull=False).only('id', 'cluster_id', 'minhash')
+        best, best_similarity = None, settings.SUGGESTION_CLUSTER_SIMILARITY
+        for candidate in candidates:
+            score = similarity(signature, signature_from_bytes(candidate.minhash))
+            if score >= best_similarity: best, best_similarity = candidate, score
+
+        if best is None:
+            cluster = SuggestionCluster.objects.create(representative=suggestion, last_suggested_at=suggestion.created_at or timezone.now())
+        else:
+            cluster = SuggestionCluster(pk=best.cluster_id)
+            SuggestionCluster.objects.filter(pk=cluster.pk).update(size=F('size') + 1, last_suggested_at=timezone.now())
+        suggestion.minhash, suggestion.cluster = signature_bytes(signature), cluster
+        Suggestion.objects.filter(pk=suggestion.pk).update(minhash=suggestion.minhash, cluster=cluster)
+        SuggestionBucket.objects.bulk_create([SuggestionBucket(key=key, suggestion_id=suggestion.pk) for key in keys])
+    return cluster
+
+def remove_from_cluster(cluster_id):
+    """Called after a suggestion is deleted: resizes its cluster, picks a new representative or drops it."""
+    remaining = Suggestion.objects.filter(cluster_id=cluster_id).order_by('created_at', 'id')
+    first = remaining.first()
+    if first is None:
+        SuggestionCluster.objects.filter(pk=cluster_id).delete()
+        return
+    SuggestionCluster.objects.filter(pk=cluster_id).update(size=remaining.count())
+    SuggestionCluster.objects.filter(pk=cluster_id, representative__isnull=True).update(representative=first)
@@ -1,6 +1,7 @@
 import uuid
 from django.db import models
 from django.contrib.auth.models import User
+from django.utils import timezone
 
 # ================================================================
 # DYNAMIC PATH FUNCTIONS FOR IMAGE UPLOADS
@@ -44,12 +45,42 @@ class Profile(models.Model):
     employee_id = models.CharField(max_length=50, unique=True, null=True, blank=True)
     department = models.CharField(max_length=100, null=True, blank=True)
     specialization = models.CharField(max_length=100, null=True, blank=True)
+    # Technician's base (depot) location, used to score automatic assignments.
+    base_latitude = models.DecimalField(max_digits=9, decimal_places=6, null=True, blank=True)
+    base_longitude = models.DecimalField(max_digits=9, decimal_places=6, null=True, blank=True)
 
     def __str__(self):
         return self.user.username
 
 # ================================================================
-# 2. REPORTS MODEL
+# 2. INCIDENTS MODEL
+# ================================================================
+class Incident(models.Model):
+    """
+    A single real-world hazard that one or more citizen reports point at.
+    The first report filed becomes the primary report; later reports that fall
+    inside the clustering radius and time window are linked as duplicates.
+    """
+    primary_report = models.ForeignKey('Report', related_name='+', on_delete=models.SET_NULL, null=True, blank=True)
+    latitude = models.DecimalField(max_digits=9, decimal_places=6)
+    longitude = models.DecimalField(max_digits=9, decimal_places=6)
+    image_hash = models.CharField(max_length=16, blank=True, null=True)
+    report_count = models.PositiveIntegerField(default=1)
+    first_reported_at = models.DateTimeField(auto_now_add=True)
+    last_reported_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            # Bounding-box prefilter used by the clustering stage.
+            models.Index(fields=['latitude', 'longitude'], name='incident_lat_lng_idx'),
+            models.Index(fields=['last_reported_at'], name='incident_last_reported_idx'),
+        ]
+
+    def __str__(self):
+        return f"Incident #{self.id} ({self.report_count} reports)"
+
+# ================================================================
+# 3. REPORTS MODEL
 # ================================================================
 class Report(models.Model):
     CATEGORY_CHOICES = [
@@ -71,6 +102,11 @@ class Report(models.Model):
         ('Medium', 'Medium'),
         ('Low', 'Low'),
     ]
+    # Allowed manual status changes per role: {role: {current_status: [next_statuses]}}
+    STATUS_TRANSITIONS = {
+        'technician': {'Assigned': ['In Progress'], 'In Progress': ['Resolved']},
+        'admin': {'Resolved': ['Closed', 'Assigned'], 'Received': ['Assigned', 'Closed']},
+    }
 
     # --- Fields ---
     upload_id = models.UUIDField(default=uuid.uuid4, editable=False, unique=True)
@@ -79,6 +115,7 @@ class Report(models.Model):
     category = models.CharField(max_length=50, choices=CATEGORY_CHOICES, blank=True, null=True)
     description = models.TextField(blank=True)
     image = models.ImageField(upload_to=get_report_image_path, null=True, blank=True, max_length=1000)
+    thumbnail = models.ImageField(upload_to=get_report_image_path, null=True, blank=True, max_length=1000) # Set by recompress_media
     latitude = models.DecimalField(max_digits=9, decimal_places=6)
     longitude = models.DecimalField(max_digits=9, decimal_places=6)
     address = models.TextField(blank=True, null=True) # <-- NEW: Human-readable address
@@ -89,12 +126,28 @@ class Report(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True) # <-- NEW: Tracks any update
     resolved_at = models.DateTimeField(null=True, blank=True) # <-- NEW: Tracks when it was resolved
+    incident = models.ForeignKey(Incident, related_name='reports', on_delete=models.SET_NULL, null=True, blank=True)
+    image_hash = models.CharField(max_length=16, blank=True, null=True) # Perceptual (dHash) of the citizen image
+    analysis_deferred = models.BooleanField(default=False) # Held back while the AI backlog was high (api/admission.py)
+
+    class Meta:
+        indexes = [
+            # Open workload per technician, counted by the assignment engine.
+            models.Index(fields=['assigned_technician', 'status'], name='report_tech_status_idx'),
+            # Indexes backing the hot querysets in api/views.py (see api/tests.py QueryPlanTests).
+            models.Index(fields=['created_at'], name='report_created_idx'),
+            models.Index(fields=['citizen', 'created_at'], name='report_citizen_created_idx'),
+            models.Index(fields=['status', 'created_at'], name='report_status_created_idx'),
+            models.Index(fields=['category'], name='report_category_idx'),
+            # Media permission checks find the report owning a file by its name.
+            models.Index(fields=['image'], name='report_image_idx'),
+        ]
 
     def __str__(self):
         return f"Report #{self.id} by {self.citizen.username}"
 
 # ================================================================
-# 3. SUGGESTIONS MODEL
+# 4. SUGGESTIONS MODEL
 # ================================================================
 class Suggestion(models.Model):
     class Status(models.TextChoices): # <-- NEW
@@ -108,19 +161,262 @@ class Suggestion(models.Model):
     status = models.CharField(max_length=20, choices=Status.choices, default=Status.SUBMITTED) # <-- NEW
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True) # <-- NEW
+    cluster = models.ForeignKey('SuggestionCluster', related_name='suggestions', on_delete=models.SET_NULL, null=True, blank=True)
+    minhash = models.BinaryField(null=True, blank=True, editable=False) # MinHash signature of suggestion_text (api/minhash.py)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['created_at'], name='suggestion_created_idx'),
+            models.Index(fields=['citizen', 'created_at'], name='suggestion_citizen_created_idx'),
+        ]
 
     def __str__(self):
         return f"Suggestion by {self.citizen.username}"
+
+# ================================================================
+# 5. SUGGESTION CLUSTERS MODEL
+# ================================================================
+class SuggestionCluster(models.Model):
+    """
+    Suggestions whose texts are near-duplicates of each other. The representative
+    is the earliest member; size counts all members.
+    """
+    representative = models.ForeignKey(Suggestion, related_name='+', on_delete=models.SET_NULL, null=True, blank=True)
+    size = models.PositiveIntegerField(default=1)
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_suggested_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['size', 'last_suggested_at'], name='suggestioncluster_size_idx'),
+        ]
+
+    def __str__(self):
+        return f"Suggestion cluster #{self.id} ({self.size})"
+
+class SuggestionBucket(models.Model):
+    """One LSH band of a suggestion's MinHash signature; equal keys mark candidate duplicates."""
+    key = models.BigIntegerField()
+    suggestion = models.ForeignKey(Suggestion, related_name='+', on_delete=models.CASCADE)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['key'], name='suggestionbucket_key_idx'),
+        ]
 # ================================================================
-# 4. REPORT UPDATES MODEL
+# 6. REPORT UPDATES MODEL
 # ================================================================
 class ReportUpdate(models.Model):
     report = models.ForeignKey(Report, on_delete=models.CASCADE)
     technician = models.ForeignKey(User, on_delete=models.CASCADE)
     remark = models.TextField()
     image = models.ImageField(upload_to=get_update_image_path, null=True, blank=True, max_length=1000)
+    thumbnail = models.ImageField(upload_to=get_update_image_path, null=True, blank=True, max_length=1000) # Set by recompress_media
+    client_id = models.UUIDField(unique=True, null=True, blank=True) # Set by offline clients so retried syncs are idempotent
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True) # <-- NEW
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['image'], name='reportupdate_image_idx'),
+        ]
+
+    def __str__(self):
+        return f"Update on Report #{self.report.id} by {self.technician.username}"
+
+# ================================================================
+# 7. EMAIL OUTBOX MODEL
+# ================================================================
+class OutboundEmail(models.Model):
+    """
+    An email waiting to be delivered by the background sender (api/outbox.py).
+    Requests only insert rows here, so a slow or failing mail server never
+    blocks a worker.
+    """
+    class Status(models.TextChoices):
+        PENDING = 'pending', 'Pending'
+        SENDING = 'sending', 'Sending'
+        SENT = 'sent', 'Sent'
+        FAILED = 'failed', 'Failed'
+        SKIPPED = 'skipped', 'Skipped' # Password reset for an address with no account
+
+    class Kind(models.TextChoices):
+        MESSAGE = 'message', 'Message'
+        # Rendered by the sender, so the request does the same work whether or not the account exists.
+        PASSWORD_RESET = 'password_reset', 'Password reset'
+
+    kind = models.CharField(max_length=20, choices=Kind.choices, default=Kind.MESSAGE)
+    to_email = models.EmailField()
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    html_body = models.TextField(blank=True)
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    claim_token = models.CharField(max_length=32, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='outbox_due_idx'),
+        ]
+
+    def __str__(self):
+        return f"Email to {self.to_email} ({self.status})"
+
+
+# ================================================================
+# 8. MEDIA BLOBS MODEL
+# ================================================================
+class MediaBlob(models.Model):
+    """
+    One unique uploaded file, stored once under its SHA-256 digest by
+    api.storage.ContentAddressedStorage. ref_count tracks how many report and
+    update images point at it; blobs at zero are removed by `gc_media_blobs`.
+    """
+    digest = models.CharField(max_length=64, unique=True)
+    name = models.CharField(max_length=255, unique=True) # Storage path, e.g. blobs/ab/cd/abcd....jpg
+    size = models.PositiveBigIntegerField()
+    ref_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_referenced_at = models.DateTimeField(default=timezone.now) # Bumped with every new reference; gates gc_media_blobs
+
+    def __str__(self):
+        return f"{self.name} ({self.ref_count} refs)"
+
+
+# ================================================================
+# 9. MEDIA RECOMPRESSION LOG MODEL
+# ================================================================
+class MediaRecompression(models.Model):
+    """
+    One original image processed by `recompress_media`. Its presence makes the job
+    resumable: originals already listed here are never processed again.
+    """
+    original_name = models.CharField(max_length=1000, unique=True)
+    new_name = models.CharField(max_length=1000, blank=True)
+    thumbnail_name = models.CharField(max_length=1000, blank=True)
+    original_bytes = models.PositiveBigIntegerField(default=0)
+    new_bytes = models.PositiveBigIntegerField(default=0)
+    skipped_reason = models.CharField(max_length=255, blank=True)
+    processed_at = models.DateTimeField(auto_now_add=True)
+
+    @property
+    def bytes_saved(self):
+        return self.original_bytes - self.new_bytes if self.new_name else 0
+
+    def __str__(self):
+        return f"{self.original_name} -> {self.new_name or self.skipped_reason}"
+
+
+# ================================================================
+# 10. REPORT ARCHIVE MODELS
+# ================================================================
+class ArchivedReport(models.Model):
+    """
+    A Closed report moved out of the live tables by `archive_reports`. Only the
+    columns used for lookups and permission checks are kept as columns; every
+    other Report field lives in `payload`, a zlib-compressed JSON document.
+    See api/archive.py for packing and for rebuilding a Report from it.
+    """
+    id = models.BigIntegerField(primary_key=True) # Same id as the live report had (a BigAutoField)
+    citizen = models.ForeignKey(User, related_name='+', on_delete=models.CASCADE)
+    assigned_technician = models.ForeignKey(User, related_name='+', on_delete=models.SET_NULL, null=True, blank=True)
+    status = models.CharField(max_length=20)
+    image = models.CharField(max_length=1000, blank=True)
+    thumbnail = models.CharField(max_length=1000, blank=True)
+    created_at = models.DateTimeField()
+    resolved_at = models.DateTimeField(null=True, blank=True)
+    archived_at = models.DateTimeField(auto_now_add=True)
+    payload = models.BinaryField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['image'], name='archivedreport_image_idx'),
+        ]
+
+    def __str__(self):
+        return f"Archived report #{self.id}"
+
+class ArchivedReportUpdate(models.Model):
+    """A ReportUpdate of an archived report, packed the same way as ArchivedReport."""
+    id = models.BigIntegerField(primary_key=True) # Same id as the live update had
+    report = models.ForeignKey(ArchivedReport, related_name='updates', on_delete=models.CASCADE)
+    technician = models.ForeignKey(User, related_name='+', on_delete=models.CASCADE)
+    image = models.CharField(max_length=1000, blank=True)
+    thumbnail = models.CharField(max_length=1000, blank=True)
+    payload = models.BinaryField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['image'], name='archivedupdate_image_idx'),
+        ]
+
+    def __str__(self):
+        return f"Archived update #{self.id} on report #{self.report_id}"
+
+
+# ================================================================
+# 11. AI PIPELINE TIMING MODEL
+# ================================================================
+class ReportAnalysisTiming(models.Model):
+    """
+    Stage timings of one AI analysis run (api/tasks.py), in milliseconds.
+    queue_wait runs from the report being queued (normally its creation) to the
+    task starting; pending is the whole time it spent in 'Pending Analysis'.
+    """
+    class Outcome(models.TextChoices):
+        OK = 'ok', 'Analysed'
+        FAILED = 'failed', 'Failed'
+
+    report = models.OneToOneField(Report, related_name='analysis_timing', on_delete=models.CASCADE)
+    outcome = models.CharField(max_length=10, choices=Outcome.choices)
+    queue_wait_ms = models.FloatField()
+    image_load_ms = models.FloatField()
+    inference_ms = models.FloatField()
+    db_save_ms = models.FloatField()
+    pending_ms = models.FloatField()
+    finished_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['finished_at'], name='analysistiming_finished_idx'),
+        ]
+
+    def __str__(self):
+        return f"Analysis timing for report #{self.report_id} ({self.outcome})"
+
+# ================================================================
+# 12. RESUMABLE UPLOAD MODEL
+# ================================================================
+class ReportUpload(models.Model):
+    """
+    A report photo uploaded in chunks (api/uploads.py). The report form is
+    validated and kept at init; the Report itself is created once, at finalize.
+    """
+    class Status(models.TextChoices):
+        UPLOADING = 'uploading', 'Uploading'
+        FINALIZING = 'finalizing', 'Finalizing'
+        COMPLETE = 'complete', 'Complete'
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    citizen = models.ForeignKey(User, related_name='report_uploads', on_delete=models.CASCADE)
+    filename = models.CharField(max_length=255)
+    size = models.PositiveBigIntegerField()
+    sha256 = models.CharField(max_length=64)
+    received = models.PositiveBigIntegerField(default=0) # Bytes stored so far; the next chunk's offset
+    fields = models.JSONField(default=dict) # Report form fields, as sent at init
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.UPLOADING)
+    report = models.OneToOneField(Report, related_name='+', on_delete=models.SET_NULL, null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'updated_at'], name='reportupload_status_idx'),
+        ]
+
     def __str__(self):
-        return f"Update on Report #{self.report.id} by {self.technician.username}"
\ No newline at end of file
+        return f"Upload {self.id} ({self.received}/{self.size} bytes, {self.status})"
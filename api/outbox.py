@@ -0,0 +1,170 @@
+# api/outbox.py
+import threading
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.contrib.auth.tokens import default_token_generator
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+from django.utils.encoding import force_bytes
+from django.utils.html import strip_tags
+from django.utils.http import urlsafe_base64_encode
+
+from .models import OutboundEmail
+
+# ================================================================
+# QUEUEING
+# ================================================================
+
+def queue_email(to_email, subject, html_body):
+    """Stores an email for background delivery and wakes the sender once the transaction commits."""
+    email = OutboundEmail.objects.create(to_email=to_email, subject=subject, body=strip_tags(html_body), html_body=html_body)
+    transaction.on_commit(wake_sender)
+    return email
+
+def queue_password_reset(to_email):
+    """
+    Queues a password reset for whatever address was entered. The sender looks
+    the account up and builds the link (see _render), so known and unknown
+    addresses cost the request the same single insert.
+    """
+    email = OutboundEmail.objects.create(kind=OutboundEmail.Kind.PASSWORD_RESET, to_email=to_email[:254], subject="Password Reset for Urja Setu", body='')
+    transaction.on_commit(wake_sender)
+    return email
+
+def queue_status_notifications(reports):
+    """Queues one 'status changed' email per report to the citizen who filed it."""
+    emails = [
+        OutboundEmail(
+            to_email=report.citizen.email,
+            subject=f"Update on your Urja Setu report #{report.id}",
+            body=f"The status of your report #{report.id} is now: {report.status}.",
+            html_body=f"<p>The status of your report <strong>#{report.id}</strong> is now: <strong>{report.status}</strong>.</p>",
+        )
+        for report in reports if report.citizen.email
+    ]
+    OutboundEmail.objects.bulk_create(emails, batch_size=500)
+    if emails: transaction.on_commit(wake_sender)
+    return len(emails)
+
+# ================================================================
+# DELIVERY
+# ================================================================
+
+def _claim_due_batch(batch_size):
+    """
+    Claims up to `batch_size` due emails with a single conditional UPDATE, so a
+    management-command worker and the in-process thread never send the same row.
+    Claimed rows get a lease; if the sender dies, they become due again.
+    """
+    now = timezone.now()
+    due_ids = list(
+        OutboundEmail.objects.filter(
+            status__in=[OutboundEmail.Status.PENDING, OutboundEmail.Status.SENDING], next_attempt_at__lte=now,
+        ).order_by('next_attempt_at').values_list('id', flat=True)[:batch_size]
+    )
+    if not due_ids: return []
+    token = uuid.uuid4().hex
+    OutboundEmail.objects.filter(
+        pk__in=due_ids, status__in=[OutboundEmail.Status.PENDING, OutboundEmail.Status.SENDING], next_attempt_at__lte=now,
+    ).update(status=OutboundEmail.Status.SENDING, claim_token=token, next_attempt_at=now + timedelta(seconds=settings.EMAIL_OUTBOX_LEASE_SECONDS))
+    return list(OutboundEmail.objects.filter(claim_token=token, status=OutboundEmail.Status.SENDING))
+
+def _render(email):
+    """
+    (to_email, body, html_body) to send, or None to skip. Password reset links are
+    built here rather than stored, so the outbox never holds a live token.
+    """
+    if email.kind != OutboundEmail.Kind.PASSWORD_RESET: return email.to_email, email.body, email.html_body
+    user = User.objects.filter(email__iexact=email.to_email, is_active=True).first()
+    if user is None: return None
+    uid = urlsafe_base64_encode(force_bytes(user.pk))
+    token = default_token_generator.make_token(user)
+    reset_url = f"http://localhost:3000/confirm_reset.html?uid={uid}&token={token}"
+    html_body = f'<p>Please click the link below to reset your password:</p><p><a href="{reset_url}">Reset Password</a></p>'
+    return user.email, f"Please open the link below to reset your password:\n{reset_url}\n", html_body
+
+def send_pending_emails(batch_size=None):
+    """
+    Delivers one batch of due emails over a single SMTP connection.
+    Failed messages are retried with exponential backoff until
+    EMAIL_OUTBOX_MAX_ATTEMPTS is reached. Returns the number of emails processed.
+    """
+    batch = _claim_due_batch(batch_size or settings.EMAIL_OUTBOX_BATCH_SIZE)
+    if not batch: return 0
+    now = timezone.now()
+    connection = get_connection(fail_silently=False)
+    try:
+        connection.open()
+    except Exception as e:
+        # Server unreachable: every message in the batch counts as one failed attempt.
+        for email in batch: _mark_failed(email, e, now)
+        OutboundEmail.objects.bulk_update(batch, ['status', 'attempts', 'next_attempt_at', 'last_error'])
+        return len(batch)
+    try:
+        for email in batch:
+            rendered = _render(email)
+            if rendered is None:
+                email.status = OutboundEmail.Status.SKIPPED
+                continue
+            to_email, body, html_body = rendered
+            message = EmailMultiAlternatives(email.subject, body, settings.DEFAULT_FROM_EMAIL, [to_email], connection=connection)
+            if html_body: message.attach_alternative(html_body, 'text/html')
+            try:
+                connection.send_messages([message])
+            except Exception as e:
+                _mark_failed(email, e, now)
+                continue
+            email.status, email.sent_at, email.attempts, email.last_error = OutboundEmail.Status.SENT, now, email.attempts + 1, ''
+    finally:
+        connection.close()
+    OutboundEmail.objects.bulk_update(batch, ['status', 'attempts', 'next_attempt_at', 'last_error', 'sent_at'])
+    return len(batch)
+
+def _mark_failed(email, error, now):
+    email.attempts += 1
+    email.last_error = str(error)
+    if email.attempts >= settings.EMAIL_OUTBOX_MAX_ATTEMPTS:
+        email.status = OutboundEmail.Status.FAILED
+    else:
+        email.status = OutboundEmail.Status.PENDING
+        email.next_attempt_at = now + timedelta(seconds=settings.EMAIL_OUTBOX_RETRY_BASE_SECONDS * 2 ** (email.attempts - 1))
+
+def drain_outbox():
+    """Sends batches until nothing is due. Returns the total number processed."""
+    total = 0
+    while True:
+        processed = send_pending_emails()
+        total += processed
+        if processed == 0: return total
+
+# ================================================================
+# IN-PROCESS SENDER THREAD
+# ================================================================
+
+_wakeup = threading.Event()
+_sender_lock = threading.Lock()
+_sender_thread = None
+
+def _sender_loop():
+    while True:
+        _wakeup.wait(timeout=settings.EMAIL_OUTBOX_POLL_SECONDS)
+        _wakeup.clear()
+        close_old_connections()
+        try:
+            drain_outbox()
+        except Exception as e:
+            print(f"🚨 Email outbox sender error: {e}")
+
+def wake_sender():
+    """Starts the background sender thread on first use and nudges it to drain the outbox."""
+    global _sender_thread
+    if not settings.EMAIL_OUTBOX_SENDER_THREAD: return
+    with _sender_lock:
+        if _sender_thread is None or not _sender_thread.is_alive():
+            _sender_thread = threading.Thread(target=_sender_loop, name='email-outbox-sender', daemon=True)
+            _sender_thread.start()
+    _wakeup.set()
@@ -10,6 +10,10 @@ class IsTechnicianUser(permissions.BasePermission):
     def has_permission(self, request, view):
         return request.user and request.user.is_authenticated and hasattr(request.user, 'profile') and request.user.profile.role == 'technician'
 
+class IsAdminOrTechnicianUser(permissions.BasePermission):
+    def has_permission(self, request, view):
+        return request.user and request.user.is_authenticated and hasattr(request.user, 'profile') and request.user.profile.role in ('admin', 'technician')
+
 class IsOwnerOrAdmin(permissions.BasePermission):
     def has_object_permission(self, request, view, obj):
         if request.user and request.user.is_authenticated and hasattr(request.user, 'profile') and request.user.profile.role == 'admin':
@@ -0,0 +1,76 @@
+# api/pipeline.py
+import math
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.db.models import Count, Min, Q
+from django.utils import timezone
+
+from .models import Report, ReportAnalysisTiming
+
+STAGES = ['queue_wait', 'image_load', 'inference', 'db_save', 'pending']
+PERCENTILES = [50, 90, 95, 99]
+
+class StageTimer:
+    """Collects wall-clock milliseconds per named stage: `with timer.stage('inference'): ...`"""
+
+    def __init__(self):
+        self.ms = {}
+
+    @contextmanager
+    def stage(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.ms[name] = self.ms.get(name, 0.0) + (time.perf_counter() - started) * 1000
+
+def record_analysis_timing(report, started_at, timer, outcome, queued_at=None):
+    """Stores one run's stage timings. Queue wait runs from `queued_at` (default: report creation); pending time from creation."""
+    finished_at = timezone.now()
+    ReportAnalysisTiming.objects.update_or_create(report=report, defaults={
+        'outcome': outcome,
+        'queue_wait_ms': max((started_at - (queued_at or report.created_at)).total_seconds() * 1000, 0.0),
+        'image_load_ms': timer.ms.get('image_load', 0.0),
+        'inference_ms': timer.ms.get('inference', 0.0),
+        'db_save_ms': timer.ms.get('db_save', 0.0),
+        'pending_ms': max((finished_at - report.created_at).total_seconds() * 1000, 0.0),
+        'finished_at': finished_at,
+    })
+
+# ================================================================
+# AGGREGATES
+# ================================================================
+
+def percentile(sorted_values, q):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values: return None
+    return sorted_values[max(math.ceil(q / 100 * len(sorted_values)) - 1, 0)]
+
+def pipeline_stats(days):
+    """Per-stage percentiles over runs finished in the last `days` days, plus the current backlog."""
+    since = timezone.now() - timedelta(days=days)
+    runs = ReportAnalysisTiming.objects.filter(finished_at__gte=since)
+    rows = list(runs.values_list(*[f'{stage}_ms' for stage in STAGES]))
+    stages = {}
+    for index, stage in enumerate(STAGES):
+        values = sorted(row[index] for row in rows)
+        stages[stage] = {
+            'count': len(values),
+            'mean_ms': round(sum(values) / len(values), 1) if values else None,
+            **{f'p{q}_ms': round(percentile(values, q), 1) if values else None for q in PERCENTILES},
+            'max_ms': round(values[-1], 1) if values else None,
+        }
+    backlog = Report.objects.filter(status='Pending Analysis').aggregate(count=Count('id'), deferred=Count('id', filter=Q(analysis_deferred=True)), oldest=Min('created_at'))
+    return {
+        'window_days': days,
+        'runs': len(rows),
+        'outcomes': dict(runs.values_list('outcome').annotate(count=Count('id')).order_by()),
+        'stages': stages,
+        'pending_analysis': {
+            'count': backlog['count'],
+            'deferred': backlog['deferred'],
+            'oldest_age_seconds': round((timezone.now() - backlog['oldest']).total_seconds()) if backlog['oldest'] else None,
+        },
+    }
@@ -0,0 +1,82 @@
+# api/profiling.py
+import cProfile
+import json
+import os
+import random
+import time
+import uuid
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.utils import timezone
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.exceptions import AuthenticationFailed
+
+PROFILE_HEADER = 'HTTP_X_PROFILE'
+PROFILE_QUERY_PARAM = 'profile'
+
+def _requested(request):
+    return request.META.get(PROFILE_HEADER) == '1' or request.GET.get(PROFILE_QUERY_PARAM) == '1'
+
+def _is_admin(request):
+    # DRF authenticates inside the view, so the token is checked here as well.
+    user = getattr(request, 'user', None)
+    if user is None or not user.is_authenticated:
+        try: result = TokenAuthentication().authenticate(request)
+        except AuthenticationFailed: return False
+        user = result[0] if result else None
+    return bool(user and user.is_authenticated and hasattr(user, 'profile') and user.profile.role == 'admin')
+
+class ProfilingMiddleware:
+    """
+    Profiles single requests on demand. An admin sends 'X-Profile: 1' or
+    '?profile=1'; a PROFILING_SAMPLE_RATE share of those requests run under
+    cProfile with every SQL query recorded. Each capture is saved to
+    PROFILING_DIR as <id>.prof (pstats) and <id>.json (request info and SQL),
+    and the id is returned in the X-Profile-Id header.
+    Summarise captures with `manage.py profile_summary`.
+    """
+
+    def __init__(self, get_response):
+        if not settings.PROFILING_ENABLED: raise MiddlewareNotUsed()
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not _requested(request) or random.random() >= settings.PROFILING_SAMPLE_RATE or not _is_admin(request):
+            return self.get_response(request)
+
+        queries = []
+        def record_query(execute, sql, params, many, context):
+            started = time.perf_counter()
+            try:
+                return execute(sql, params, many, context)
+            finally:
+                queries.append({'sql': sql, 'ms': round((time.perf_counter() - started) * 1000, 3), 'many': many})
+
+        profiler = cProfile.Profile()
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(record_query))
+            profiler.enable()
+            try:
+                response = self.get_response(request)
+            finally:
+                profiler.disable()
+        elapsed_ms = (time.perf_counter() - started) * 1000
+
+        match = getattr(request, 'resolver_match', None)
+        capture_id = f"{timezone.now():%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:8]}"
+        os.makedirs(settings.PROFILING_DIR, exist_ok=True)
+        profiler.dump_stats(os.path.join(settings.PROFILING_DIR, f'{capture_id}.prof'))
+        with open(os.path.join(settings.PROFILING_DIR, f'{capture_id}.json'), 'w') as f:
+            json.dump({
+                'id': capture_id, 'method': request.method, 'path': request.get_full_path(),
+                'route': match.view_name if match else None, 'status': response.status_code,
+                'duration_ms': round(elapsed_ms, 3), 'query_count': len(queries),
+                'query_ms': round(sum(q['ms'] for q in queries), 3), 'queries': queries,
+            }, f, indent=1)
+        response['X-Profile-Id'] = capture_id
+        return response
@@ -0,0 +1,88 @@
+# api/routers.py
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework import permissions
+
+# Per-request routing state, set by ReplicaRoutingMiddleware. Background threads
+# start with an empty context, so their queries always use the primary database.
+_routing_state = ContextVar('db_routing_state', default=None)
+
+def replica_configured():
+    return settings.REPLICA_DATABASE_ALIAS in settings.DATABASES
+
+def _pin_key(user_id):
+    return f'db-replica-pin:{user_id}'
+
+def is_pinned_to_primary(user):
+    """True while a user's own recent write may not have reached the replica yet."""
+    return bool(user and user.is_authenticated and cache.get(_pin_key(user.pk)))
+
+# ================================================================
+# ROUTER
+# ================================================================
+
+class ReplicaRouter:
+    """
+    Sends reads to the replica only inside views that opted in with
+    ReplicaReadMixin; everything else, including all writes, uses 'default'.
+    """
+
+    def db_for_read(self, model, **hints):
+        state = _routing_state.get()
+        if state and state['use_replica'] and not state['wrote'] and replica_configured():
+            return settings.REPLICA_DATABASE_ALIAS
+        return None
+
+    def db_for_write(self, model, **hints):
+        state = _routing_state.get()
+        if state: state['wrote'] = True
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both aliases hold the same data.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # The replica is populated by replication, never migrated directly.
+        return db != settings.REPLICA_DATABASE_ALIAS
+
+# ================================================================
+# REQUEST INTEGRATION
+# ================================================================
+
+class ReplicaRoutingMiddleware:
+    """
+    Resets routing state for each request. If the request wrote anything, the
+    user is pinned to the primary for REPLICA_STICKY_SECONDS, so their next
+    dashboard or list read sees their own write (read-your-writes).
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        state = {'use_replica': False, 'wrote': False}
+        token = _routing_state.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            _routing_state.reset(token)
+        # DRF authenticates inside the view and copies the user back onto the request.
+        user = getattr(request, 'user', None)
+        if state['wrote'] and user is not None and user.is_authenticated and replica_configured():
+            cache.set(_pin_key(user.pk), True, settings.REPLICA_STICKY_SECONDS)
+        return response
+
+class ReplicaReadMixin:
+    """
+    For read-heavy DRF views (admin lists, dashboards, exports, analytics): safe
+    requests read from the replica unless the user is pinned to the primary.
+    """
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        state = _routing_state.get()
+        if state is not None and request.method in permissions.SAFE_METHODS and not is_pinned_to_primary(request.user):
+            state['use_replica'] = True
@@ -0,0 +1,133 @@
+# api/routing.py
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .clustering import haversine_m
+
+# Higher weight = visited earlier. Reports without an AI priority count as Low.
+PRIORITY_WEIGHTS = {'High': 3.0, 'Medium': 2.0, 'Low': 1.0}
+
+# ================================================================
+# ROUTE HEURISTIC
+# ================================================================
+
+def weighted_latency(route, start_distances, distances, weights):
+    """
+    Sum over stops of (priority weight x distance travelled before reaching it).
+    Minimising this visits nearby and urgent reports first instead of just
+    minimising total kilometres.
+    """
+    travelled, cost, previous = 0.0, 0.0, None
+    for stop in route:
+        travelled += start_distances[stop] if previous is None else distances[previous][stop]
+        cost += weights[stop] * travelled
+        previous = stop
+    return cost
+
+def _route_sums(route, start_distances, distances, weights):
+    """
+    Running sums that price any segment reversal in O(1). With leg[k] the distance
+    into the k-th stop and suffix[k] the weight of stops k onwards, the weighted
+    latency is sum(leg[k] * suffix[k]); `legs` and `weighted_legs` are cumulative
+    sums of leg and leg * suffix.
+    """
+    suffix = [0.0] * (len(route) + 1)
+    for k in range(len(route) - 1, -1, -1):
+        suffix[k] = suffix[k + 1] + weights[route[k]]
+    legs, weighted_legs, total, weighted = [], [], 0.0, 0.0
+    for k, stop in enumerate(route):
+        leg = start_distances[stop] if k == 0 else distances[route[k - 1]][stop]
+        total, weighted = total + leg, weighted + leg * suffix[k]
+        legs.append(total)
+        weighted_legs.append(weighted)
+    return suffix, legs, weighted_legs
+
+def _reversal_delta(route, i, j, sums, start_distances, distances):
+    """
+    Change in weighted latency from reversing route[i..j]. Only the legs into
+    positions i and j + 1 change length. The legs inside the segment keep their
+    lengths but run backwards, so the leg into position k ends up with
+    suffix[i] + suffix[j + 1] - suffix[k] of weight still ahead of it.
+    """
+    suffix, legs, weighted_legs = sums
+    first, last = route[i], route[j]
+    before = start_distances if i == 0 else distances[route[i - 1]]
+    delta = suffix[i] * (before[last] - before[first])
+    if j + 1 < len(route):
+        after = route[j + 1]
+        delta += suffix[j + 1] * (distances[first][after] - distances[last][after])
+    inner, inner_weighted = legs[j] - legs[i], weighted_legs[j] - weighted_legs[i]
+    return delta + (suffix[i] + suffix[j + 1]) * inner - 2 * inner_weighted
+
+def plan_route(start, stops, max_passes=None):
+    """
+    Orders `stops` for a crew starting at `start` (lat, lng).
+    `stops` is a list of (key, lat, lng, priority). Builds a nearest-neighbour tour
+    where distances are divided by the priority weight, then improves it with 2-opt
+    segment reversals until no reversal lowers the weighted latency. Each candidate
+    reversal is priced incrementally (see _reversal_delta), not by re-costing the route.
+    Returns the keys in visiting order.
+    """
+    n = len(stops)
+    if n < 2:
+        return [stop[0] for stop in stops]
+    max_passes = max_passes or settings.ROUTE_2OPT_MAX_PASSES
+    weights = [PRIORITY_WEIGHTS.get(stop[3], 1.0) for stop in stops]
+    start_distances = [haversine_m(start[0], start[1], stop[1], stop[2]) for stop in stops]
+    distances = [[haversine_m(a[1], a[2], b[1], b[2]) for b in stops] for a in stops]
+
+    # Nearest neighbour, preferring urgent stops.
+    remaining = set(range(n))
+    current = min(remaining, key=lambda i: start_distances[i] / weights[i])
+    route = [current]
+    remaining.remove(current)
+    while remaining:
+        current = min(remaining, key=lambda i: distances[current][i] / weights[i])
+        route.append(current)
+        remaining.remove(current)
+
+    # 2-opt improvement.
+    sums = _route_sums(route, start_distances, distances, weights)
+    for _ in range(max_passes):
+        improved = False
+        for i in range(n - 1):
+            for j in range(i + 1, n):
+                if _reversal_delta(route, i, j, sums, start_distances, distances) < -1e-6:
+                    route = route[:i] + route[i:j + 1][::-1] + route[j + 1:]
+                    sums, improved = _route_sums(route, start_distances, distances, weights), True
+        if not improved:
+            break
+    return [stops[i][0] for i in route]
+
+# ================================================================
+# CACHED QUEUE ORDERING
+# ================================================================
+
+def parse_point(value):
+    """Parses 'lat,lng' into a (lat, lng) tuple of floats. Raises ValueError if invalid."""
+    lat, lng = (float(part) for part in value.split(','))
+    if not (-90 <= lat <= 90 and -180 <= lng <= 180):
+        raise ValueError("Coordinates out of range.")
+    return lat, lng
+
+def ordered_queue_ids(technician_id, start, queue_rows):
+    """
+    Returns report ids of a technician's queue in route order.
+    `queue_rows` is a list of (id, latitude, longitude, ai_priority, updated_at).
+    The result is cached under a key derived from the queue contents and the
+    rounded start point, so it is recomputed only when the queue changes or the
+    crew moves roughly ROUTE_START_PRECISION decimal places.
+    """
+    precision = settings.ROUTE_START_PRECISION
+    signature = hashlib.sha1(repr((
+        round(start[0], precision), round(start[1], precision),
+        sorted((row[0], row[3], row[4].isoformat()) for row in queue_rows),
+    )).encode()).hexdigest()
+    cache_key = f'route:{technician_id}:{signature}'
+    route = cache.get(cache_key)
+    if route is None:
+        route = plan_route(start, [(row[0], row[1], row[2], row[3]) for row in queue_rows])
+        cache.set(cache_key, route, settings.ROUTE_CACHE_TIMEOUT)
+    return route
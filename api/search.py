@@ -0,0 +1,82 @@
+# api/search.py
+from django.conf import settings
+from django.db import connections, router
+from django.db.models import Q
+from rest_framework.pagination import PageNumberPagination
+
+from .models import Report
+
+# FTS5 table maintained by SQLite triggers (migration 0016_report_search_index):
+# one row per report, rowid = report id, remarks = all ReportUpdate remarks joined.
+FTS_TABLE = 'api_report_fts'
+# bm25 column weights: description, address, ai_classification, remarks.
+FTS_WEIGHTS = (1.0, 0.5, 2.0, 0.75)
+
+def fts_available(using):
+    return connections[using].vendor == 'sqlite'
+
+def fts_query(text):
+    """
+    Turns free text into an FTS5 query: every word must match, as a prefix, so
+    'trans spark' finds 'transformer sparking'. Words are quoted, so FTS5 syntax
+    characters typed by users never reach the parser.
+    """
+    return ' '.join('"' + word.replace('"', '""') + '"*' for word in text.split())
+
+class RankedReportSearch:
+    """
+    Reports matching a search, best match first, sliced lazily by Django's
+    Paginator: each page costs one ranked FTS5 lookup plus one in_bulk query.
+
+    Scoring every match of a broad term ("transformer") grows with the table, so
+    only the newest REPORT_SEARCH_MAX_RESULTS matches are counted and ranked.
+    Latency then depends on that window rather than on the number of reports.
+    """
+
+    def __init__(self, text, queryset):
+        self.match = fts_query(text)
+        self.queryset = queryset
+        self.using = router.db_for_read(Report)
+        self.window = settings.REPORT_SEARCH_MAX_RESULTS
+
+    def count(self):
+        with connections[self.using].cursor() as cursor:
+            cursor.execute(f'SELECT count(*) FROM (SELECT 1 FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s LIMIT %s)', [self.match, self.window])
+            return cursor.fetchone()[0]
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, item):
+        if not isinstance(item, slice): return self[item:item + 1][0]
+        start, stop = item.start or 0, min(item.stop or self.window, self.window)
+        if start >= stop: return []
+        weights = ', '.join(str(weight) for weight in FTS_WEIGHTS)
+        with connections[self.using].cursor() as cursor:
+            # FTS5 walks matches in rowid order cheaply; bm25 is computed for the window only.
+            cursor.execute(
+                f'SELECT rowid FROM (SELECT rowid, bm25({FTS_TABLE}, {weights}) AS score FROM {FTS_TABLE} '
+                f'WHERE {FTS_TABLE} MATCH %s ORDER BY rowid DESC LIMIT %s) ORDER BY score, rowid DESC LIMIT %s OFFSET %s',
+                [self.match, self.window, stop - start, start],
+            )
+            ids = [row[0] for row in cursor.fetchall()]
+        reports = self.queryset.in_bulk(ids)
+        return [reports[report_id] for report_id in ids if report_id in reports]
+
+def search_reports(text, queryset):
+    """Full-text search over description, address, AI classification and technician remarks."""
+    if fts_available(router.db_for_read(Report)):
+        return RankedReportSearch(text, queryset)
+    # Other backends: every word must appear in one of the fields; newest first.
+    condition = Q()
+    for word in text.split():
+        condition &= (
+            Q(description__icontains=word) | Q(address__icontains=word)
+            | Q(ai_classification__icontains=word) | Q(reportupdate__remark__icontains=word)
+        )
+    return queryset.filter(condition).distinct().order_by('-created_at')
+
+class ReportSearchPagination(PageNumberPagination):
+    page_size = 25
+    page_size_query_param = 'page_size'
+    max_page_size = 100
@@ -4,7 +4,8 @@ from rest_framework import serializers
 from rest_framework.validators import UniqueValidator
 from django.contrib.auth.models import User
 from django.contrib.auth import authenticate
-from .models import Profile, Report, Suggestion, ReportUpdate
+from django.conf import settings
+from .models import Profile, Report, Suggestion, ReportUpdate, Incident, SuggestionCluster, ReportUpload
 
 # ================================================================
 # AUTHENTICATION & USER MANAGEMENT SERIALIZERS
@@ -21,7 +22,7 @@ class LoginSerializer(serializers.Serializer):
 class ProfileSerializer(serializers.ModelSerializer):
     class Meta:
         model = Profile
-        fields = ['full_name', 'phone_number', 'role', 'gender', 'department', 'specialization']
+        fields = ['full_name', 'phone_number', 'role', 'gender', 'department', 'specialization', 'base_latitude', 'base_longitude']
 
 class RegisterSerializer(serializers.ModelSerializer):
     profile = ProfileSerializer()
@@ -69,8 +70,8 @@ class ReportUpdateSerializer(serializers.ModelSerializer):
     technician = UserDetailSerializer(read_only=True)
     class Meta:
         model = ReportUpdate
-        fields = ['id', 'remark', 'image', 'technician', 'created_at']
-        read_only_fields = ['id', 'technician', 'created_at']
+        fields = ['id', 'remark', 'image', 'thumbnail', 'technician', 'created_at']
+        read_only_fields = ['id', 'thumbnail', 'technician', 'created_at']
 
 class TechnicianSerializer(serializers.ModelSerializer):
     profile = ProfileSerializer(read_only=True)
@@ -83,25 +84,57 @@ class ReportCreateSerializer(serializers.ModelSerializer):
         model = Report
         fields = ['category', 'description', 'image', 'latitude', 'longitude', 'address','ai_priority']
 
+class ReportUploadSerializer(serializers.ModelSerializer):
+    offset = serializers.IntegerField(source='received', read_only=True) # Where the next chunk starts
+    class Meta:
+        model = ReportUpload
+        fields = ['id', 'filename', 'size', 'sha256', 'offset', 'status', 'report', 'created_at']
+        read_only_fields = ['status', 'report', 'created_at']
+    def validate_size(self, value):
+        if not 0 < value <= settings.REPORT_UPLOAD_MAX_BYTES: raise serializers.ValidationError(f"Must be between 1 and {settings.REPORT_UPLOAD_MAX_BYTES} bytes.")
+        return value
+    def validate_sha256(self, value):
+        value = value.lower()
+        if len(value) != 64 or any(c not in '0123456789abcdef' for c in value): raise serializers.ValidationError("Must be a hex SHA-256 digest.")
+        return value
+
 class ReportListDetailSerializer(serializers.ModelSerializer):
     citizen = UserDetailSerializer(read_only=True)
     assigned_technician = UserDetailSerializer(read_only=True)
     report_updates = ReportUpdateSerializer(many=True, read_only=True, source='reportupdate_set')
+    incident_report_count = serializers.IntegerField(source='incident.report_count', read_only=True, allow_null=True)
     class Meta:
         model = Report
         fields = [
             'id', 'citizen', 'assigned_technician', 'category', 'description', 
-            'image', 'latitude', 'longitude', 'address', 'status', 
+            'image', 'thumbnail', 'latitude', 'longitude', 'address', 'status', 
             'ai_classification', 'ai_priority', 'ai_suggestion', 'created_at', 
-            'updated_at', 'resolved_at', 'report_updates'
+            'updated_at', 'resolved_at', 'report_updates', 'incident', 'incident_report_count'
         ]
 
+class IncidentSerializer(serializers.ModelSerializer):
+    primary_report = ReportListDetailSerializer(read_only=True)
+    class Meta:
+        model = Incident
+        fields = ['id', 'latitude', 'longitude', 'report_count', 'first_reported_at', 'last_reported_at', 'primary_report']
+
+class IncidentDetailSerializer(IncidentSerializer):
+    reports = ReportListDetailSerializer(many=True, read_only=True)
+    class Meta(IncidentSerializer.Meta):
+        fields = IncidentSerializer.Meta.fields + ['reports']
+
 class SuggestionSerializer(serializers.ModelSerializer):
     class Meta:
         model = Suggestion
         fields = ['id', 'suggestion_text', 'status', 'created_at', 'updated_at']
         read_only_fields = ['id', 'created_at', 'updated_at']
     
+class SuggestionClusterSerializer(serializers.ModelSerializer):
+    representative_text = serializers.CharField(source='representative.suggestion_text', read_only=True, allow_null=True)
+    class Meta:
+        model = SuggestionCluster
+        fields = ['id', 'size', 'representative', 'representative_text', 'created_at', 'last_suggested_at']
+
 class ReportStatusSerializer(serializers.ModelSerializer):
     class Meta:
         model = Report
@@ -112,6 +145,45 @@ class ReportAssignmentSerializer(serializers.ModelSerializer):
         model = Report
         fields = ['assigned_technician']
 
+class AutoAssignSerializer(serializers.Serializer):
+    report_ids = serializers.ListField(child=serializers.IntegerField(), required=False, allow_empty=False)
+
+class BulkAssignItemSerializer(serializers.Serializer):
+    report_id = serializers.IntegerField()
+    assigned_technician = serializers.IntegerField()
+
+class BulkAssignSerializer(serializers.Serializer):
+    assignments = BulkAssignItemSerializer(many=True, allow_empty=False, max_length=500)
+
+REMARKS_BY_TECHNICIANS_ONLY = "Only the assigned technician can add remarks."
+
+class BulkStatusSerializer(serializers.Serializer):
+    report_ids = serializers.ListField(child=serializers.IntegerField(), allow_empty=False, max_length=500)
+    status = serializers.ChoiceField(choices=Report.STATUS_CHOICES)
+    remark = serializers.CharField(required=False, allow_blank=True)
+    def validate_remark(self, value):
+        # Remarks are ReportUpdates, authored by the technician working the report.
+        if value and self.context['request'].user.profile.role != 'technician': raise serializers.ValidationError(REMARKS_BY_TECHNICIANS_ONLY)
+        return value
+
+class BulkCloseSerializer(serializers.Serializer):
+    report_ids = serializers.ListField(child=serializers.IntegerField(), allow_empty=False, max_length=500)
+    remark = serializers.CharField(required=False, allow_blank=True)
+    def validate_remark(self, value):
+        # Closing is admin-only, and admins do not author ReportUpdates.
+        if value: raise serializers.ValidationError(REMARKS_BY_TECHNICIANS_ONLY)
+        return value
+
+class SyncUpdateItemSerializer(serializers.Serializer):
+    client_id = serializers.UUIDField()
+    report_id = serializers.IntegerField()
+    remark = serializers.CharField()
+    image = serializers.CharField(required=False, allow_blank=True) # Name of the multipart file part
+
+class SyncBatchSerializer(serializers.Serializer):
+    updates = SyncUpdateItemSerializer(many=True, max_length=200)
+    watermark = serializers.DateTimeField(required=False, allow_null=True) # Returned by the previous sync
+
 class AdminReportUpdateSerializer(serializers.ModelSerializer):
     class Meta:
         model = Report
@@ -0,0 +1,34 @@
+# api/signals.py
+import os
+
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+
+from .minhash import remove_from_cluster
+from .models import ArchivedReport, ArchivedReportUpdate, Report, ReportUpdate, ReportUpload, Suggestion
+from .storage import release_blob
+from .uploads import part_path
+
+@receiver(post_delete, sender=Report)
+@receiver(post_delete, sender=ReportUpdate)
+def release_image_blob(sender, instance, **kwargs):
+    if instance.image:
+        release_blob(instance.image.name)
+    if instance.thumbnail:
+        release_blob(instance.thumbnail.name)
+
+@receiver(post_delete, sender=ArchivedReport)
+@receiver(post_delete, sender=ArchivedReportUpdate)
+def release_archived_blob(sender, instance, **kwargs):
+    # Archive rows store plain storage names rather than FieldFiles.
+    for name in (instance.image, instance.thumbnail):
+        if name: release_blob(name)
+
+@receiver(post_delete, sender=Suggestion)
+def shrink_suggestion_cluster(sender, instance, **kwargs):
+    if instance.cluster_id:
+        remove_from_cluster(instance.cluster_id)
+
+@receiver(post_delete, sender=ReportUpload)
+def remove_upload_part(sender, instance, **kwargs):
+    if os.path.exists(part_path(instance)): os.unlink(part_path(instance))
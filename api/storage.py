@@ -0,0 +1,105 @@
+# api/storage.py
+import hashlib
+import os
+import tempfile
+
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+BLOB_PREFIX = 'blobs/'
+
+def blob_name(digest, extension):
+    """Storage path for a digest, fanned out over two directory levels: blobs/ab/cd/abcd...ext"""
+    return f'{BLOB_PREFIX}{digest[:2]}/{digest[2:4]}/{digest}{extension}'
+
+def is_blob(name):
+    return bool(name) and name.startswith(BLOB_PREFIX)
+
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    Stores every upload once, under the SHA-256 of its content.
+
+    The upload is hashed while it streams into a temporary file inside MEDIA_ROOT.
+    If a blob with that digest already exists, the temporary file is discarded;
+    otherwise it is atomically renamed into place. Either way the blob's reference
+    count goes up by one and the blob path is what the model field stores. Files
+    saved before this storage was enabled keep their old names and still resolve.
+    """
+
+    def url(self, name):
+        from .media import signed_query
+
+        url = super().url(name)
+        # Signed so browsers can load the image without an Authorization header (see api/media.py).
+        return f'{url}?{signed_query(name)}' if settings.MEDIA_SIGNED_URLS else url
+
+    def get_available_name(self, name, max_length=None):
+        # The final name comes from the content digest, so the upload_to path never collides.
+        return name
+
+    def incoming_file(self):
+        """A temporary file inside MEDIA_ROOT (same filesystem, so adopting it is a rename)."""
+        incoming_dir = os.path.join(self.location, '.incoming')
+        os.makedirs(incoming_dir, exist_ok=True)
+        return tempfile.NamedTemporaryFile(dir=incoming_dir, delete=False)
+
+    def _save(self, name, content):
+        sha256, size = hashlib.sha256(), 0
+        if hasattr(content, 'seek'): content.seek(0)
+        with self.incoming_file() as tmp:
+            try:
+                for chunk in content.chunks():
+                    sha256.update(chunk)
+                    size += len(chunk)
+                    tmp.write(chunk)
+            except BaseException:
+                tmp.close()
+                os.unlink(tmp.name)
+                raise
+        return self.adopt(tmp.name, sha256.hexdigest(), size, os.path.splitext(name)[1].lower())
+
+    def adopt(self, tmp_path, digest, size, extension):
+        """
+        Moves a fully written incoming file into place as the blob for `digest`
+        (or discards it if that blob exists), counts one reference and returns
+        the blob name. Used by _save and by streaming uploads (api/async_upload.py).
+        """
+        from .models import MediaBlob
+
+        # Count the reference before trusting an existing file: gc_media_blobs only
+        # deletes rows still at zero, so a counted blob can no longer disappear.
+        final_name, counted = blob_name(digest, extension), _add_ref(MediaBlob.objects.filter(digest=digest))
+        if counted:
+            blob = MediaBlob.objects.get(digest=digest)
+            if self.exists(blob.name):
+                os.unlink(tmp_path)
+                return blob.name
+            final_name = blob.name # Row without its file: put the file back
+
+        final_path = self.path(final_name)
+        os.makedirs(os.path.dirname(final_path), exist_ok=True)
+        os.replace(tmp_path, final_path)
+        if self.file_permissions_mode is not None:
+            os.chmod(final_path, self.file_permissions_mode)
+        if not counted:
+            _, created = MediaBlob.objects.get_or_create(digest=digest, defaults={'name': final_name, 'size': size, 'ref_count': 1})
+            if not created: _add_ref(MediaBlob.objects.filter(digest=digest))
+        return final_name
+
+def _add_ref(blobs, count=1):
+    return blobs.update(ref_count=F('ref_count') + count, last_referenced_at=timezone.now())
+
+def release_blob(name, count=1):
+    """Drops references to a blob. The file itself is removed later by gc_media_blobs."""
+    adjust_blob_refs(name, -count)
+
+def adjust_blob_refs(name, delta):
+    from .models import MediaBlob
+
+    if is_blob(name) and delta > 0:
+        _add_ref(MediaBlob.objects.filter(name=name), delta)
+    elif is_blob(name) and delta:
+        MediaBlob.objects.filter(name=name).update(ref_count=Greatest(F('ref_count') + delta, 0))
@@ -0,0 +1,102 @@
+# api/sync.py
+from django.core.files.storage import default_storage
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from .models import Report, ReportUpdate
+from .storage import is_blob, release_blob
+
+class SyncConflict(Exception):
+    """The batch cannot be applied as sent; nothing was written. `client_ids` are the items at fault."""
+
+    def __init__(self, message, client_ids):
+        super().__init__(message)
+        self.client_ids = client_ids
+
+def _discard_files(names):
+    """Undoes photo saves for updates that were never inserted."""
+    for name in names:
+        if is_blob(name): release_blob(name)
+        else: default_storage.delete(name)
+
+def apply_sync_batch(user, items, files):
+    """
+    Applies a batch of remarks queued offline by a technician.
+
+    `items` are validated dicts with client_id, report_id, remark and an optional
+    `image` naming a part in `files`. Items whose client_id the technician already synced are
+    acknowledged again without creating anything, so a client can safely retry a
+    sync that timed out. All new updates are written in one transaction.
+    Returns the per-item results in request order. Raises SyncConflict, writing
+    nothing, if a client_id belongs to another technician's update or a concurrent
+    sync inserted the same client_ids first.
+    """
+    # client_id is unique across all technicians; only the caller's own rows are duplicates.
+    existing, taken = {}, set()
+    for client_id, update_id, technician_id in ReportUpdate.objects.filter(
+        client_id__in=[item['client_id'] for item in items]
+    ).values_list('client_id', 'id', 'technician_id'):
+        if technician_id == user.id: existing[client_id] = update_id
+        else: taken.add(client_id)
+    if taken: raise SyncConflict("client_id is already used by another technician's update.", sorted(taken, key=str))
+    reports = Report.objects.in_bulk({item['report_id'] for item in items})
+    results, to_create, photos, seen = [], [], [], set()
+    for item in items:
+        client_id = item['client_id']
+        if client_id in existing:
+            results.append({"client_id": client_id, "ok": True, "id": existing[client_id], "duplicate": True})
+            continue
+        if client_id in seen:
+            results.append({"client_id": client_id, "ok": False, "error": "client_id repeated within the batch."})
+            continue
+        report = reports.get(item['report_id'])
+        if report is None:
+            results.append({"client_id": client_id, "ok": False, "error": "Report not found."})
+            continue
+        if report.assigned_technician_id != user.id:
+            results.append({"client_id": client_id, "ok": False, "error": "You are not assigned to this report."})
+            continue
+        image = None
+        if item.get('image'):
+            image = files.get(item['image'])
+            if image is None:
+                results.append({"client_id": client_id, "ok": False, "error": f"File part '{item['image']}' is missing."})
+                continue
+        seen.add(client_id)
+        update = ReportUpdate(report=report, technician=user, remark=item['remark'], client_id=client_id)
+        if image is not None: photos.append((update, image))
+        to_create.append(update)
+        results.append({"client_id": client_id, "ok": True, "update": update, "duplicate": False})
+
+    # Photos are stored before the transaction (bulk_create would store them inside it,
+    # where a rollback undoes the blob references but not the files), and undone on failure.
+    stored = []
+    try:
+        for update, image in photos:
+            update.image.save(image.name, image, save=False)
+            stored.append(update.image.name)
+        with transaction.atomic():
+            ReportUpdate.objects.bulk_create(to_create, batch_size=200)
+            Report.objects.filter(pk__in={update.report_id for update in to_create}).update(updated_at=timezone.now())
+    except IntegrityError:
+        _discard_files(stored)
+        # A concurrent sync of the same batch won the race; the retry will see its rows.
+        raise SyncConflict("A concurrent sync of the same updates is in progress. Retry.", [update.client_id for update in to_create])
+    except BaseException:
+        _discard_files(stored)
+        raise
+
+    # bulk_create sets primary keys on SQLite and PostgreSQL; fall back to a lookup elsewhere.
+    created = {update.client_id: update.id for update in to_create}
+    if any(pk is None for pk in created.values()):
+        created = dict(ReportUpdate.objects.filter(client_id__in=list(created)).values_list('client_id', 'id'))
+    for result in results:
+        update = result.pop('update', None)
+        if update is not None: result['id'] = created[update.client_id]
+    return results
+
+def changed_report_ids(user, since):
+    """Ids of the technician's open reports that changed after the `since` watermark."""
+    queryset = Report.objects.filter(assigned_technician=user, status__in=['Assigned', 'In Progress'])
+    if since is not None: queryset = queryset.filter(updated_at__gt=since)
+    return list(queryset.values_list('id', flat=True))
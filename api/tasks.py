@@ -1,29 +1,101 @@
 # api/tasks.py
-from .models import Report
-from .ai_service import run_ai_analysis
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
-def analyze_report_image_task(report_id):
+from django.conf import settings
+from django.db import close_old_connections
+from django.utils import timezone
+
+from .models import Report, ReportAnalysisTiming
+from .ai_service import load_image, run_ai_analysis
+from .clustering import claim_duplicates, propagate_analysis_to_duplicates, waiting_duplicates
+from .metrics import AI_INFERENCE_SECONDS, AI_TASKS_RUNNING
+from .pipeline import StageTimer, record_analysis_timing
+
+logger = logging.getLogger(__name__)
+
+def analyze_report_image_task(report_id, queued_at=None):
     """
     A function to run AI analysis on a report image in a background thread.
+    Stage timings are stored per report (ReportAnalysisTiming); queue wait is
+    measured from `queued_at`, or from report creation when not given.
     """
     print(f"Starting background AI analysis for report ID: {report_id}")
+    AI_TASKS_RUNNING.inc()
+    started_at, timer = timezone.now(), StageTimer()
     try:
         report = Report.objects.get(id=report_id)
         if report.image:
+            with timer.stage('image_load'):
+                image = load_image(report.image.path)
             # Run the heavy AI processing
-            ai_results = run_ai_analysis(report.image.path)
-            
+            with timer.stage('inference'):
+                ai_results = run_ai_analysis(image)
+            AI_INFERENCE_SECONDS.observe(timer.ms['inference'] / 1000, 'ok' if ai_results else 'failed')
+
             # Update the report with the AI results (excluding priority)
-            if ai_results:
-                report.ai_classification = ai_results.get('ai_classification')
-                report.ai_suggestion = ai_results.get('ai_suggestion')
-                report.status = 'Received' # Update status after analysis
-                report.save()
-                print(f"✅ Successfully analyzed and updated report ID: {report_id}")
-            else:
-                report.status = 'Received'
-                report.ai_classification = 'Manual Review Required'
-                report.save()
-                print(f"⚠️ AI analysis failed for report ID: {report_id}, status updated for manual review.")
+            with timer.stage('db_save'):
+                if ai_results:
+                    report.ai_classification = ai_results.get('ai_classification')
+                    report.ai_suggestion = ai_results.get('ai_suggestion')
+                    report.status = 'Received' # Update status after analysis
+                    report.save()
+                    print(f"✅ Successfully analyzed and updated report ID: {report_id}")
+                else:
+                    report.status = 'Received'
+                    report.ai_classification = 'Manual Review Required'
+                    report.save()
+                    print(f"⚠️ AI analysis failed for report ID: {report_id}, status updated for manual review.")
+                propagate_analysis_to_duplicates(report)
+            outcome = ReportAnalysisTiming.Outcome.OK if ai_results else ReportAnalysisTiming.Outcome.FAILED
+            record_analysis_timing(report, started_at, timer, outcome, queued_at)
     except Report.DoesNotExist:
-        print(f"🚨 Report with ID {report_id} not found for background task.")
\ No newline at end of file
+        print(f"🚨 Report with ID {report_id} not found for background task.")
+    except Exception:
+        # This report will not pass results on, so its waiting duplicates run their own analysis.
+        for duplicate_id in claim_duplicates(waiting_duplicates(report_id)): enqueue_analysis(duplicate_id)
+        raise
+    finally:
+        AI_TASKS_RUNNING.dec()
+
+# ================================================================
+# IN-PROCESS ANALYSIS POOL
+# ================================================================
+
+_pool_lock = threading.Lock()
+_pool = None
+_queued = 0
+
+def _run_analysis(report_id, queued_at):
+    global _queued
+    from .admission import resume_deferred
+
+    close_old_connections()
+    try:
+        analyze_report_image_task(report_id, queued_at)
+    except Exception:
+        # The executor would keep the exception on a future nobody reads.
+        logger.exception("AI analysis failed for report ID: %s", report_id)
+    finally:
+        with _pool_lock:
+            _queued -= 1
+            idle = _queued == 0
+    try:
+        # Once the queue drains, pick up reports deferred while the backlog was high.
+        if idle: resume_deferred()
+    except Exception:
+        logger.exception("Resuming deferred reports failed")
+    finally:
+        close_old_connections()
+
+def enqueue_analysis(report_id):
+    """
+    Queues a report for analysis on a pool of AI_ANALYSIS_WORKERS threads, started
+    on first use. Returns immediately, so it is safe to call from async code.
+    """
+    global _pool, _queued
+    with _pool_lock:
+        if _pool is None: _pool = ThreadPoolExecutor(max_workers=settings.AI_ANALYSIS_WORKERS, thread_name_prefix='ai-analysis')
+        _queued += 1
+    return _pool.submit(_run_analysis, report_id, timezone.now())
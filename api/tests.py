@@ -1,3 +1,1414 @@
-from django.test import TestCase
+import asyncio
+import gzip
+import hashlib
+import io
+import json
+import os
+import random
+import tempfile
+import time
+import unittest
+import uuid
+from datetime import datetime, timezone as dt_timezone
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.asgi import get_asgi_application
+from django.contrib.auth.tokens import default_token_generator
+from django.core import mail
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.conf import settings
+from django.db import IntegrityError, connection, connections
+from django.db.models import Count
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+import numpy as np
+from PIL import Image
+from rest_framework import permissions
+from rest_framework.authtoken.models import Token
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+from rest_framework.test import APIClient, APIRequestFactory, force_authenticate
+from rest_framework.views import APIView
+
+from . import admission, archive, assignment, clustering, compression, media, outbox, pipeline, renderers, tasks, uploads
+from .async_upload import StreamingReportUploadApp, UploadError, parse_multipart
+from .clustering import share_primary_analysis
+from . import analytics, minhash, routing
+from .models import ArchivedReport, ArchivedReportUpdate, Incident, MediaBlob, OutboundEmail, Profile, Report, ReportAnalysisTiming, ReportUpdate, ReportUpload, Suggestion, SuggestionBucket, SuggestionCluster
+from .routers import ReplicaReadMixin, ReplicaRouter, ReplicaRoutingMiddleware
+from .search import search_reports
+from .views import AssignedReportListView, MyReportsListView, MySuggestionsListView, ReportListView, SuggestionListView
+
+# ================================================================
+# QUERY PLAN REGRESSION TESTS
+# ================================================================
+
+@unittest.skipUnless(connection.vendor == 'sqlite', "EXPLAIN QUERY PLAN output is SQLite specific.")
+class QueryPlanTests(TestCase):
+    """
+    Runs EXPLAIN QUERY PLAN on the hot querysets from api/views.py and fails if
+    any of them falls back to a full table scan or sorts in a temporary B-tree.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.citizen = User.objects.create_user('citizen@example.com', 'citizen@example.com', 'Password123')
+        Profile.objects.create(user=cls.citizen, role='citizen')
+        cls.technician = User.objects.create_user('tech@example.com', 'tech@example.com', 'Password123')
+        Profile.objects.create(user=cls.technician, role='technician')
+        cls.admin = User.objects.create_user('admin@example.com', 'admin@example.com', 'Password123')
+        Profile.objects.create(user=cls.admin, role='admin')
+        for i in range(20):
+            Report.objects.create(
+                citizen=cls.citizen, latitude=23.02, longitude=72.57, status=['Received', 'Assigned', 'In Progress'][i % 3],
+                assigned_technician=cls.technician if i % 3 else None, category='Maintenance',
+            )
+            Suggestion.objects.create(citizen=cls.citizen, suggestion_text=f"Suggestion {i}")
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+    def view_queryset(self, view_class, user):
+        view = view_class()
+        view.request = view.initialize_request(APIRequestFactory().get('/'))
+        view.request.user = user
+        view.format_kwarg = None
+        return view.get_queryset()
+
+    def assertUsesIndexes(self, queryset, allow_sort=False):
+        plan = queryset.explain()
+        for line in plan.splitlines():
+            if 'SCAN' in line and 'USING' not in line:
+                self.fail(f"Full table scan in query plan:\n{plan}\n\nSQL: {queryset.query}")
+            if not allow_sort and 'USE TEMP B-TREE FOR ORDER BY' in line:
+                self.fail(f"Unindexed ORDER BY in query plan:\n{plan}\n\nSQL: {queryset.query}")
+
+    def test_report_list(self):
+        self.assertUsesIndexes(self.view_queryset(ReportListView, self.admin))
+
+    def test_my_reports(self):
+        self.assertUsesIndexes(self.view_queryset(MyReportsListView, self.citizen))
+
+    def test_assigned_reports(self):
+        # status__in over two values merges two index ranges, so SQLite still sorts the (small) result.
+        self.assertUsesIndexes(self.view_queryset(AssignedReportListView, self.technician), allow_sort=True)
+
+    def test_suggestion_list(self):
+        self.assertUsesIndexes(self.view_queryset(SuggestionListView, self.admin))
+
+    def test_my_suggestions(self):
+        self.assertUsesIndexes(self.view_queryset(MySuggestionsListView, self.citizen))
+
+    def test_dashboard_queries(self):
+        start_of_today = timezone.localtime().replace(hour=0, minute=0, second=0, microsecond=0)
+        self.assertUsesIndexes(Report.objects.filter(status='In Progress'))
+        self.assertUsesIndexes(Report.objects.filter(created_at__gte=start_of_today))
+        self.assertUsesIndexes(Report.objects.values('category').annotate(count=Count('category')), allow_sort=True)
+        self.assertUsesIndexes(
+            Report.objects.filter(created_at__gte=start_of_today - timedelta(days=6)).values('created_at__date').annotate(count=Count('id')),
+            allow_sort=True,
+        )
+
+    def test_technician_workload(self):
+        self.assertUsesIndexes(Report.objects.filter(assigned_technician=self.technician, status__in=['Assigned', 'In Progress']))
+        self.assertUsesIndexes(Report.objects.filter(status='Received', assigned_technician__isnull=True))
+
+# ================================================================
+# READ REPLICA ROUTING TESTS
+# ================================================================
+
+class _RoutingProbeView(ReplicaReadMixin, APIView):
+    """Reports which alias the router picks for reads inside the view, and how many reports that database holds."""
+    permission_classes = [permissions.AllowAny]
+    def get(self, request):
+        return Response({"alias": ReplicaRouter().db_for_read(Report), "reports": Report.objects.count()})
+    def post(self, request):
+        ReplicaRouter().db_for_write(Report)
+        return self.get(request)
+
+class ReplicaRouterTests(TestCase):
+    """
+    Runs against a second, real SQLite database registered as the 'replica'
+    alias; it only has an empty report table. The alias is added once the test
+    framework has set up its databases, and only reads go to it.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.directory = tempfile.TemporaryDirectory()
+        replica = {**settings.DATABASES['default'], 'NAME': os.path.join(cls.directory.name, 'replica.sqlite3'), 'TEST': {}}
+        cls.databases_override = override_settings(DATABASES={'default': settings.DATABASES['default'], 'replica': replica})
+        cls.databases_override.enable()
+        cls.reload_connection_settings()
+        cls.databases = cls.databases | {'replica'}
+        with connections['replica'].schema_editor() as editor: editor.create_model(Report)
+
+    @classmethod
+    def tearDownClass(cls):
+        connections['replica'].close()
+        del connections['replica']
+        cls.databases = cls.databases - {'replica'}
+        cls.databases_override.disable()
+        cls.reload_connection_settings()
+        cls.directory.cleanup()
+        super().tearDownClass()
+
+    @staticmethod
+    def reload_connection_settings():
+        # The handler caches DATABASES as first read; clearing it makes it read the setting again.
+        connections._settings = None
+        connections.__dict__.pop('settings', None)
+
+    def setUp(self):
+        cache.clear()
+        self.factory = APIRequestFactory()
+        self.handler = ReplicaRoutingMiddleware(_RoutingProbeView.as_view())
+        self.user = User.objects.create_user('admin@example.com', 'admin@example.com', 'Password123')
+        self.other_user = User.objects.create_user('admin2@example.com', 'admin2@example.com', 'Password123')
+        Report.objects.create(citizen=self.user, latitude=23.02, longitude=72.57)
+
+    def request(self, method, user):
+        request = getattr(self.factory, method)('/')
+        force_authenticate(request, user=user)
+        return self.handler(request).data
+
+    def test_reads_outside_opted_in_views_use_default(self):
+        self.assertIsNone(ReplicaRouter().db_for_read(Report))
+        self.assertEqual(Report.objects.count(), 1)
+
+    def test_safe_request_reads_from_replica(self):
+        self.assertEqual(self.request('get', self.user), {'alias': 'replica', 'reports': 0})
+
+    def test_reads_after_a_write_stay_on_primary(self):
+        self.assertEqual(self.request('post', self.user), {'alias': None, 'reports': 1})
+        # The writer is pinned to the primary; other users keep using the replica.
+        self.assertEqual(self.request('get', self.user), {'alias': None, 'reports': 1})
+        self.assertEqual(self.request('get', self.other_user), {'alias': 'replica', 'reports': 0})
+
+# ================================================================
+# FULL-TEXT SEARCH TESTS
+# ================================================================
+
+class SearchTests(TestCase):
+
+    def setUp(self):
+        self.citizen = User.objects.create_user('citizen@example.com', 'citizen@example.com', 'Password123')
+
+    def report(self, **fields):
+        return Report.objects.create(citizen=self.citizen, latitude=23.02, longitude=72.57, **fields)
+
+    def search(self, text):
+        return [report.pk for report in search_reports(text, Report.objects.all())[0:25]]
+
+    @unittest.skipUnless(connection.vendor == 'sqlite', "The FTS5 index is SQLite specific.")
+    def test_index_triggers_survive_migrations(self):
+        # SQLite drops triggers when a migration rebuilds api_report (see 0020).
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT name FROM sqlite_master WHERE type = 'trigger' AND name LIKE '%%_fts_%%'")
+            triggers = {row[0] for row in cursor.fetchall()}
+        self.assertEqual(triggers, {
+            'api_report_fts_insert', 'api_report_fts_update', 'api_report_fts_delete',
+            'api_reportupdate_fts_insert', 'api_reportupdate_fts_update', 'api_reportupdate_fts_delete',
+        })
+
+    def test_reports_saved_after_migrating_are_found(self):
+        report = self.report(description="Transformer sparking near the school", address="Ward 5, Surat")
+        self.assertEqual(self.search('transformer'), [report.pk])
+        Report.objects.filter(pk=report.pk).update(address="Station Road, Bhuj")
+        self.assertEqual(self.search('bhuj'), [report.pk])
+        ReportUpdate.objects.create(report=report, technician=self.citizen, remark="Replaced the fuse")
+        self.assertEqual(self.search('fuse'), [report.pk])
+        report.delete()
+        self.assertEqual(self.search('transformer'), [])
+
+    @unittest.skipUnless(connection.vendor == 'sqlite', "The FTS5 index is SQLite specific.")
+    def test_ranks_by_weighted_field_and_matches_prefixes(self):
+        classified = self.report(description="Meter box damaged", ai_classification="Transformer fault")
+        addressed = self.report(description="Meter box damaged", address="Transformer Lane")
+        self.report(description="Transformer noise", address="Ward 9") # no 'meter'
+        # ai_classification weighs 2.0 and address 0.5, so the older classified report still ranks first.
+        self.assertEqual(self.search('trans meter'), [classified.pk, addressed.pk])
+
+    def test_pagination_counts_and_slices_in_rank_order(self):
+        admin = User.objects.create_user('admin@example.com', 'admin@example.com', 'Password123')
+        Profile.objects.create(user=admin, role='admin')
+        client = APIClient()
+        client.force_authenticate(admin)
+        newest_first = [self.report(description="Leaning pole").pk for _ in range(5)][::-1]
+        page = client.get('/api/reports/search/', {'q': 'pole', 'page_size': 2, 'page': 2}).data
+        self.assertEqual(page['count'], 5)
+        self.assertEqual([row['id'] for row in page['results']], newest_first[2:4])
+        self.assertEqual(client.get('/api/reports/search/', {}).status_code, 400)
+
+    @override_settings(REPORT_SEARCH_MAX_RESULTS=3)
+    @unittest.skipUnless(connection.vendor == 'sqlite', "The FTS5 index is SQLite specific.")
+    def test_only_the_newest_matches_are_ranked(self):
+        ids = [self.report(description="Leaning pole").pk for _ in range(5)]
+        results = search_reports('pole', Report.objects.all())
+        self.assertEqual(results.count(), 3)
+        self.assertEqual([report.pk for report in results[0:10]], ids[:1:-1])
+
+    @mock.patch('api.search.fts_available', return_value=False)
+    def test_fallback_matches_every_word_in_any_field(self, _):
+        remarked = self.report(description="Pole leaning")
+        for remark in ("Pole straightened", "Pole painted"):
+            ReportUpdate.objects.create(report=remarked, technician=self.citizen, remark=remark)
+        addressed = self.report(description="Sparking wires", address="Pole Street")
+        self.assertEqual(self.search('POLE'), [addressed.pk, remarked.pk]) # newest first, once each
+        self.assertEqual(self.search('pole sparking'), [addressed.pk])
+        self.assertEqual(self.search('painted'), [remarked.pk])
+
+# ================================================================
+# MEDIA BLOB TESTS (GARBAGE COLLECTION, RECOMPRESSION)
+# ================================================================
+
+class MediaBlobGCTests(TestCase):
+
+    def blob(self, digest, ref_count, referenced_hours_ago=48):
+        blob = MediaBlob.objects.create(digest=digest * 64, name=f'blobs/{digest}{digest}/{digest}.jpg', size=10, ref_count=ref_count)
+        at = timezone.now() - timedelta(hours=referenced_hours_ago)
+        MediaBlob.objects.filter(pk=blob.pk).update(created_at=timezone.now() - timedelta(days=7), last_referenced_at=at)
+        return blob
+
+    def gc(self):
+        call_command('gc_media_blobs', stdout=mock.Mock())
+        return {blob.digest[0]: blob.ref_count for blob in MediaBlob.objects.all()}
+
+    def test_recounts_without_deleting_in_flight_references(self):
+        citizen = User.objects.create_user('citizen@example.com', 'citizen@example.com', 'Password123')
+        self.blob('a', 0)                           # orphan: deleted
+        self.blob('b', 3)                           # leaked count, no references: lowered and deleted
+        Report.objects.create(citizen=citizen, latitude=23.02, longitude=72.57, image=self.blob('c', 0).name) # under-counted: raised
+        self.blob('d', 1, referenced_hours_ago=0)   # re-uploaded during the run, report not committed yet: kept
+        self.assertEqual(self.gc(), {'c': 1, 'd': 1})
+
+class RecompressMediaTests(TestCase):
+
+    def test_only_selected_rows_move_off_a_shared_blob(self):
+        from .management.commands.recompress_media import Command
+
+        citizen = User.objects.create_user('citizen@example.com', 'citizen@example.com', 'Password123')
+        shared = MediaBlob.objects.create(digest='a' * 64, name='blobs/aa/aa/a.jpg', size=10, ref_count=2)
+        MediaBlob.objects.create(digest='b' * 64, name='blobs/bb/bb/b.webp', size=5, ref_count=1)
+        MediaBlob.objects.create(digest='c' * 64, name='blobs/cc/cc/c.webp', size=1, ref_count=1)
+        old = Report.objects.create(citizen=citizen, latitude=23.02, longitude=72.57, status='Closed', image=shared.name)
+        Report.objects.filter(pk=old.pk).update(updated_at=timezone.now() - timedelta(days=400))
+        fresh = Report.objects.create(citizen=citizen, latitude=23.02, longitude=72.57, status='Received', image=shared.name)
+
+        command = Command()
+        rows, _ = command.candidates(age_days=180)
+        self.assertEqual(rows, {shared.name: {Report: [old.pk], ReportUpdate: []}})
+        self.assertEqual(command.repoint(shared.name, rows[shared.name], 'blobs/bb/bb/b.webp', 'blobs/cc/cc/c.webp', counted=1), 1)
+        old.refresh_from_db(), fresh.refresh_from_db()
+        self.assertEqual((old.image.name, fresh.image.name), ('blobs/bb/bb/b.webp', shared.name))
+        self.assertEqual(dict(MediaBlob.objects.values_list('digest', 'ref_count')), {'a' * 64: 1, 'b' * 64: 1, 'c' * 64: 1})
+
+# ================================================================
+# MEDIA SERVING TESTS
+# ================================================================
+
+class MediaServeTests(TestCase):
+    IMAGE = 'reports/2026/01/photo.jpg'
+    THUMBNAIL = 'blobs/ab/cd/' + 'abcd' * 16 + '.webp'
+
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        self.enterContext(override_settings(MEDIA_ROOT=media.name))
+        for name, data in ((self.IMAGE, b'0123456789' * 10), (self.THUMBNAIL, b'thumbnail')):
+            os.makedirs(os.path.dirname(os.path.join(media.name, name)), exist_ok=True)
+            with open(os.path.join(media.name, name), 'wb') as f: f.write(data)
+        self.media_root = media.name
+        self.owner = User.objects.create_user('citizen@example.com', 'citizen@example.com', 'Password123')
+        Profile.objects.create(user=self.owner, role='citizen')
+        self.stranger = User.objects.create_user('other@example.com', 'other@example.com', 'Password123')
+        Profile.objects.create(user=self.stranger, role='citizen')
+        Report.objects.create(citizen=self.owner, latitude=23.02, longitude=72.57, image=self.IMAGE, thumbnail=self.THUMBNAIL)
+        self.client = APIClient()
+
+    def get(self, name, query='', user=None, **headers):
+        if user: self.client.credentials(HTTP_AUTHORIZATION=f'Token {Token.objects.get_or_create(user=user)[0].key}')
+        return self.client.get(f'/media/{name}' + (f'?{query}' if query else ''), **headers)
+
+    def body(self, response):
+        return b''.join(response.streaming_content) if response.streaming else response.content
+
+    def test_signed_url_without_token(self):
+        response = self.get(self.IMAGE, media.signed_query(self.IMAGE))
+        self.assertEqual((response.status_code, self.body(response)), (200, b'0123456789' * 10))
+
+    def test_expired_or_foreign_signature_needs_a_token(self):
+        stale = int(time.time() // settings.MEDIA_URL_SIGNATURE_TTL) - 2
+        self.assertEqual(self.get(self.IMAGE, f'e={stale}&s={media._signature(self.IMAGE, stale)}').status_code, 401)
+        self.assertEqual(self.get(self.IMAGE, media.signed_query(self.THUMBNAIL)).status_code, 401)
+
+    def test_owner_token_reaches_image_and_thumbnail(self):
+        self.assertEqual(self.get(self.IMAGE, user=self.owner).status_code, 200)
+        self.assertEqual(self.get(self.THUMBNAIL, user=self.owner).status_code, 200)
+
+    def test_stranger_token_is_refused(self):
+        self.assertEqual(self.get(self.IMAGE, user=self.stranger).status_code, 403)
+        self.assertEqual(self.get(self.THUMBNAIL, user=self.stranger).status_code, 403)
+
+    def test_range_requests(self):
+        query = media.signed_query(self.IMAGE)
+        response = self.get(self.IMAGE, query, HTTP_RANGE='bytes=10-14')
+        self.assertEqual((response.status_code, response['Content-Range'], self.body(response)), (206, 'bytes 10-14/100', b'01234'))
+        response = self.get(self.IMAGE, query, HTTP_RANGE='bytes=-3')
+        self.assertEqual((response.status_code, self.body(response)), (206, b'789'))
+        response = self.get(self.IMAGE, query, HTTP_RANGE='bytes=100-')
+        self.assertEqual((response.status_code, response['Content-Range']), (416, 'bytes */100'))
+
+    def test_cache_headers(self):
+        blob = self.get(self.THUMBNAIL, media.signed_query(self.THUMBNAIL))
+        self.assertEqual(blob['Cache-Control'], f'private, max-age={settings.MEDIA_IMMUTABLE_MAX_AGE}, immutable')
+        self.assertEqual(self.get(self.THUMBNAIL, media.signed_query(self.THUMBNAIL), HTTP_IF_NONE_MATCH=blob['ETag']).status_code, 304)
+        plain = self.get(self.IMAGE, media.signed_query(self.IMAGE))
+        self.assertEqual(plain['Cache-Control'], f'private, max-age={settings.MEDIA_MUTABLE_MAX_AGE}')
+
+    def test_offload_headers(self):
+        with self.settings(MEDIA_ACCEL_REDIRECT_PREFIX='/protected/'):
+            response = self.get(self.IMAGE, media.signed_query(self.IMAGE))
+            self.assertEqual((response['X-Accel-Redirect'], response.content), (f'/protected/{self.IMAGE}', b''))
+        with self.settings(MEDIA_X_SENDFILE=True):
+            response = self.get(self.IMAGE, media.signed_query(self.IMAGE))
+            self.assertEqual(response['X-Sendfile'], os.path.join(self.media_root, self.IMAGE))
+
+# ================================================================
+# REPORT ARCHIVE TESTS
+# ================================================================
+
+class ReportArchiveTests(TestCase):
+    BLOB = 'blobs/ab/cd/' + 'abcd' * 16 + '.jpg'
+
+    def setUp(self):
+        self.citizen = User.objects.create_user('citizen@example.com', 'citizen@example.com', 'Password123')
+        Profile.objects.create(user=self.citizen, role='citizen', full_name='Citizen')
+        self.technician = User.objects.create_user('tech@example.com', 'tech@example.com', 'Password123')
+        Profile.objects.create(user=self.technician, role='technician', full_name='Technician')
+        self.admin = User.objects.create_user('admin@example.com', 'admin@example.com', 'Password123')
+        Profile.objects.create(user=self.admin, role='admin')
+        MediaBlob.objects.create(digest='abcd' * 16, name=self.BLOB, size=10, ref_count=2)
+        self.old = timezone.now() - timedelta(days=settings.REPORT_ARCHIVE_AFTER_DAYS + 1)
+        self.report = self.report_with('Closed', self.old, image=self.BLOB, resolved_at=self.old, category='Maintenance', description="Pole down.")
+        ReportUpdate.objects.create(report=self.report, technician=self.technician, remark="Replaced the pole.", image=self.BLOB)
+        self.incident = Incident.objects.create(primary_report=self.report, latitude=23.02, longitude=72.57)
+        Report.objects.filter(pk=self.report.pk).update(incident=self.incident)
+        self.client = APIClient()
+
+    def report_with(self, status, updated_at, **fields):
+        report = Report.objects.create(citizen=self.citizen, assigned_technician=self.technician, latitude=23.02, longitude=72.57, status=status, **fields)
+        Report.objects.filter(pk=report.pk).update(updated_at=updated_at)
+        return report
+
+    def detail(self):
+        self.client.force_authenticate(self.citizen)
+        response = self.client.get(f'/api/reports/{self.report.pk}/')
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def pdf_html(self):
+        self.client.force_authenticate(self.admin)
+        with mock.patch('api.views.pisa.CreatePDF', return_value=mock.Mock(err=0)) as create_pdf:
+            response = self.client.get(f'/api/admin/reports/{self.report.pk}/download/')
+        self.assertEqual((response.status_code, response['Content-Type']), (200, 'application/pdf'))
+        return create_pdf.call_args[0][0]
+
+    def test_archived_report_reads_like_the_live_one(self):
+        detail, html = self.detail(), self.pdf_html()
+        self.assertEqual([update['remark'] for update in detail['report_updates']], ["Replaced the pole."])
+        received = self.report_with('Received', self.old)
+        recent = self.report_with('Closed', timezone.now(), resolved_at=timezone.now())
+
+        call_command('archive_reports', stdout=io.StringIO())
+
+        self.assertFalse(Report.objects.filter(pk=self.report.pk).exists())
+        self.assertFalse(ReportUpdate.objects.exists())
+        self.assertEqual(set(Report.objects.values_list('pk', flat=True)), {received.pk, recent.pk})
+        self.assertEqual(list(ArchivedReport.objects.values_list('pk', flat=True)), [self.report.pk])
+        self.assertEqual(ArchivedReportUpdate.objects.count(), 1)
+        self.incident.refresh_from_db()
+        self.assertIsNone(self.incident.primary_report_id)
+        self.assertEqual(MediaBlob.objects.get(name=self.BLOB).ref_count, 2)
+        self.assertEqual(self.detail(), detail)
+        self.assertEqual(self.pdf_html(), html)
+
+    def test_reopened_report_is_not_archived(self):
+        # Selected while Closed, reopened before the batch was locked.
+        Report.objects.filter(pk=self.report.pk).update(status='In Progress')
+        self.assertEqual(archive.archive_reports([self.report.pk]), 0)
+        self.assertTrue(Report.objects.filter(pk=self.report.pk).exists())
+        self.assertFalse(ArchivedReport.objects.exists())
+        self.assertEqual(MediaBlob.objects.get(name=self.BLOB).ref_count, 2)
+
+# ================================================================
+# BULK ASSIGN / STATUS / CLOSE TESTS
+# ================================================================
+
+class BulkOperationTests(TestCase):
+
+    def setUp(self):
+        self.citizen = User.objects.create_user('citizen@example.com', 'citizen@example.com', 'Password123')
+        Profile.objects.create(user=self.citizen, role='citizen')
+        self.technician = User.objects.create_user('tech@example.com', 'tech@example.com', 'Password123')
+        Profile.objects.create(user=self.technician, role='technician')
+        self.admin = User.objects.create_user('admin@example.com', 'admin@example.com', 'Password123')
+        Profile.objects.create(user=self.admin, role='admin')
+        self.client = APIClient()
+
+    def report(self, status, technician=None):
+        return Report.objects.create(citizen=self.citizen, latitude=23.02, longitude=72.57, status=status, assigned_technician=technician)
+
+    def post(self, user, url, data):
+        self.client.force_authenticate(user)
+        return self.client.post(f'/api/reports/bulk/{url}/', data, format='json')
+
+    def statuses(self, *reports):
+        return [Report.objects.get(pk=report.pk).status for report in reports]
+
+    def test_role_gate(self):
+        report = self.report('Received')
+        assignments = {'assignments': [{'report_id': report.pk, 'assigned_technician': self.technician.pk}]}
+        self.assertEqual(self.post(self.citizen, 'assign', assignments).status_code, 403)
+        self.assertEqual(self.post(self.technician, 'assign', assignments).status_code, 403)
+        self.assertEqual(self.post(self.citizen, 'status', {'report_ids': [report.pk], 'status': 'Assigned'}).status_code, 403)
+        self.assertEqual(self.post(self.technician, 'close', {'report_ids': [report.pk]}).status_code, 403)
+        self.assertEqual(self.statuses(report), ['Received'])
+
+        response = self.post(self.admin, 'assign', assignments)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['results'], [{'report_id': report.pk, 'ok': True, 'status': 'Assigned', 'assigned_technician': self.technician.pk}])
+        self.assertEqual(self.statuses(report), ['Assigned'])
+
+    def test_repeated_report_rejects_the_batch(self):
+        first, second = self.report('Received'), self.report('Received')
+        item = lambda report: {'report_id': report.pk, 'assigned_technician': self.technician.pk}
+        response = self.post(self.admin, 'assign', {'assignments': [item(first), item(second), item(first)]})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual([result['ok'] for result in response.json()['results']], [False, False, False])
+        self.assertEqual(response.json()['results'][2]['error'], "Report repeated within the batch.")
+        self.assertEqual(self.statuses(first, second), ['Received', 'Received'])
+
+    def test_pending_analysis_is_not_assigned(self):
+        report = self.report('Pending Analysis')
+        response = self.post(self.admin, 'assign', {'assignments': [{'report_id': report.pk, 'assigned_technician': self.technician.pk}]})
+        self.assertEqual(response.status_code, 400)
+        report.refresh_from_db()
+        self.assertEqual((report.status, report.assigned_technician_id), ('Pending Analysis', None))
+
+    def test_one_invalid_transition_rolls_back_the_batch(self):
+        reports = [self.report('Assigned', self.technician) for _ in range(3)] + [self.report('Resolved', self.technician)]
+        response = self.post(self.technician, 'status', {'report_ids': [report.pk for report in reports], 'status': 'In Progress', 'remark': "On site."})
+        self.assertEqual(response.status_code, 400)
+        results = response.json()['results']
+        self.assertEqual(results[3]['allowed_next_statuses'], [])
+        self.assertTrue(all(result['error'].startswith("Not applied") for result in results[:3]))
+        self.assertEqual(self.statuses(*reports), ['Assigned'] * 3 + ['Resolved'])
+        self.assertFalse(ReportUpdate.objects.exists())
+
+        response = self.post(self.technician, 'status', {'report_ids': [report.pk for report in reports[:3]], 'status': 'In Progress', 'remark': "On site."})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.statuses(*reports), ['In Progress'] * 3 + ['Resolved'])
+        self.assertEqual(ReportUpdate.objects.filter(technician=self.technician, remark="On site.").count(), 3)
+
+    def test_technician_only_moves_own_reports(self):
+        other = User.objects.create_user('other@example.com', 'other@example.com', 'Password123')
+        Profile.objects.create(user=other, role='technician')
+        mine, theirs = self.report('Assigned', self.technician), self.report('Assigned', other)
+        response = self.post(self.technician, 'status', {'report_ids': [mine.pk, theirs.pk], 'status': 'In Progress'})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['results'][1]['error'], "You are not assigned to this report.")
+        self.assertEqual(self.statuses(mine, theirs), ['Assigned', 'Assigned'])
+
+    def test_admins_cannot_add_remarks(self):
+        report = self.report('Resolved', self.technician)
+        self.assertEqual(self.post(self.admin, 'close', {'report_ids': [report.pk], 'remark': "Done."}).status_code, 400)
+        self.assertEqual(self.post(self.admin, 'status', {'report_ids': [report.pk], 'status': 'Closed', 'remark': "Done."}).status_code, 400)
+        self.client.force_authenticate(self.admin)
+        self.assertEqual(self.client.post(f'/api/reports/{report.pk}/remarks/', {'remark': "Done."}).status_code, 403)
+        self.assertEqual(self.statuses(report), ['Resolved'])
+
+        self.assertEqual(self.post(self.admin, 'close', {'report_ids': [report.pk]}).status_code, 200)
+        self.assertEqual(self.statuses(report), ['Closed'])
+        self.assertFalse(ReportUpdate.objects.exists())
+
+# ================================================================
+# OFFLINE SYNC TESTS
+# ================================================================
+
+class ReportSyncTests(TestCase):
+
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        self.enterContext(override_settings(MEDIA_ROOT=media.name))
+        citizen = User.objects.create_user('citizen@example.com', 'citizen@example.com', 'Password123')
+        self.technician = User.objects.create_user('tech@example.com', 'tech@example.com', 'Password123')
+        Profile.objects.create(user=self.technician, role='technician')
+        self.other = User.objects.create_user('other@example.com', 'other@example.com', 'Password123')
+        Profile.objects.create(user=self.other, role='technician')
+        self.report = Report.objects.create(citizen=citizen, latitude=23.02, longitude=72.57, status='In Progress', assigned_technician=self.technician)
+        self.foreign = Report.objects.create(citizen=citizen, latitude=23.02, longitude=72.57, status='Assigned', assigned_technician=self.other)
+        buffer = io.BytesIO()
+        Image.new('RGB', (32, 32), 'green').save(buffer, 'PNG')
+        self.photo = buffer.getvalue()
+        self.client = APIClient()
+
+    def sync(self, user, updates, watermark=None, **files):
+        self.client.force_authenticate(user)
+        data = {'updates': json.dumps(updates), **({'watermark': watermark} if watermark else {})}
+        data.update({name: SimpleUploadedFile(f'{name}.png', content, 'image/png') for name, content in files.items()})
+        return self.client.post('/api/reports/sync/', data, format='multipart')
+
+    def item(self, client_id, report=None, **extra):
+        return {'client_id': client_id, 'report_id': (report or self.report).pk, 'remark': "Fixed.", **extra}
+
+    def test_retry_returns_the_original_result(self):
+        client_id = str(uuid.uuid4())
+        first = self.sync(self.technician, [self.item(client_id)])
+        self.assertEqual(first.status_code, 200)
+        [result] = first.json()['results']
+        self.assertEqual((result['ok'], result['duplicate']), (True, False))
+        retry = self.sync(self.technician, [self.item(client_id)]).json()['results']
+        self.assertEqual(retry, [{'client_id': client_id, 'ok': True, 'id': result['id'], 'duplicate': True}])
+        self.assertEqual(ReportUpdate.objects.count(), 1)
+
+    def test_client_id_of_another_technician_conflicts(self):
+        client_id = str(uuid.uuid4())
+        self.sync(self.technician, [self.item(client_id)])
+        self.report.assigned_technician = self.other
+        self.report.save()
+        response = self.sync(self.other, [self.item(client_id), self.item(str(uuid.uuid4()))])
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()['client_ids'], [client_id])
+        self.assertEqual(list(ReportUpdate.objects.values_list('technician_id', flat=True)), [self.technician.pk])
+
+    def test_remark_on_a_report_not_assigned_to_the_caller(self):
+        response = self.sync(self.technician, [self.item(str(uuid.uuid4()), self.foreign), self.item(str(uuid.uuid4()))])
+        self.assertEqual(response.status_code, 200)
+        results = response.json()['results']
+        self.assertEqual((results[0]['ok'], results[0]['error']), (False, "You are not assigned to this report."))
+        self.assertTrue(results[1]['ok'])
+        self.assertEqual(list(ReportUpdate.objects.values_list('report_id', flat=True)), [self.report.pk])
+
+    def test_photos(self):
+        response = self.sync(self.technician, [self.item(str(uuid.uuid4()), image='missing'), self.item(str(uuid.uuid4()), image='photo')], photo=self.photo)
+        results = response.json()['results']
+        self.assertEqual((results[0]['ok'], results[0]['error']), (False, "File part 'missing' is missing."))
+        update = ReportUpdate.objects.get(pk=results[1]['id'])
+        self.assertEqual(MediaBlob.objects.get(name=update.image.name).ref_count, 1)
+
+    def test_photos_are_discarded_when_the_insert_fails(self):
+        with mock.patch('api.sync.ReportUpdate.objects.bulk_create', side_effect=IntegrityError):
+            response = self.sync(self.technician, [self.item(str(uuid.uuid4()), image='photo')], photo=self.photo)
+        self.assertEqual(response.status_code, 409)
+        self.assertFalse(ReportUpdate.objects.exists())
+        self.assertEqual(MediaBlob.objects.get().ref_count, 0)
+
+    def test_watermark_round_trip(self):
+        first = self.sync(self.technician, []).json()
+        self.assertEqual(first['changed_report_ids'], [self.report.pk])
+        second = self.sync(self.technician, [], watermark=first['watermark']).json()
+        self.assertEqual(second['changed_report_ids'], [])
+        Report.objects.filter(pk=self.report.pk).update(updated_at=timezone.now())
+        third = self.sync(self.technician, [], watermark=second['watermark']).json()
+        self.assertEqual(third['changed_report_ids'], [self.report.pk])
+
+# ================================================================
+# AUTO-ASSIGNMENT TESTS
+# ================================================================
+
+@override_settings(AUTO_ASSIGN_DISTANCE_WEIGHT=1.0, AUTO_ASSIGN_LOAD_WEIGHT=5.0, AUTO_ASSIGN_SPECIALIZATION_BONUS=15.0, AUTO_ASSIGN_MAX_OPEN_REPORTS=20)
+class AutoAssignTests(TestCase):
+
+    def setUp(self):
+        self.citizen = User.objects.create_user('citizen@example.com', 'citizen@example.com', 'Password123')
+        Profile.objects.create(user=self.citizen, role='citizen')
+        self.admin = User.objects.create_user('admin@example.com', 'admin@example.com', 'Password123')
+        Profile.objects.create(user=self.admin, role='admin')
+        # Reports sit at 23.01 N: `near` is about 1 km away, `far` about 10 km.
+        self.near = self.technician('near', 23.00, 'Line Repair')
+        self.far = self.technician('far', 23.10, 'Transformer Maintenance')
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def technician(self, name, latitude, specialization):
+        user = User.objects.create_user(f'{name}@example.com', f'{name}@example.com', 'Password123')
+        Profile.objects.create(user=user, role='technician', specialization=specialization, base_latitude=latitude, base_longitude=72.57)
+        return user
+
+    def report(self, status='Received', classification='Electric Pole', technician=None):
+        return Report.objects.create(citizen=self.citizen, latitude=23.01, longitude=72.57, status=status, ai_classification=classification, assigned_technician=technician)
+
+    def plan(self, *classifications):
+        """The technician plan_assignments picks for each of a batch of reports at 23.01 N."""
+        reports = [(i, 23.01, 72.57, classification) for i, classification in enumerate(classifications)]
+        return [tech_id for _, tech_id, _ in assignment.plan_assignments(reports, assignment.load_technicians())]
+
+    def test_nearest_technician_wins(self):
+        self.assertEqual(self.plan('Fallen Line'), [self.near.pk])
+        self.assertEqual(self.plan('Fire'), [self.near.pk])
+
+    def test_specialization_beats_distance(self):
+        self.assertEqual(self.plan('Transformer'), [self.far.pk])
+
+    def test_workload_counts_and_caps(self):
+        with self.settings(AUTO_ASSIGN_MAX_OPEN_REPORTS=2):
+            # Two open reports already put `near` at the cap.
+            self.report('Assigned', technician=self.near), self.report('In Progress', technician=self.near)
+            self.assertEqual(self.plan('Fire', 'Fire', 'Fire'), [self.far.pk, self.far.pk, None])
+
+    def test_only_received_unassigned_reports_are_assigned(self):
+        eligible = self.report()
+        pending, closed = self.report('Pending Analysis'), self.report('Closed')
+        taken = self.report('Received', technician=self.far)
+        ids = [eligible.pk, pending.pk, closed.pk, taken.pk, 999999]
+        response = self.client.post('/api/reports/auto-assign/', {'report_ids': ids}, format='json')
+        self.assertEqual(response.status_code, 200)
+        results = {result['report_id']: result for result in response.json()['results']}
+        self.assertEqual(results[eligible.pk]['assigned_technician'], self.near.pk)
+        self.assertEqual(results[999999]['error'], "Report not found.")
+        for report in (pending, closed, taken): self.assertIn('error', results[report.pk])
+        self.assertEqual(
+            [(report.status, report.assigned_technician_id) for report in Report.objects.filter(pk__in=ids).order_by('pk')],
+            [('Assigned', self.near.pk), ('Pending Analysis', None), ('Closed', None), ('Received', self.far.pk)],
+        )
+
+    def test_update_leaves_other_reports_alone(self):
+        selected, other = self.report(), self.report()
+        Report.objects.filter(pk=other.pk).update(updated_at=timezone.now() - timedelta(days=1))
+        before = Report.objects.get(pk=other.pk).updated_at
+        plan = assignment.auto_assign_reports(Report.objects.filter(pk=selected.pk))
+        self.assertEqual(plan[0][:2], (selected.pk, self.near.pk))
+        other.refresh_from_db()
+        self.assertEqual((other.status, other.assigned_technician_id, other.updated_at), ('Received', None, before))
+
+# ================================================================
+# AI PIPELINE TIMING TESTS
+# ================================================================
+
+class PipelineTimingTests(TestCase):
+
+    def setUp(self):
+        self.citizen = User.objects.create_user('citizen@example.com', 'citizen@example.com', 'Password123')
+        Profile.objects.create(user=self.citizen, role='citizen')
+
+    def analyse(self, ai_results, queued_seconds_ago):
+        report = Report.objects.create(citizen=self.citizen, latitude=23.02, longitude=72.57, status='Pending Analysis', image='reports/photo.jpg')
+        Report.objects.filter(pk=report.pk).update(created_at=timezone.now() - timedelta(seconds=queued_seconds_ago + 5))
+        with mock.patch('api.tasks.load_image', return_value=Image.new('RGB', (8, 8))), mock.patch('api.tasks.run_ai_analysis', return_value=ai_results):
+            tasks.analyze_report_image_task(report.pk, queued_at=timezone.now() - timedelta(seconds=queued_seconds_ago))
+        return report
+
+    def test_run_records_every_stage(self):
+        report = self.analyse({'ai_classification': 'Transformer', 'ai_suggestion': "Inspect it."}, queued_seconds_ago=2)
+        timing = ReportAnalysisTiming.objects.get()
+        self.assertEqual((timing.report_id, timing.outcome), (report.pk, 'ok'))
+        for stage in pipeline.STAGES: self.assertGreater(getattr(timing, f'{stage}_ms'), 0, stage)
+        self.assertAlmostEqual(timing.queue_wait_ms, 2000, delta=1000)
+        self.assertGreater(timing.pending_ms, timing.queue_wait_ms)
+        report.refresh_from_db()
+        self.assertEqual((report.status, report.ai_classification), ('Received', 'Transformer'))
+
+    def test_stats_view_aggregates_runs(self):
+        self.analyse({'ai_classification': 'Transformer', 'ai_suggestion': "Inspect it."}, queued_seconds_ago=1)
+        self.analyse(None, queued_seconds_ago=3)
+        Report.objects.create(citizen=self.citizen, latitude=23.02, longitude=72.57, status='Pending Analysis', image='reports/waiting.jpg')
+        admin = User.objects.create_user('admin@example.com', 'admin@example.com', 'Password123')
+        Profile.objects.create(user=admin, role='admin')
+        client = APIClient()
+        client.force_authenticate(admin)
+        stats = client.get('/api/stats/ai-pipeline/', {'days': 7}).json()
+        self.assertEqual((stats['runs'], stats['outcomes']), (2, {'ok': 1, 'failed': 1}))
+        self.assertEqual(set(stats['stages']), set(pipeline.STAGES))
+        queue_wait = stats['stages']['queue_wait']
+        self.assertEqual(queue_wait['count'], 2)
+        self.assertAlmostEqual(queue_wait['p50_ms'], 1000, delta=500)
+        self.assertAlmostEqual(queue_wait['max_ms'], 3000, delta=500)
+        self.assertEqual(stats['pending_analysis']['count'], 1)
+        self.assertEqual(client.get('/api/stats/ai-pipeline/', {'days': 0}).status_code, 400)
+
+# ================================================================
+# METRICS TESTS
+# ================================================================
+
+@override_settings(METRICS_ENABLED=True, METRICS_AUTH_TOKEN='', METRICS_ALLOWED_IPS=['127.0.0.1'])
+class MetricsTests(TestCase):
+
+    def scrape(self, **headers):
+        response = self.client.get('/metrics', **headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/plain; version=0.0.4; charset=utf-8')
+        return response.content.decode()
+
+    def sample(self, text, series):
+        """Value of one series in the scrape output, 0 if absent."""
+        for line in text.splitlines():
+            if line.startswith(series + ' '): return float(line.split()[-1])
+        return 0
+
+    def test_requests_show_up_by_route(self):
+        count = 'urja_http_request_duration_seconds_count{route="my-reports-list",method="GET",status="401"}'
+        before = self.sample(self.scrape(), count)
+        self.assertEqual(self.client.get('/api/reports/my-reports/').status_code, 401)
+        self.assertEqual(self.client.get('/api/reports/my-reports/').status_code, 401)
+        text = self.scrape()
+        self.assertEqual(self.sample(text, count), before + 2)
+        self.assertIn('# TYPE urja_http_request_duration_seconds histogram', text)
+        self.assertIn('urja_http_request_duration_seconds_bucket{route="my-reports-list",method="GET",status="401",le="+Inf"}', text)
+        self.assertIn('urja_http_request_db_queries_count{route="my-reports-list",method="GET"}', text)
+        self.assertIn('urja_http_response_bytes_count{route="my-reports-list",method="GET"}', text)
+
+    def test_queue_depth_matches_the_admission_backlog(self):
+        citizen = User.objects.create_user('citizen@example.com', 'citizen@example.com', 'Password123')
+        pending = lambda **fields: Report.objects.create(citizen=citizen, latitude=23.02, longitude=72.57, status='Pending Analysis', **fields)
+        pending(image='reports/queued.jpg')
+        pending() # imageless: never analysed
+        orphaned = pending(image='reports/orphaned.jpg')
+        Report.objects.filter(pk=orphaned.pk).update(updated_at=timezone.now() - timedelta(seconds=settings.AI_BACKLOG_QUEUED_WINDOW_SECONDS + 60))
+        self.assertEqual(self.sample(self.scrape(), 'urja_ai_queue_depth'), admission.awaiting_analysis().count())
+        self.assertEqual(self.sample(self.scrape(), 'urja_ai_queue_depth'), 1)
+
+    def test_scrape_access(self):
+        self.assertEqual(self.client.get('/metrics', REMOTE_ADDR='10.0.0.8').status_code, 403)
+        with self.settings(METRICS_AUTH_TOKEN='secret'):
+            self.assertEqual(self.client.get('/metrics').status_code, 403)
+            self.scrape(HTTP_AUTHORIZATION='Bearer secret')
+
+# ================================================================
+# REQUEST PROFILING TESTS
+# ================================================================
+
+class ProfilingTests(TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = os.path.join(directory.name, 'profiles')
+        self.enterContext(override_settings(PROFILING_ENABLED=True, PROFILING_SAMPLE_RATE=1.0, PROFILING_DIR=self.directory))
+        self.tokens = {}
+        for role in ('admin', 'technician'):
+            user = User.objects.create_user(f'{role}@example.com', f'{role}@example.com', 'Password123')
+            Profile.objects.create(user=user, role=role)
+            self.tokens[role] = Token.objects.create(user=user).key
+
+    def get(self, role=None, query='', **headers):
+        # A new client per request, so the middleware is loaded under the overridden settings.
+        if role: headers['HTTP_AUTHORIZATION'] = f'Token {self.tokens[role]}'
+        return APIClient().get('/api/stats/ai-pipeline/' + query, **headers)
+
+    def captures(self):
+        return sorted(os.listdir(self.directory)) if os.path.isdir(self.directory) else []
+
+    def test_only_flagged_admin_requests_are_profiled(self):
+        self.get('admin')
+        self.get('technician', '?profile=1')
+        self.get(None, '?profile=1')
+        self.get(None, '?profile=1', HTTP_AUTHORIZATION='Token invalid')
+        self.assertEqual(self.captures(), [])
+
+        response = self.get('admin', HTTP_X_PROFILE='1')
+        self.assertEqual(response.status_code, 200)
+        capture_id = response['X-Profile-Id']
+        self.assertEqual(self.captures(), [f'{capture_id}.json', f'{capture_id}.prof'])
+        with open(os.path.join(self.directory, f'{capture_id}.json')) as f: capture = json.load(f)
+        self.assertEqual((capture['route'], capture['status']), ('ai-pipeline-stats', 200))
+        self.assertEqual(capture['query_count'], len(capture['queries']))
+        self.assertGreater(capture['query_count'], 0)
+
+    def test_disabled_by_default(self):
+        with self.settings(PROFILING_ENABLED=False):
+            self.assertFalse(self.get('admin', '?profile=1').has_header('X-Profile-Id'))
+        self.assertEqual(self.captures(), [])
+
+# ================================================================
+# JSON RENDERING AND COMPRESSION TESTS
+# ================================================================
+
+@unittest.skipIf(renderers.orjson is None, "orjson is not installed.")
+class FastJSONRendererTests(SimpleTestCase):
+
+    def test_matches_json_renderer(self):
+        at = datetime(2026, 1, 31, 8, 15, 42, 123456, tzinfo=dt_timezone.utc)
+        data = {
+            'watermark': at, 'local': timezone.localtime(at), 'naive': datetime(2026, 1, 31, 8, 15), 'day': at.date(), 'time': at.time(),
+            'latitude': Decimal('23.010000'), 'upload_id': uuid.UUID(int=5), 'text': 'ü', 'nested': [{1: None, 'ok': True, 'score': 1.5}],
+        }
+        self.assertEqual(renderers.FastJSONRenderer().render(data), JSONRenderer().render(data))
+        self.assertIn(b'"watermark":"2026-01-31T08:15:42.123456Z"', renderers.FastJSONRenderer().render(data))
+
+    def test_indent_from_accept_header(self):
+        self.assertEqual(renderers.FastJSONRenderer().render({'a': 1}, 'application/json; indent=4'), b'{\n  "a": 1\n}')
+
+@override_settings(COMPRESSION_MIN_BYTES=200)
+class CompressionTests(SimpleTestCase):
+    BODY = b'{"results":[' + b','.join(b'{"id":%d,"status":"Received"}' % i for i in range(50)) + b']}'
+
+    def respond(self, accept_encoding, body=BODY, content_type='application/json'):
+        request = RequestFactory().get('/api/reports/', HTTP_ACCEPT_ENCODING=accept_encoding)
+        response = HttpResponse(body, content_type=content_type)
+        response['ETag'] = '"v1"'
+        return compression.CompressionMiddleware(lambda request: response)(request)
+
+    def test_negotiation(self):
+        with mock.patch.object(compression, 'brotli', object()):
+            self.assertEqual(compression.choose_encoding('gzip, deflate, br'), 'br')
+            self.assertEqual(compression.choose_encoding('br;q=0.5, gzip'), 'gzip')
+            self.assertEqual(compression.choose_encoding('*'), 'br')
+            self.assertEqual(compression.choose_encoding('br;q=0, *;q=0.1'), 'gzip')
+        with mock.patch.object(compression, 'brotli', None):
+            self.assertEqual(compression.choose_encoding('br'), None)
+            self.assertEqual(compression.choose_encoding('br, gzip'), 'gzip')
+        self.assertEqual(compression.choose_encoding(''), None)
+        self.assertEqual(compression.choose_encoding('identity, gzip;q=0'), None)
+
+    def test_gzip(self):
+        response = self.respond('gzip')
+        self.assertEqual((response['Content-Encoding'], response['Vary'], response['ETag']), ('gzip', 'Accept-Encoding', 'W/"v1"'))
+        self.assertEqual(gzip.decompress(response.content), self.BODY)
+        self.assertEqual(response['Content-Length'], str(len(response.content)))
+
+    @unittest.skipIf(compression.brotli is None, "brotli is not installed.")
+    def test_brotli(self):
+        response = self.respond('gzip, br')
+        self.assertEqual(response['Content-Encoding'], 'br')
+        self.assertEqual(compression.brotli.decompress(response.content), self.BODY)
+
+    def test_identity(self):
+        response = self.respond('identity')
+        self.assertEqual((response.content, response['Vary']), (self.BODY, 'Accept-Encoding'))
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+    def test_small_bodies_are_sent_as_is(self):
+        response = self.respond('gzip', body=b'{"ok":true}')
+        self.assertEqual((response.content, response['Vary']), (b'{"ok":true}', 'Accept-Encoding'))
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+    def test_only_json_is_compressed(self):
+        for content_type in ('text/html; charset=utf-8', 'application/pdf', 'text/plain'):
+            response = self.respond('gzip', content_type=content_type)
+            self.assertEqual(response.content, self.BODY)
+            self.assertFalse(response.has_header('Content-Encoding'))
+            self.assertFalse(response.has_header('Vary'))
+
+# ================================================================
+# SEED DATA TESTS
+# ================================================================
+
+class SeedDataTests(TestCase):
+
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        self.enterContext(override_settings(MEDIA_ROOT=media.name))
+
+    def seed(self, seed, **options):
+        call_command('seed_data', citizens=4, technicians=2, admins=1, reports=30, suggestions=10, images=1,
+                     days=60, until='2026-01-31', seed=seed, batch_size=7, stdout=io.StringIO(), **options)
+        # Primary keys differ between runs, so compare rows by their seeded emails.
+        return {
+            'profiles': list(Profile.objects.order_by('user__email').values_list('user__email', 'role', 'full_name', 'phone_number', 'base_latitude')),
+            'reports': list(Report.objects.order_by('upload_id').values_list(
+                'upload_id', 'citizen__email', 'assigned_technician__email', 'category', 'description', 'latitude', 'longitude',
+                'status', 'ai_classification', 'image', 'created_at', 'resolved_at')),
+            'updates': list(ReportUpdate.objects.order_by('report__upload_id', 'created_at').values_list('report__upload_id', 'technician__email', 'remark', 'created_at')),
+            'suggestions': sorted(Suggestion.objects.values_list('citizen__email', 'suggestion_text', 'status', 'created_at')),
+        }
+
+    def test_same_seed_gives_same_data(self):
+        first = self.seed(7)
+        self.assertEqual((len(first['profiles']), len(first['reports']), len(first['suggestions'])), (7, 30, 10))
+        self.assertTrue(all(row[9] for row in first['reports']))
+        self.assertEqual(self.seed(7, flush=True), first)
+        # Flushing released the old reports' references to the same sample image.
+        self.assertEqual(MediaBlob.objects.get(name=first['reports'][0][9]).ref_count, 30)
+        other = self.seed(8, flush=True)
+        self.assertNotEqual(other['reports'], first['reports'])
+        # Every seeded report shares the one sample image, and each holds a blob reference.
+        self.assertEqual(MediaBlob.objects.get(name=other['reports'][0][9]).ref_count, 30)
+
+    def test_refuses_to_seed_twice_without_flush(self):
+        self.seed(7)
+        with self.assertRaises(CommandError): self.seed(7)
+
+# ================================================================
+# ADMISSION (AI BACKLOG BACKPRESSURE) TESTS
+# ================================================================
+
+@override_settings(AI_BACKLOG_DEFER_DEPTH=3, AI_BACKLOG_REJECT_DEPTH=6, AI_BACKLOG_DEFER_SECONDS=0, AI_BACKLOG_REJECT_SECONDS=0)
+class AdmissionTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.citizen = User.objects.create_user('citizen@example.com', 'citizen@example.com', 'Password123')
+        Profile.objects.create(user=self.citizen, role='citizen')
+
+    def pending(self, count, **fields):
+        fields = {'image': 'reports/photo.jpg', 'analysis_deferred': False, **fields}
+        return [Report.objects.create(citizen=self.citizen, latitude=23.02, longitude=72.57, status='Pending Analysis', **fields) for _ in range(count)]
+
+    def decision(self):
+        cache.clear()
+        return admission.admission_decision()[0]
+
+    def test_accepts_below_thresholds(self):
+        self.pending(2)
+        self.assertEqual(self.decision(), admission.ACCEPT)
+
+    def test_defers_when_queue_is_deep(self):
+        self.pending(3)
+        self.assertEqual(self.decision(), admission.DEFER)
+        report = self.pending(1)[0]
+        with mock.patch('api.tasks.enqueue_analysis') as enqueue:
+            admission.queue_or_defer(report.pk)
+        enqueue.assert_not_called()
+        report.refresh_from_db()
+        self.assertTrue(report.analysis_deferred)
+
+    def test_rejects_with_retry_after(self):
+        self.pending(3)
+        self.pending(3, analysis_deferred=True)
+        self.assertEqual(self.decision(), admission.REJECT)
+        client = APIClient()
+        client.force_authenticate(self.citizen)
+        response = client.post('/api/reports/create/', {})
+        self.assertEqual(response.status_code, 429)
+        self.assertIn('Retry-After', response)
+
+    def test_stale_and_imageless_reports_do_not_count(self):
+        stale = self.pending(10)
+        Report.objects.filter(pk__in=[report.pk for report in stale]).update(updated_at=timezone.now() - timedelta(days=2))
+        self.pending(10, image=None)
+        self.pending(10, image='', analysis_deferred=True)
+        self.assertEqual(self.decision(), admission.ACCEPT)
+
+    def test_resume_claims_deferred_once_workers_catch_up(self):
+        deferred = self.pending(2, analysis_deferred=True)
+        with mock.patch('api.tasks.enqueue_analysis') as enqueue:
+            self.assertEqual(admission.resume_deferred(), 2)
+        self.assertEqual(sorted(call.args[0] for call in enqueue.call_args_list), sorted(report.pk for report in deferred))
+        self.assertFalse(Report.objects.filter(analysis_deferred=True).exists())
+
+    def test_failed_analysis_releases_the_pool_slot(self):
+        from . import tasks
+        with mock.patch.object(tasks, '_queued', 1), \
+                mock.patch('api.tasks.analyze_report_image_task', side_effect=RuntimeError('inference crashed')), \
+                mock.patch('api.admission.resume_deferred') as resume, self.assertLogs('api.tasks', 'ERROR'):
+            tasks._run_analysis(1, timezone.now())
+            self.assertEqual(tasks._queued, 0)
+        resume.assert_called_once()
+
+# ================================================================
+# INCIDENT CLUSTERING TESTS
+# ================================================================
+
+class IncidentClusteringTests(TestCase):
+
+    def setUp(self):
+        self.citizen = User.objects.create_user('citizen@example.com', 'citizen@example.com', 'Password123')
+        Profile.objects.create(user=self.citizen, role='citizen')
+
+    def report(self, latitude=23.02):
+        return Report.objects.create(citizen=self.citizen, latitude=latitude, longitude=72.57)
+
+    def test_reports_of_one_hazard_share_an_incident(self):
+        first, first_duplicate = clustering.attach_to_incident(self.report())
+        second, second_duplicate = clustering.attach_to_incident(self.report())
+        elsewhere, _ = clustering.attach_to_incident(self.report(latitude=23.50))
+        self.assertEqual((first.pk, first_duplicate, second_duplicate), (second.pk, False, True))
+        self.assertEqual(second.report_count, 2)
+        self.assertNotEqual(elsewhere.pk, first.pk)
+
+    def test_incident_opened_concurrently_is_joined(self):
+        find = clustering.find_matching_incident
+        def racing_find(report, lock=False, older_than=None):
+            if older_than is None:
+                # Another report of the same hazard opens its incident between this lookup and the insert.
+                racing_find.winner = Incident.objects.create(primary_report=self.report(), latitude=23.02, longitude=72.57)
+                return None
+            return find(report, lock, older_than)
+        with mock.patch('api.clustering.find_matching_incident', side_effect=racing_find):
+            incident, is_duplicate = clustering.attach_to_incident(self.report())
+        self.assertEqual((incident.pk, is_duplicate, incident.report_count), (racing_find.winner.pk, True, 2))
+        self.assertEqual(Incident.objects.count(), 1)
+
+    def test_unreadable_image_is_logged(self):
+        with self.assertLogs('api.clustering', 'WARNING'):
+            self.assertIsNone(clustering.compute_image_hash(io.BytesIO(b'not an image')))
+
+# ================================================================
+# DUPLICATE ANALYSIS TESTS
+# ================================================================
+
+class DuplicateAnalysisTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.citizen = User.objects.create_user('citizen@example.com', 'citizen@example.com', 'Password123')
+        Profile.objects.create(user=self.citizen, role='citizen')
+        self.primary = self.report()
+        self.incident = Incident.objects.create(primary_report=self.primary, latitude=23.02, longitude=72.57)
+        Report.objects.filter(pk=self.primary.pk).update(incident=self.incident)
+
+    def report(self, **fields):
+        fields = {'image': 'reports/photo.jpg', 'status': 'Pending Analysis', **fields}
+        return Report.objects.create(citizen=self.citizen, latitude=23.02, longitude=72.57, **fields)
+
+    def duplicate(self):
+        return self.report(incident=self.incident)
+
+    def age(self, *reports):
+        Report.objects.filter(pk__in=[report.pk for report in reports]).update(updated_at=timezone.now() - timedelta(days=2))
+
+    def test_duplicate_waits_for_a_queued_primary(self):
+        self.assertTrue(share_primary_analysis(self.duplicate(), self.incident))
+
+    def test_duplicate_is_analysed_itself_when_primary_cannot_share(self):
+        self.age(self.primary)
+        self.assertFalse(share_primary_analysis(self.duplicate(), self.incident))
+        Report.objects.filter(pk=self.primary.pk).update(image='')
+        self.assertFalse(share_primary_analysis(self.duplicate(), self.incident))
+
+    def test_failed_primary_analysis_releases_duplicates(self):
+        from . import tasks
+        waiting = self.duplicate()
+        with mock.patch('api.tasks.load_image', side_effect=OSError('unreadable')), \
+                mock.patch('api.tasks.enqueue_analysis') as enqueue, self.assertRaises(OSError):
+            tasks.analyze_report_image_task(self.primary.pk)
+        enqueue.assert_called_once_with(waiting.pk)
+
+    def test_resume_picks_up_duplicates_of_a_lost_primary(self):
+        waiting = self.duplicate()
+        self.age(self.primary, waiting)
+        with mock.patch('api.tasks.enqueue_analysis') as enqueue:
+            self.assertEqual(admission.resume_deferred(), 1)
+            self.assertEqual(admission.resume_deferred(), 0)
+        enqueue.assert_called_once_with(waiting.pk)
+
+# ================================================================
+# RESUMABLE UPLOAD TESTS
+# ================================================================
+
+class ResumableUploadTests(TestCase):
+
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        self.enterContext(override_settings(MEDIA_ROOT=media.name))
+        self.enterContext(mock.patch('api.tasks.enqueue_analysis'))
+        citizen = User.objects.create_user('citizen@example.com', 'citizen@example.com', 'Password123')
+        Profile.objects.create(user=citizen, role='citizen')
+        self.client = APIClient()
+        self.client.force_authenticate(citizen)
+        buffer = io.BytesIO()
+        Image.new('RGB', (64, 64), 'orange').save(buffer, 'PNG')
+        self.data = buffer.getvalue()
+
+    def start(self):
+        response = self.client.post('/api/reports/uploads/', {
+            'filename': 'pole.png', 'size': len(self.data), 'sha256': hashlib.sha256(self.data).hexdigest(),
+            'category': 'Safety Hazard', 'description': 'Pole down', 'latitude': '23.020000', 'longitude': '72.570000',
+        })
+        self.assertEqual(response.status_code, 201, response.data)
+        return f"/api/reports/uploads/{response.data['id']}/"
+
+    def patch(self, url, offset, chunk):
+        return self.client.generic('PATCH', url, chunk, content_type='application/offset+octet-stream', HTTP_UPLOAD_OFFSET=str(offset))
+
+    def finalize(self, url):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post(f'{url}finalize/')
+
+    def test_resume_and_repeated_finalize(self):
+        url, half = self.start(), len(self.data) // 2
+        self.assertEqual(self.patch(url, 0, self.data[:half]).status_code, 200)
+        stale = self.patch(url, 0, self.data[:10]) # a retried first chunk must not truncate the file
+        self.assertEqual((stale.status_code, stale['Upload-Offset']), (409, str(half)))
+        self.assertEqual(self.client.get(url).data['offset'], half)
+        self.assertEqual(self.finalize(url).status_code, 409)
+        self.assertEqual(self.patch(url, half, self.data[half:]).status_code, 200)
+
+        first, again = self.finalize(url), self.finalize(url)
+        self.assertEqual((first.status_code, again.status_code), (201, 200))
+        self.assertEqual(first.data['report'], again.data['report'])
+        self.assertEqual(Report.objects.count(), 1)
+        self.assertFalse(os.path.exists(uploads.part_path(ReportUpload.objects.get())))
+
+    def test_finalize_can_be_retried_after_the_report_insert_fails(self):
+        url = self.start()
+        self.patch(url, 0, self.data)
+        with mock.patch('api.uploads.create_report', side_effect=RuntimeError('database is locked')), self.assertRaises(RuntimeError):
+            self.finalize(url)
+        self.assertEqual(self.finalize(url).status_code, 201)
+        self.assertEqual(MediaBlob.objects.get().ref_count, 1)
+
+# ================================================================
+# STREAMING UPLOAD TESTS
+# ================================================================
+
+BOUNDARY = b'----urja'
+MULTIPART_BODY = (
+    b'--' + BOUNDARY + b'\r\nContent-Disposition: form-data; name="description"\r\n\r\nPole down\r\n'
+    b'--' + BOUNDARY + b'\r\nContent-Disposition: form-data; name="image"; filename="pole.jpg"\r\nContent-Type: image/jpeg\r\n\r\n'
+    + b'\r\n--' * 3 + bytes(range(256)) + b'\r\n--' + BOUNDARY + b'--\r\n'
+)
+
+async def _chunks(*chunks):
+    for chunk in chunks: yield chunk
+
+async def _parse(*chunks):
+    """[(name, filename, content_type, body)] for every part."""
+    parts = []
+    async for kind, value in parse_multipart(_chunks(*chunks), BOUNDARY):
+        if kind == 'part': parts.append([*value, b''])
+        else: parts[-1][3] += value
+    return [tuple(part) for part in parts]
+
+class ParseMultipartTests(SimpleTestCase):
+
+    async def test_same_parts_wherever_the_body_is_split(self):
+        expected = [('description', None, None, b'Pole down'), ('image', 'pole.jpg', 'image/jpeg', b'\r\n--' * 3 + bytes(range(256)))]
+        self.assertEqual(await _parse(MULTIPART_BODY), expected)
+        for split in range(1, len(MULTIPART_BODY)):
+            self.assertEqual(await _parse(MULTIPART_BODY[:split], MULTIPART_BODY[split:]), expected, split)
+        self.assertEqual(await _parse(*(MULTIPART_BODY[i:i + 1] for i in range(len(MULTIPART_BODY)))), expected)
+
+    async def test_malformed_bodies_are_rejected(self):
+        for body in (
+            MULTIPART_BODY[:-len(BOUNDARY) - 6],                     # no closing boundary
+            b'--' + BOUNDARY + b'garbage\r\n\r\n',                  # boundary not followed by CRLF
+            b'--' + BOUNDARY + b'\r\n' + b'X-Pad: ' + b'a' * 9000,    # part headers never end
+            b'',
+        ):
+            with self.subTest(body=body[:40]), self.assertRaises(UploadError) as raised:
+                await _parse(body)
+            self.assertEqual(raised.exception.status, 400)
+
+class StreamingUploadAppTests(TestCase):
+
+    async def call(self, method, headers, body=b''):
+        messages = [{'type': 'http.request', 'body': body, 'more_body': False}]
+        async def receive():
+            if messages: return messages.pop()
+            await asyncio.Event().wait() # The client stays connected
+        sent = []
+        async def send(message): sent.append(message)
+        scope = {'type': 'http', 'method': method, 'path': '/api/reports/create/stream/', 'query_string': b'', 'headers': headers, 'scheme': 'http', 'server': ('testserver', 80)}
+        await StreamingReportUploadApp(get_asgi_application())(scope, receive, send)
+        return sent[0]['status'], dict(sent[0]['headers'])
+
+    async def test_preflight_and_responses_carry_cors_headers(self):
+        origin = (b'origin', b'http://localhost:3000')
+        status, headers = await self.call('OPTIONS', [origin, (b'access-control-request-method', b'POST')])
+        self.assertEqual(status, 200)
+        self.assertIn(b'POST', headers[b'access-control-allow-methods'])
+        status, headers = await self.call('POST', [origin])
+        self.assertEqual(status, 401)
+        self.assertIn(b'access-control-allow-origin', headers)
+
+    async def test_malformed_content_length_is_a_client_error(self):
+        user = await User.objects.acreate(username='citizen@example.com', email='citizen@example.com')
+        token = await Token.objects.acreate(user=user)
+        status, _ = await self.call('POST', [(b'authorization', f'Token {token.key}'.encode()), (b'content-length', b'12x')])
+        self.assertEqual(status, 400)
+
+    async def test_non_utf8_form_field_is_a_client_error(self):
+        user = await User.objects.acreate(username='citizen@example.com', email='citizen@example.com')
+        token = await Token.objects.acreate(user=user)
+        body = b'--b\r\nContent-Disposition: form-data; name="description"\r\n\r\n\xff\xfe\r\n--b--\r\n'
+        status, _ = await self.call('POST', [
+            (b'authorization', f'Token {token.key}'.encode()), (b'content-type', b'multipart/form-data; boundary=b'), (b'content-length', str(len(body)).encode()),
+        ], body)
+        self.assertEqual(status, 400)
+
+# ================================================================
+# EMAIL OUTBOX TESTS
+# ================================================================
+
+@override_settings(EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend', EMAIL_OUTBOX_SENDER_THREAD=False)
+class OutboxTests(TestCase):
+
+    def setUp(self):
+        self.citizen = User.objects.create_user('citizen@example.com', 'citizen@example.com', 'Password123')
+        Profile.objects.create(user=self.citizen, role='citizen')
+
+    def request_reset(self, email):
+        response = APIClient().post('/api/auth/password-reset/', {'email': email})
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_password_reset_does_the_same_work_for_unknown_addresses(self):
+        self.assertEqual(self.request_reset('Citizen@Example.com'), self.request_reset('nobody@example.com'))
+        self.assertEqual(len(mail.outbox), 0) # nothing is sent inside the request
+        self.assertEqual(OutboundEmail.objects.count(), 2)
+
+        self.assertEqual(outbox.drain_outbox(), 2)
+        self.assertEqual([message.to for message in mail.outbox], [['citizen@example.com']])
+        uid, token = mail.outbox[0].body.split('uid=')[1].strip().split('&token=')
+        self.assertTrue(default_token_generator.check_token(self.citizen, token))
+        self.assertNotIn(token, ''.join(OutboundEmail.objects.values_list('html_body', flat=True)))
+        self.assertEqual(dict(OutboundEmail.objects.values_list('to_email', 'status')), {'Citizen@Example.com': 'sent', 'nobody@example.com': 'skipped'})
+
+    def test_status_notifications_are_batched_and_retried_with_backoff(self):
+        reports = [Report.objects.create(citizen=self.citizen, latitude=23.02, longitude=72.57, status='Assigned') for _ in range(3)]
+        self.assertEqual(outbox.queue_status_notifications(reports), 3)
+        with mock.patch('django.core.mail.backends.locmem.EmailBackend.send_messages', side_effect=OSError('421 try later')):
+            self.assertEqual(outbox.send_pending_emails(), 3)
+        email = OutboundEmail.objects.first()
+        self.assertEqual((email.status, email.attempts, email.last_error), ('pending', 1, '421 try later'))
+        self.assertGreater(email.next_attempt_at, timezone.now())
+        self.assertEqual(outbox.send_pending_emails(), 0) # not due yet
+
+        OutboundEmail.objects.update(next_attempt_at=timezone.now())
+        self.assertEqual(outbox.drain_outbox(), 3)
+        self.assertEqual(len(mail.outbox), 3)
+        self.assertEqual(set(OutboundEmail.objects.values_list('status', 'attempts')), {('sent', 2)})
+
+# ================================================================
+# ROUTE PLANNING TESTS
+# ================================================================
+
+class RoutePlanningTests(SimpleTestCase):
+
+    def test_reversal_delta_matches_recomputed_latency(self):
+        rng = random.Random(7)
+        n = 12
+        weights = [rng.choice(list(routing.PRIORITY_WEIGHTS.values())) for _ in range(n)]
+        points = [(23 + rng.random() / 10, 72.5 + rng.random() / 10) for _ in range(n)]
+        start_distances = [routing.haversine_m(23.05, 72.55, *point) for point in points]
+        distances = [[routing.haversine_m(*a, *b) for b in points] for a in points]
+        route = rng.sample(range(n), n)
+        cost = routing.weighted_latency(route, start_distances, distances, weights)
+        sums = routing._route_sums(route, start_distances, distances, weights)
+        for i in range(n - 1):
+            for j in range(i + 1, n):
+                reversed_cost = routing.weighted_latency(route[:i] + route[i:j + 1][::-1] + route[j + 1:], start_distances, distances, weights)
+                self.assertAlmostEqual(routing._reversal_delta(route, i, j, sums, start_distances, distances), reversed_cost - cost, places=3)
+
+# ================================================================
+# SUGGESTION CLUSTERING (MINHASH) TESTS
+# ================================================================
+
+STREETLIGHT = "Please install more street lights on the road near the railway station, it is very dark at night."
+
+class MinHashTests(TestCase):
+
+    def setUp(self):
+        self.citizen = User.objects.create_user('citizen@example.com', 'citizen@example.com', 'Password123')
+
+    def suggest(self, text):
+        suggestion = Suggestion.objects.create(citizen=self.citizen, suggestion_text=text)
+        return suggestion, minhash.cluster_suggestion(suggestion)
+
+    def test_shingles_ignore_case_punctuation_and_spacing(self):
+        self.assertEqual(minhash.shingles("Fix  the LIGHT!"), minhash.shingles("fix the light"))
+        self.assertEqual(minhash.shingles("fix the light"), {'fix t', 'ix th', 'x the', ' the ', 'the l', 'he li', 'e lig', ' ligh', 'light'})
+        self.assertEqual(minhash.shingles("Wire!"), {'wire'})
+
+    def test_similarity_and_band_keys(self):
+        signature = minhash.minhash_signature(STREETLIGHT)
+        near = minhash.minhash_signature(STREETLIGHT.replace("Please install", "Kindly add"))
+        unrelated = minhash.minhash_signature("The billing portal shows the wrong meter reading for my account.")
+        self.assertEqual(minhash.similarity(signature, minhash.signature_from_bytes(minhash.signature_bytes(signature))), 1.0)
+        self.assertGreater(minhash.similarity(signature, near), 0.6)
+        self.assertLess(minhash.similarity(signature, unrelated), 0.2)
+
+        keys = minhash.band_keys(signature)
+        self.assertEqual(len(set(keys)), minhash.BANDS)
+        self.assertTrue(set(keys) & set(minhash.band_keys(near)))
+        self.assertFalse(set(keys) & set(minhash.band_keys(unrelated)))
+        # The band number is part of the key, so equal rows in different bands never collide.
+        flat = minhash.signature_from_bytes(bytes(4 * minhash.NUM_PERMUTATIONS))
+        self.assertEqual(len(set(minhash.band_keys(flat))), minhash.BANDS)
+
+    def test_near_duplicates_merge_and_clusters_shrink_on_delete(self):
+        first, cluster = self.suggest(STREETLIGHT)
+        second, same = self.suggest(STREETLIGHT.replace("very dark", "too dark"))
+        _, other = self.suggest("The billing portal shows the wrong meter reading for my account.")
+        self.assertEqual(same.pk, cluster.pk)
+        self.assertNotEqual(other.pk, cluster.pk)
+        cluster.refresh_from_db()
+        self.assertEqual((cluster.size, cluster.representative_id), (2, first.pk))
+        self.assertEqual(SuggestionBucket.objects.filter(suggestion=second).count(), minhash.BANDS)
+
+        first.delete()
+        cluster.refresh_from_db()
+        self.assertEqual((cluster.size, cluster.representative_id), (1, second.pk))
+        second.delete()
+        self.assertFalse(SuggestionCluster.objects.filter(pk=cluster.pk).exists())
+
+# ================================================================
+# RESOLUTION ANALYTICS TESTS
+# ================================================================
+
+def _utc(*args):
+    return datetime(*args, tzinfo=dt_timezone.utc)
+
+class AnalyticsTests(SimpleTestCase):
+
+    def columns(self, rows):
+        """Analytics columns for (created, resolved, status, category) rows, as load_columns builds them."""
+        created, resolved, statuses, categories = zip(*rows) if rows else ((),) * 4
+        return {
+            'created': analytics._datetimes(list(created)), 'resolved': analytics._datetimes(list(resolved)),
+            'done': np.isin(np.array(statuses, dtype=str), analytics.DONE_STATUSES),
+            'category': analytics._factorize(list(categories)), 'classification': analytics._factorize(list(categories)),
+            'technician': analytics._factorize([0] * len(rows), dtype=np.int64), 'technician_names': {0: None},
+        }
+
+    def test_grouped_percentiles_pick_nearest_rank_per_group(self):
+        codes = np.array([1, 0, 1, 0, 1, 1, 0, 1, 1, 1, 1, 1], dtype=np.int64)
+        values = np.array([10, 3, 2, 1, 9, 8, 2, 7, 6, 5, 4, 3], dtype=np.float64)
+        result = analytics.grouped_percentiles(codes, values, 3, percentiles=[1, 50, 90, 100])
+        for q, expected in {1: [1, 2], 50: [2, 6], 90: [3, 10], 100: [3, 10]}.items():
+            self.assertEqual(result[q][:2].tolist(), expected, q) # nearest rank: ceil(q/100 * n)-th smallest
+            self.assertTrue(np.isnan(result[q][2]))                # group 2 has no rows
+
+    def test_grouped_percentiles_of_nothing_are_nan(self):
+        result = analytics.grouped_percentiles(np.array([], dtype=np.int64), np.array([]), 2)
+        self.assertTrue(all(np.isnan(result[q]).all() and len(result[q]) == 2 for q in analytics.PERCENTILES))
+        self.assertIsNone(analytics._round(result[50][0]))
+
+    def test_empty_set_and_groups_without_resolutions(self):
+        empty = analytics.compute_resolution_analytics(self.columns([]), _utc(2026, 10, 19))
+        self.assertEqual((empty['overall']['reports'], empty['overall']['resolution_hours']['p50'], empty['by_week']), (0, None, []))
+        self.assertEqual((empty['backlog']['open'], empty['backlog']['age_hours']['max']), (0, None))
+
+        result = analytics.compute_resolution_analytics(self.columns([
+            (_utc(2026, 10, 12, 8), _utc(2026, 10, 12, 18), 'Closed', 'Maintenance'),
+            (_utc(2026, 10, 13, 8), None, 'Received', 'Other'),
+        ]), _utc(2026, 10, 14, 8), sla_hours=12)
+        other = next(row for row in result['by_category'] if row['category'] == 'Other')
+        self.assertEqual((other['resolved'], other['resolution_hours'], other['within_sla']), (0, {'mean': None, 'p50': None, 'p90': None, 'p95': None}, None))
+        self.assertEqual(result['overall']['resolution_hours']['p95'], 10.0)
+        self.assertEqual(result['backlog']['age_buckets']['1-3d'], 1)
+
+    def test_weeks_start_on_monday(self):
+        result = analytics.compute_resolution_analytics(self.columns([
+            (_utc(2026, 10, 11, 23), _utc(2026, 10, 12, 1), 'Resolved', 'Other'), # Sunday, resolved on Monday
+            (_utc(2026, 10, 12, 0), None, 'Received', 'Other'),                    # Monday
+            (_utc(2026, 10, 25, 12), _utc(2026, 10, 25, 13), 'Closed', 'Other'),   # Sunday two weeks later
+        ]), _utc(2026, 10, 26))
+        self.assertEqual([(week['week'], week['created'], week['resolved'], week['open']) for week in result['by_week']], [
+            ('2026-10-05', 1, 0, 0), ('2026-10-12', 1, 1, 1), ('2026-10-19', 1, 1, 0),
+        ])
+
+class AnalyticsViewTests(TestCase):
+
+    @override_settings(TIME_ZONE='Asia/Kolkata')
+    def test_default_window_ends_on_the_local_date(self):
+        cache.clear()
+        admin = User.objects.create_user('admin@example.com', 'admin@example.com', 'Password123')
+        Profile.objects.create(user=admin, role='admin')
+        client = APIClient()
+        client.force_authenticate(admin)
+        # 20:00 UTC on the 18th is already 01:30 on the 19th in India.
+        with mock.patch('django.utils.timezone.now', return_value=_utc(2026, 10, 18, 20)):
+            filters = client.get('/api/stats/resolution/', {'days': 7}).data['filters']
+        self.assertEqual(filters['since'], '2026-10-13T00:00:00+05:30')
@@ -0,0 +1,170 @@
+# api/uploads.py
+import hashlib
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.utils import timezone
+from PIL import Image
+from rest_framework.exceptions import ValidationError
+
+from .clustering import attach_to_incident, share_primary_analysis
+from .models import Report, ReportUpload
+from .storage import is_blob
+
+COPY_BUFFER = 64 * 1024
+CHUNK_SPOOL_BYTES = 1024 * 1024 # Larger chunks are buffered on disk before the row is locked
+INVALID_IMAGE = "Upload a valid image. The file you uploaded was either not an image or a corrupted image."
+
+class UploadConflict(Exception):
+    """The request does not fit the upload's current state; `offset` is where the client should resume."""
+
+    def __init__(self, message, offset):
+        super().__init__(message)
+        self.offset = offset
+
+# ================================================================
+# SHARED WITH THE STREAMING ENDPOINT (api/async_upload.py)
+# ================================================================
+
+def is_valid_image(path):
+    try:
+        with Image.open(path) as img: img.verify()
+        return True
+    except Exception:
+        return False
+
+def store_incoming_image(path, digest, size, filename, keep=False):
+    """
+    Hands a fully written temporary file to the default storage and returns the
+    stored name. Content-addressed storage adopts it with a rename; other
+    storages get a copy and the temporary file is removed. With keep=True a
+    hard link is handed over instead and `path` stays, so a caller whose
+    transaction rolls back can retry with the same file.
+    """
+    if keep:
+        path, source = f'{path}.store', path
+        if os.path.exists(path): os.unlink(path)
+        os.link(source, path)
+    if hasattr(default_storage, 'adopt'):
+        return default_storage.adopt(path, digest, size, os.path.splitext(filename)[1].lower())
+    name = Report._meta.get_field('image').generate_filename(None, filename)
+    try:
+        with open(path, 'rb') as f: return default_storage.save(name, File(f))
+    finally:
+        os.unlink(path)
+
+def create_report(serializer, user, image_name):
+    """Saves a validated ReportCreateSerializer like ReportCreateView does. Returns (report, needs_analysis)."""
+    report = serializer.save(citizen=user, status='Pending Analysis', image=image_name)
+    incident, is_duplicate = attach_to_incident(report)
+    return report, not (is_duplicate and share_primary_analysis(report, incident))
+
+# ================================================================
+# RESUMABLE UPLOADS
+# ================================================================
+
+def part_path(upload):
+    # Under MEDIA_ROOT, so content-addressed storage can adopt the finished file with a rename.
+    return os.path.join(settings.MEDIA_ROOT, '.incoming', 'resumable', f'{upload.pk}.part')
+
+def file_sha256(path):
+    sha256 = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(COPY_BUFFER), b''): sha256.update(block)
+    return sha256.hexdigest()
+
+def _check_chunk(upload, offset, length):
+    if upload.status != ReportUpload.Status.UPLOADING: raise UploadConflict("Upload is already finalized.", upload.received)
+    if offset != upload.received: raise UploadConflict("Offset does not match the bytes received.", upload.received)
+    if offset + length > upload.size: raise UploadConflict("Chunk extends past the declared size.", upload.received)
+
+def append_chunk(upload, offset, stream, length):
+    """
+    Writes `length` bytes from `stream` at `offset`, which must equal the bytes
+    received so far; a retried chunk the server already has is rejected with
+    the current offset. Returns the new offset. The chunk is read into a buffer
+    first, then written under a lock on the upload row, so a slow client never
+    holds the lock and a stale duplicate PATCH cannot truncate the file.
+    """
+    _check_chunk(upload, offset, length)
+    with tempfile.SpooledTemporaryFile(max_size=CHUNK_SPOOL_BYTES) as chunk:
+        written = 0
+        while written < length:
+            block = stream.read(min(COPY_BUFFER, length - written))
+            if not block: break
+            chunk.write(block)
+            written += len(block)
+        chunk.seek(0)
+
+        path = part_path(upload)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with transaction.atomic():
+            locked = ReportUpload.objects.select_for_update().get(pk=upload.pk)
+            upload.received, upload.status = locked.received, locked.status
+            _check_chunk(upload, offset, length)
+            with open(path, 'r+b' if os.path.exists(path) else 'wb') as f:
+                f.seek(offset)
+                shutil.copyfileobj(chunk, f, COPY_BUFFER)
+                f.truncate()
+            new_offset = offset + written
+            ReportUpload.objects.filter(pk=upload.pk).update(received=new_offset, updated_at=timezone.now())
+    upload.received = new_offset
+    return new_offset
+
+def _reset(upload):
+    if os.path.exists(part_path(upload)): os.unlink(part_path(upload))
+    ReportUpload.objects.filter(pk=upload.pk).update(received=0, status=ReportUpload.Status.UPLOADING, updated_at=timezone.now())
+    upload.received, upload.status = 0, ReportUpload.Status.UPLOADING
+
+def finalize_upload(upload, serializer):
+    """
+    Verifies the assembled file and creates its report exactly once. Returns
+    (report, created); finalizing a completed upload again returns its report.
+    A checksum or image error discards the data so the client can start over.
+    """
+    from .admission import queue_or_defer
+
+    if upload.status == ReportUpload.Status.COMPLETE: return upload.report, False
+    if upload.received != upload.size: raise UploadConflict("Upload is incomplete.", upload.received)
+    # Claim the upload, so concurrent finalize calls cannot both create a report.
+    if not ReportUpload.objects.filter(pk=upload.pk, status=ReportUpload.Status.UPLOADING).update(status=ReportUpload.Status.FINALIZING, updated_at=timezone.now()):
+        upload.refresh_from_db()
+        if upload.status == ReportUpload.Status.COMPLETE: return upload.report, False
+        raise UploadConflict("Upload is being finalized.", upload.received)
+
+    path, image = part_path(upload), None
+    try:
+        digest = file_sha256(path) if os.path.exists(path) else None
+        if digest != upload.sha256:
+            _reset(upload)
+            raise ValidationError({'sha256': ["Checksum mismatch; the upload was discarded. Upload again from offset 0."]})
+        if not is_valid_image(path):
+            _reset(upload)
+            raise ValidationError({'image': [INVALID_IMAGE]})
+        with transaction.atomic():
+            # The .part file stays until the report is committed, so a failed insert can be retried.
+            image = store_incoming_image(path, digest, upload.size, upload.filename, keep=True)
+            report, needs_analysis = create_report(serializer, upload.citizen, image)
+            upload.report, upload.status = report, ReportUpload.Status.COMPLETE
+            upload.save(update_fields=['report', 'status', 'updated_at'])
+            transaction.on_commit(lambda: os.unlink(path))
+            if needs_analysis: transaction.on_commit(lambda: queue_or_defer(report.pk))
+    except BaseException:
+        # Blob references roll back with the transaction; a plain storage copy has to go.
+        if image and not is_blob(image): default_storage.delete(image)
+        if os.path.exists(f'{path}.store'): os.unlink(f'{path}.store')
+        # No-op after a reset; otherwise lets the client retry finalize.
+        ReportUpload.objects.filter(pk=upload.pk, status=ReportUpload.Status.FINALIZING).update(status=ReportUpload.Status.UPLOADING)
+        raise
+    return report, True
+
+def expired_uploads():
+    """Uploads idle for longer than REPORT_UPLOAD_EXPIRY_HOURS. Completed ones only serve repeated finalize calls."""
+    cutoff = timezone.now() - timedelta(hours=settings.REPORT_UPLOAD_EXPIRY_HOURS)
+    return ReportUpload.objects.filter(updated_at__lt=cutoff)
@@ -12,15 +12,26 @@ urlpatterns = [
 
     # --- CITIZEN ACTIONS ---
     path('reports/create/', ReportCreateView.as_view(), name='report-create'),
+    # Streamed without a worker thread under ASGI (api/async_upload.py); this route serves it under WSGI.
+    path('reports/create/stream/', ReportCreateView.as_view(), name='report-create-stream'),
+    path('reports/uploads/', ReportUploadCreateView.as_view(), name='report-upload-create'),
+    path('reports/uploads/<uuid:pk>/', ReportUploadDetailView.as_view(), name='report-upload-detail'),
+    path('reports/uploads/<uuid:pk>/finalize/', ReportUploadFinalizeView.as_view(), name='report-upload-finalize'),
     path('reports/my-reports/', MyReportsListView.as_view(), name='my-reports-list'),
     path('suggestions/create/', SuggestionCreateView.as_view(), name='suggestion-create'),
     path('suggestions/my-suggestions/', MySuggestionsListView.as_view(), name='my-suggestions-list'),
     
     # --- ADMIN ACTIONS ---
     path('reports/', ReportListView.as_view(), name='report-list-all'), # Admin list
+    path('reports/search/', ReportSearchView.as_view(), name='report-search'),
     path('technicians/', TechnicianListView.as_view(), name='technician-list'),
     path('suggestions/', SuggestionListView.as_view(), name='suggestion-list'),
+    path('suggestions/clusters/', SuggestionClusterListView.as_view(), name='suggestion-cluster-list'),
+    path('incidents/', IncidentListView.as_view(), name='incident-list'),
+    path('incidents/<int:pk>/', IncidentDetailView.as_view(), name='incident-detail'),
     path('stats/dashboard/', DashboardStatsView.as_view(), name='dashboard-stats'),
+    path('stats/ai-pipeline/', AIPipelineStatsView.as_view(), name='ai-pipeline-stats'),
+    path('stats/resolution/', ResolutionAnalyticsView.as_view(), name='resolution-analytics'),
     path('admin/reports/<int:pk>/', ReportAdminDetailView.as_view(), name='admin-report-detail-manage'),
     path('admin/suggestions/<int:pk>/status/', SuggestionStatusUpdateView.as_view(), name='admin-suggestion-status-update'),
     path('admin/reports/<int:pk>/download/', ReportPDFDownloadView.as_view(), name='admin-report-download'),
@@ -29,8 +40,13 @@ urlpatterns = [
 
     # --- TECHNICIAN ACTIONS ---
     path('reports/assigned/', AssignedReportListView.as_view(), name='report-assigned-list'),
+    path('reports/sync/', ReportSyncView.as_view(), name='report-sync'),
 
     # --- SHARED & ACTION URLS ---
+    path('reports/auto-assign/', ReportAutoAssignView.as_view(), name='report-auto-assign'),
+    path('reports/bulk/assign/', ReportBulkAssignView.as_view(), name='report-bulk-assign'),
+    path('reports/bulk/status/', ReportBulkStatusUpdateView.as_view(), name='report-bulk-status-update'),
+    path('reports/bulk/close/', ReportBulkCloseView.as_view(), name='report-bulk-close'),
     path('reports/<int:pk>/', ReportDetailView.as_view(), name='report-detail-view'),
     path('reports/<int:pk>/assign/', ReportAssignView.as_view(), name='report-assign'),
     path('reports/<int:pk>/status/', ReportStatusUpdateView.as_view(), name='report-status-update'),
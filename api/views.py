@@ -1,33 +1,52 @@
 # api/views.py
 
 # --- Django & Python Imports ---
-import threading
-from datetime import timedelta
+import json
+import os
+from datetime import datetime, time, timedelta
 from django.contrib.auth.models import User
 from django.contrib.auth import update_session_auth_hash
 from django.contrib.auth.tokens import default_token_generator
-from django.core.mail import send_mail
-from django.db.models import Count
-from django.http import HttpResponse
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.db.models import Count, Q
+from django.http import Http404, HttpResponse
 from django.template.loader import get_template
 from django.utils import timezone
-from django.utils.encoding import force_bytes, force_str
-from django.utils.http import urlsafe_base64_encode, urlsafe_base64_decode
-from django.utils.html import strip_tags
+from django.utils.encoding import force_str
+from django.utils._os import safe_join
+from django.utils.dateparse import parse_date
+from django.utils.http import urlsafe_base64_decode
 
 # --- Third-Party Imports ---
 from rest_framework import generics, permissions, status, filters
+from rest_framework.exceptions import NotAuthenticated, PermissionDenied, ValidationError
 from rest_framework.response import Response
 from rest_framework.authtoken.models import Token
-from rest_framework.parsers import MultiPartParser, FormParser
+from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
+from rest_framework.throttling import ScopedRateThrottle
 from rest_framework.views import APIView
 from xhtml2pdf import pisa
 
 # --- Local Imports ---
-from .models import Report, Suggestion, ReportUpdate
-from .permissions import IsAdminUser, IsTechnicianUser, IsOwnerAdminOrAssignedTechnician, IsAdminOrAssignedTechnician
+from .models import Report, Suggestion, ReportUpdate, Incident, ArchivedReport, SuggestionCluster, ReportUpload
+from .permissions import IsAdminUser, IsAdminOrTechnicianUser, IsTechnicianUser, IsOwnerAdminOrAssignedTechnician, IsAdminOrAssignedTechnician
 from .serializers import * 
-from .tasks import analyze_report_image_task
+from .admission import REPORT_CREATE_THROTTLES, GlobalScopedRateThrottle, queue_or_defer
+from .clustering import attach_to_incident, share_primary_analysis, collapse_duplicates
+from .assignment import auto_assign_reports, unassigned_reports
+from .routing import ordered_queue_ids, parse_point
+from .bulk import bulk_assign, bulk_transition
+from .sync import SyncConflict, apply_sync_batch, changed_report_ids
+from .outbox import queue_password_reset, queue_status_notifications
+from .routers import ReplicaReadMixin
+from .media import has_valid_signature, serve_media_file
+from .archive import ArchivedReportFallbackMixin
+from .search import ReportSearchPagination, search_reports
+from .minhash import cluster_suggestion
+from .pipeline import pipeline_stats
+from .analytics import resolution_analytics
+from .uploads import UploadConflict, append_chunk, finalize_upload
 
 # ================================================================
 # AUTHENTICATION & USER MANAGEMENT
@@ -73,14 +92,8 @@ class PasswordResetRequestView(APIView):
     def post(self, request):
         email = request.data.get("email")
         if not email: return Response({"error": "Email is required."}, status=status.HTTP_400_BAD_REQUEST)
-        try: user = User.objects.get(email__iexact=email)
-        except User.DoesNotExist: return Response({"message": "If an account with this email exists, a reset link has been sent."}, status=status.HTTP_200_OK)
-        uid = urlsafe_base64_encode(force_bytes(user.pk))
-        token = default_token_generator.make_token(user)
-        reset_url = f"http://localhost:3000/confirm_reset.html?uid={uid}&token={token}"
-        subject = "Password Reset for Urja Setu"
-        html_message = f'<p>Please click the link below to reset your password:</p><p><a href="{reset_url}">Reset Password</a></p>'
-        send_mail(subject, strip_tags(html_message), 'noreply@urjasetu.com', [user.email], html_message=html_message)
+        # Queued as entered: the outbox sender looks the account up, so this path takes the same time either way.
+        queue_password_reset(str(email))
         return Response({"message": "If an account with this email exists, a reset link has been sent."}, status=status.HTTP_200_OK)
 
 class PasswordResetConfirmView(APIView):
@@ -108,23 +121,74 @@ class ReportCreateView(generics.CreateAPIView):
     serializer_class = ReportCreateSerializer
     permission_classes = [permissions.IsAuthenticated]
     parser_classes = [MultiPartParser, FormParser]
+    throttle_classes = REPORT_CREATE_THROTTLES
+    throttle_scope = 'report_create'
     def perform_create(self, serializer):
         report = serializer.save(citizen=self.request.user, status="Pending Analysis")
-        thread = threading.Thread(target=analyze_report_image_task, args=[report.id])
-        thread.start()
+        incident, is_duplicate = attach_to_incident(report)
+        if is_duplicate and share_primary_analysis(report, incident): return
+        queue_or_defer(report.id)
+
+class ReportUploadCreateView(generics.CreateAPIView):
+    """
+    Starts a resumable photo upload for slow connections. Send {filename, size,
+    sha256} with the report form fields, PATCH the bytes to reports/uploads/<id>/
+    in chunks with an Upload-Offset header, then POST reports/uploads/<id>/finalize/.
+    """
+    serializer_class = ReportUploadSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    throttle_classes = REPORT_CREATE_THROTTLES
+    throttle_scope = 'report_create'
+    def perform_create(self, serializer):
+        fields = {name: self.request.data[name] for name in ReportCreateSerializer.Meta.fields if name != 'image' and name in self.request.data}
+        ReportCreateSerializer(data=fields).is_valid(raise_exception=True)
+        serializer.save(citizen=self.request.user, fields=fields)
+
+class ReportUploadDetailView(generics.RetrieveDestroyAPIView):
+    """GET returns the offset to resume from; PATCH appends the chunk in the body at Upload-Offset; DELETE cancels."""
+    serializer_class = ReportUploadSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    def get_queryset(self):
+        return ReportUpload.objects.filter(citizen=self.request.user)
+    def patch(self, request, *args, **kwargs):
+        upload = self.get_object()
+        try: offset = int(request.headers.get('Upload-Offset', ''))
+        except ValueError: return Response({"error": "The Upload-Offset header is required."}, status=status.HTTP_400_BAD_REQUEST)
+        length = int(request.META.get('CONTENT_LENGTH') or 0)
+        if length > settings.REPORT_UPLOAD_CHUNK_MAX_BYTES: return Response({"error": f"Chunks may be at most {settings.REPORT_UPLOAD_CHUNK_MAX_BYTES} bytes."}, status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+        try: offset = append_chunk(upload, offset, request.stream, length) if length else upload.received
+        except UploadConflict as conflict: return Response({"error": str(conflict), "offset": conflict.offset}, status=status.HTTP_409_CONFLICT, headers={'Upload-Offset': str(conflict.offset)})
+        return Response(self.get_serializer(upload).data, headers={'Upload-Offset': str(offset)})
+
+class ReportUploadFinalizeView(generics.GenericAPIView):
+    """Checks the SHA-256 of the assembled file and creates the report. Repeating the call returns the same report."""
+    serializer_class = ReportUploadSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    def get_queryset(self):
+        return ReportUpload.objects.filter(citizen=self.request.user).select_related('citizen', 'report')
+    def post(self, request, *args, **kwargs):
+        upload = self.get_object()
+        report_serializer = ReportCreateSerializer(data=upload.fields, context=self.get_serializer_context())
+        if upload.status != ReportUpload.Status.COMPLETE: report_serializer.is_valid(raise_exception=True)
+        try: report, created = finalize_upload(upload, report_serializer)
+        except UploadConflict as conflict: return Response({"error": str(conflict), "offset": conflict.offset}, status=status.HTTP_409_CONFLICT, headers={'Upload-Offset': str(conflict.offset)})
+        return Response(self.get_serializer(upload).data, status=status.HTTP_201_CREATED if created else status.HTTP_200_OK)
 
 class SuggestionCreateView(generics.CreateAPIView):
     queryset = Suggestion.objects.all()
     serializer_class = SuggestionSerializer
     permission_classes = [permissions.IsAuthenticated]
+    throttle_classes = [ScopedRateThrottle, GlobalScopedRateThrottle]
+    throttle_scope = 'suggestion_create'
     def perform_create(self, serializer):
-        serializer.save(citizen=self.request.user)
+        suggestion = serializer.save(citizen=self.request.user)
+        cluster_suggestion(suggestion)
 
 class MyReportsListView(generics.ListAPIView):
     serializer_class = ReportListDetailSerializer
     permission_classes = [permissions.IsAuthenticated]
     def get_queryset(self):
-        return Report.objects.filter(citizen=self.request.user).order_by('-created_at')
+        return Report.objects.filter(citizen=self.request.user).select_related('incident').order_by('-created_at')
 
 class MySuggestionsListView(generics.ListAPIView):
     serializer_class = SuggestionSerializer
@@ -136,10 +200,34 @@ class MySuggestionsListView(generics.ListAPIView):
 # ADMIN VIEWS
 # ================================================================
 
-class ReportListView(generics.ListAPIView):
-    queryset = Report.objects.all().order_by('-created_at')
+class ReportListView(ReplicaReadMixin, generics.ListAPIView):
     serializer_class = ReportListDetailSerializer
     permission_classes = [IsAdminUser]
+    def get_queryset(self):
+        queryset = Report.objects.select_related('incident').order_by('-created_at')
+        # ?collapse=true shows one row per incident instead of every duplicate report.
+        if self.request.query_params.get('collapse') in ('1', 'true'): queryset = collapse_duplicates(queryset)
+        return queryset
+
+class ReportSearchView(ReplicaReadMixin, generics.ListAPIView):
+    """?q= searches descriptions, addresses, AI classifications and technician remarks; best matches first."""
+    serializer_class = ReportListDetailSerializer
+    permission_classes = [IsAdminUser]
+    pagination_class = ReportSearchPagination
+    def get_queryset(self):
+        text = self.request.query_params.get('q', '').strip()
+        if not text: raise ValidationError({"q": "This query parameter is required."})
+        return search_reports(text, Report.objects.select_related('citizen__profile', 'assigned_technician__profile', 'incident').prefetch_related('reportupdate_set__technician__profile'))
+
+class IncidentListView(generics.ListAPIView):
+    queryset = Incident.objects.exclude(primary_report__isnull=True).select_related('primary_report__incident').order_by('-last_reported_at')
+    serializer_class = IncidentSerializer
+    permission_classes = [IsAdminUser]
+
+class IncidentDetailView(generics.RetrieveAPIView):
+    queryset = Incident.objects.select_related('primary_report__incident').prefetch_related('reports__incident')
+    serializer_class = IncidentDetailSerializer
+    permission_classes = [IsAdminUser]
 
 class TechnicianListView(generics.ListAPIView):
     queryset = User.objects.filter(profile__role='technician')
@@ -149,27 +237,86 @@ class TechnicianListView(generics.ListAPIView):
     search_fields = ['email', 'profile__full_name']
 
 class SuggestionListView(generics.ListAPIView):
-    queryset = Suggestion.objects.all().order_by('-created_at')
     serializer_class = SuggestionSerializer
     permission_classes = [IsAdminUser]
+    def get_queryset(self):
+        queryset = Suggestion.objects.all().order_by('-created_at')
+        # ?cluster=<id> lists the members of one cluster from SuggestionClusterListView.
+        cluster = self.request.query_params.get('cluster')
+        if cluster:
+            if not cluster.isdigit(): raise ValidationError({"cluster": "Expected a cluster id."})
+            queryset = queryset.filter(cluster_id=cluster)
+        return queryset
+
+class SuggestionClusterListView(generics.ListAPIView):
+    """Near-duplicate suggestion groups, largest first; ?min_size= hides small ones."""
+    serializer_class = SuggestionClusterSerializer
+    permission_classes = [IsAdminUser]
+    def get_queryset(self):
+        min_size = self.request.query_params.get('min_size', '1')
+        if not min_size.isdigit(): raise ValidationError({"min_size": "Expected a positive integer."})
+        return SuggestionCluster.objects.filter(size__gte=int(min_size)).select_related('representative').order_by('-size', '-last_suggested_at')
 
-class DashboardStatsView(APIView):
+class DashboardStatsView(ReplicaReadMixin, APIView):
     permission_classes = [IsAdminUser]
     def get(self, request, *args, **kwargs):
         total_reports = Report.objects.count()
         in_progress_reports = Report.objects.filter(status='In Progress').count()
         resolved_reports = Report.objects.filter(status='Resolved').count()
-        today = timezone.now().date()
-        new_reports_today = Report.objects.filter(created_at__date=today).count()
+        # Range filters on created_at (not __date) so the created_at index can be used.
+        start_of_today = timezone.localtime().replace(hour=0, minute=0, second=0, microsecond=0)
+        today = start_of_today.date()
+        new_reports_today = Report.objects.filter(created_at__gte=start_of_today).count()
         category_counts = Report.objects.values('category').annotate(count=Count('category')).order_by('-count')
         reports_by_category = {item['category']: item['count'] for item in category_counts if item['category']}
         seven_days_ago = today - timedelta(days=6)
-        daily_counts_qs = Report.objects.filter(created_at__date__gte=seven_days_ago).values('created_at__date').annotate(count=Count('id')).order_by('created_at__date')
+        daily_counts_qs = Report.objects.filter(created_at__gte=start_of_today - timedelta(days=6)).values('created_at__date').annotate(count=Count('id')).order_by('created_at__date')
         daily_reports_last_7_days = { (seven_days_ago + timedelta(days=i)).strftime('%Y-%m-%d'): 0 for i in range(7) }
         for item in daily_counts_qs: daily_reports_last_7_days[item['created_at__date'].strftime('%Y-%m-%d')] = item['count']
-        data = {"key_metrics": {"total_reports": total_reports,"new_reports_today": new_reports_today,"in_progress_reports": in_progress_reports,"resolved_reports": resolved_reports,},"charts": {"reports_by_category": reports_by_category,"daily_reports_last_7_days": daily_reports_last_7_days}}
+        data = {"key_metrics": {"total_reports": total_reports,"new_reports_today": new_reports_today,"in_progress_reports": in_progress_reports,"resolved_reports": resolved_reports,"archived_reports": ArchivedReport.objects.count(),},"charts": {"reports_by_category": reports_by_category,"daily_reports_last_7_days": daily_reports_last_7_days}}
         return Response(data, status=status.HTTP_200_OK)
 
+class AIPipelineStatsView(ReplicaReadMixin, APIView):
+    """Percentiles of AI analysis stage timings (queue wait, image load, inference, DB save) over ?days= (default 7)."""
+    permission_classes = [IsAdminUser]
+    def get(self, request, *args, **kwargs):
+        days = request.query_params.get('days', '7')
+        if not days.isdigit() or not 1 <= int(days) <= 365: raise ValidationError({"days": "Expected a whole number of days between 1 and 365."})
+        return Response(pipeline_stats(int(days)), status=status.HTTP_200_OK)
+
+class ResolutionAnalyticsView(ReplicaReadMixin, APIView):
+    """
+    SLA analytics for reports created in the last ?days= (default 365), or from
+    ?since= to ?until= (YYYY-MM-DD): resolution-time percentiles, backlog ageing
+    and throughput by category, AI classification, technician and week. Narrow
+    with ?district= (matched against the address words) and ?category=; ?sla_hours=
+    adds the share resolved within that target.
+    """
+    permission_classes = [IsAdminUser]
+    def get(self, request, *args, **kwargs):
+        params = request.query_params
+        since, until = (parse_date(params[name]) if params.get(name) else None for name in ('since', 'until'))
+        if params.get('since') and since is None: raise ValidationError({"since": "Expected a date as YYYY-MM-DD."})
+        if params.get('until') and until is None: raise ValidationError({"until": "Expected a date as YYYY-MM-DD."})
+        if since is None:
+            days = params.get('days', '365')
+            if not days.isdigit() or not 1 <= int(days) <= 3650: raise ValidationError({"days": "Expected a whole number of days between 1 and 3650."})
+            # Whole days, so repeated requests share a cache entry.
+            since = timezone.localdate() - timedelta(days=int(days) - 1)
+        to_datetime = lambda day: timezone.make_aware(datetime.combine(day, time.min))
+        until = to_datetime(until + timedelta(days=1)) if until else None
+        if until and until <= to_datetime(since): raise ValidationError({"until": "Must not be before since."})
+
+        category = params.get('category') or None
+        if category and category not in dict(Report.CATEGORY_CHOICES): raise ValidationError({"category": f"Unknown category \"{category}\"."})
+        sla_hours = params.get('sla_hours') or None
+        if sla_hours is not None:
+            try: sla_hours = float(sla_hours)
+            except ValueError: sla_hours = 0
+            if not sla_hours > 0: raise ValidationError({"sla_hours": "Expected a positive number of hours."})
+        district = params.get('district', '').strip() or None
+        return Response(resolution_analytics(to_datetime(since), until, category=category, district=district, sla_hours=sla_hours), status=status.HTTP_200_OK)
+
 class ReportAdminDetailView(generics.RetrieveUpdateDestroyAPIView):
     queryset = Report.objects.all()
     permission_classes = [IsAdminUser]
@@ -183,15 +330,37 @@ class ReportAssignView(generics.UpdateAPIView):
     permission_classes = [IsAdminUser]
     def perform_update(self, serializer):
         if serializer.instance.status in ['Received', 'Pending Analysis']:
-            serializer.save(status='Assigned')
+            report = serializer.save(status='Assigned')
+            queue_status_notifications([report])
         else: serializer.save()
 
+class ReportAutoAssignView(generics.GenericAPIView):
+    serializer_class = AutoAssignSerializer
+    permission_classes = [IsAdminUser]
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        report_ids = serializer.validated_data.get('report_ids')
+        # Without explicit ids, every triaged but unassigned report is assigned.
+        queryset = unassigned_reports().filter(pk__in=report_ids) if report_ids else unassigned_reports()
+        plan = auto_assign_reports(queryset)
+        results = [{"report_id": report_id, "assigned_technician": tech_id, "score": score} for report_id, tech_id, score in plan]
+        if report_ids:
+            # Explicit ids that were not eligible are reported back per item.
+            planned = {report_id for report_id, _, _ in plan}
+            rejected = [report_id for report_id in dict.fromkeys(report_ids) if report_id not in planned]
+            statuses = dict(Report.objects.filter(pk__in=rejected).values_list('id', 'status'))
+            for report_id in rejected:
+                error = "Report not found." if report_id not in statuses else f"Only Received reports without a technician can be auto-assigned (status is '{statuses[report_id]}')."
+                results.append({"report_id": report_id, "assigned_technician": None, "score": None, "error": error})
+        return Response({"assigned": sum(1 for r in results if r["assigned_technician"]), "results": results}, status=status.HTTP_200_OK)
+
 class SuggestionStatusUpdateView(generics.UpdateAPIView):
     queryset = Suggestion.objects.all()
     serializer_class = SuggestionStatusUpdateSerializer
     permission_classes = [IsAdminUser]
 
-class ReportPDFDownloadView(generics.GenericAPIView):
+class ReportPDFDownloadView(ArchivedReportFallbackMixin, ReplicaReadMixin, generics.GenericAPIView):
     queryset = Report.objects.all()
     permission_classes = [IsAdminUser]
     def get(self, request, *args, **kwargs):
@@ -215,6 +384,27 @@ class UserDetailView(generics.RetrieveUpdateDestroyAPIView):
     serializer_class = UserManagementSerializer
     permission_classes = [IsAdminUser]
 
+def _bulk_response(results):
+    # Bulk batches are all-or-nothing (api/bulk.py): any rejected item means nothing was written.
+    applied = all(result["ok"] for result in results)
+    return Response({"results": results}, status=status.HTTP_200_OK if applied else status.HTTP_400_BAD_REQUEST)
+
+class ReportBulkAssignView(generics.GenericAPIView):
+    serializer_class = BulkAssignSerializer
+    permission_classes = [IsAdminUser]
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        return _bulk_response(bulk_assign(serializer.validated_data['assignments']))
+
+class ReportBulkCloseView(generics.GenericAPIView):
+    serializer_class = BulkCloseSerializer
+    permission_classes = [IsAdminUser]
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        return _bulk_response(bulk_transition(request.user, serializer.validated_data['report_ids'], 'Closed', serializer.validated_data.get('remark')))
+
 # ================================================================
 # TECHNICIAN VIEWS
 # ================================================================
@@ -224,7 +414,18 @@ class AssignedReportListView(generics.ListAPIView):
     permission_classes = [IsTechnicianUser]
     def get_queryset(self):
         user = self.request.user
-        return Report.objects.filter(assigned_technician=user, status__in=['Assigned', 'In Progress']).order_by('-created_at')
+        return Report.objects.filter(assigned_technician=user, status__in=['Assigned', 'In Progress']).select_related('incident').order_by('-created_at')
+    def list(self, request, *args, **kwargs):
+        # ?from=lat,lng returns the queue in driving order from that point instead of by date.
+        start = request.query_params.get('from')
+        if not start: return super().list(request, *args, **kwargs)
+        try: start = parse_point(start)
+        except ValueError: raise ValidationError({"from": "Expected 'lat,lng'."})
+        reports = {report.id: report for report in self.get_queryset()}
+        queue_rows = [(r.id, r.latitude, r.longitude, r.ai_priority, r.updated_at) for r in reports.values()]
+        route = ordered_queue_ids(request.user.id, start, queue_rows)
+        serializer = self.get_serializer([reports[report_id] for report_id in route], many=True)
+        return Response(serializer.data)
 
 class ReportUpdateCreateView(generics.CreateAPIView):
     queryset = ReportUpdate.objects.all()
@@ -238,11 +439,48 @@ class ReportUpdateCreateView(generics.CreateAPIView):
         if report.assigned_technician != self.request.user: raise permissions.PermissionDenied("You are not assigned to this report.")
         serializer.save(technician=self.request.user, report=report)
 
+class ReportSyncView(generics.GenericAPIView):
+    """
+    Uploads remarks and photos queued while offline in one multipart request.
+    `updates` is a JSON list of {client_id, report_id, remark, image}, where
+    `image` names a file part of the same request.
+    """
+    serializer_class = SyncBatchSerializer
+    permission_classes = [IsTechnicianUser]
+    parser_classes = [MultiPartParser, FormParser, JSONParser]
+    def post(self, request, *args, **kwargs):
+        updates = request.data.get('updates', [])
+        if isinstance(updates, str):
+            try: updates = json.loads(updates)
+            except ValueError: return Response({"updates": ["Must be a JSON list."]}, status=status.HTTP_400_BAD_REQUEST)
+        serializer = self.get_serializer(data={"updates": updates, "watermark": request.data.get('watermark') or None})
+        serializer.is_valid(raise_exception=True)
+        # Taken before applying, so anything committed meanwhile shows up in the next sync.
+        watermark = timezone.now()
+        try: results = apply_sync_batch(request.user, serializer.validated_data['updates'], request.FILES)
+        except SyncConflict as conflict: return Response({"error": str(conflict), "client_ids": conflict.client_ids}, status=status.HTTP_409_CONFLICT)
+        return Response({
+            "results": results,
+            "watermark": watermark,
+            "changed_report_ids": changed_report_ids(request.user, serializer.validated_data.get('watermark')),
+        }, status=status.HTTP_200_OK)
+
 # ================================================================
 # SHARED VIEWS (Used by multiple roles)
 # ================================================================
 
-class ReportDetailView(generics.RetrieveAPIView):
+class ReportBulkStatusUpdateView(generics.GenericAPIView):
+    serializer_class = BulkStatusSerializer
+    permission_classes = [IsAdminOrTechnicianUser]
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        results = bulk_transition(request.user, data['report_ids'], data['status'], data.get('remark'))
+        if results is None: return Response({"error": "You do not have a role that can change status."}, status=status.HTTP_403_FORBIDDEN)
+        return _bulk_response(results)
+
+class ReportDetailView(ArchivedReportFallbackMixin, generics.RetrieveAPIView):
     queryset = Report.objects.all()
     serializer_class = ReportListDetailSerializer
     permission_classes = [IsOwnerAdminOrAssignedTechnician]
@@ -254,9 +492,36 @@ class ReportStatusUpdateView(generics.UpdateAPIView):
     def update(self, request, *args, **kwargs):
         report, user_profile = self.get_object(), request.user.profile
         current_status, requested_status = report.status, request.data.get('status')
-        valid_transitions = {'technician': {'Assigned': ['In Progress'],'In Progress': ['Resolved']},'admin': {'Resolved': ['Closed', 'Assigned'], 'Received': ['Assigned', 'Closed']}}
+        valid_transitions = Report.STATUS_TRANSITIONS
         if user_profile.role not in valid_transitions: return Response({"error": "You do not have a role that can change status."}, status=status.HTTP_403_FORBIDDEN)
         allowed_next_statuses = valid_transitions[user_profile.role].get(current_status)
         if not allowed_next_statuses or requested_status not in allowed_next_statuses: return Response({"error": f"Cannot change status from '{current_status}' to '{requested_status}'.", "allowed_next_statuses": allowed_next_statuses or []}, status=status.HTTP_400_BAD_REQUEST)
-        if requested_status == 'Resolved': report.resolved_at = timezone.now()
-        return super().update(request, *args, **kwargs)
\ No newline at end of file
+        return super().update(request, *args, **kwargs)
+    def perform_update(self, serializer):
+        if serializer.validated_data.get('status') == 'Resolved': report = serializer.save(resolved_at=timezone.now())
+        else: report = serializer.save()
+        queue_status_notifications([report])
+
+class MediaServeView(APIView):
+    """
+    Serves report and remark photos under MEDIA_URL. Access is granted by a valid
+    URL signature (issued with API responses) or, for token-authenticated callers,
+    by the same ownership rules as ReportDetailView.
+    """
+    permission_classes = [permissions.AllowAny]
+    def get(self, request, name):
+        if any(part.startswith('.') for part in name.split('/')): raise Http404
+        try: path = safe_join(settings.MEDIA_ROOT, name)
+        except SuspiciousFileOperation: raise Http404
+        if not os.path.isfile(path): raise Http404
+        if not has_valid_signature(name, request.query_params.get('e'), request.query_params.get('s')):
+            if not request.user.is_authenticated: raise NotAuthenticated()
+            reports = list(Report.objects.filter(
+                Q(image=name) | Q(thumbnail=name) | Q(reportupdate__image=name) | Q(reportupdate__thumbnail=name)
+            ).distinct())
+            reports += ArchivedReport.objects.filter(
+                Q(image=name) | Q(thumbnail=name) | Q(updates__image=name) | Q(updates__thumbnail=name)
+            ).distinct()
+            permission = IsOwnerAdminOrAssignedTechnician()
+            if not any(permission.has_object_permission(request, self, report) for report in reports): raise PermissionDenied()
+        return serve_media_file(request, name, path)
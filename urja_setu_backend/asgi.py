@@ -13,4 +13,9 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'urja_setu_backend.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+# Report photo uploads are streamed natively (api/async_upload.py); everything else is plain Django.
+from api.async_upload import StreamingReportUploadApp  # noqa: E402  (needs the app registry loaded above)
+
+application = StreamingReportUploadApp(django_application)
@@ -12,6 +12,7 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 
 from pathlib import Path
 import os
+import django
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -57,18 +58,41 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'api.metrics.MetricsMiddleware', # First, so its latency covers the whole stack
+    'api.compression.CompressionMiddleware', # Before anything that reads the body; metrics see wire bytes
     'django.middleware.security.SecurityMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'api.routers.ReplicaRoutingMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'api.profiling.ProfilingMiddleware', # Last, so profiles show the view rather than the middleware stack
 ]
 
 ROOT_URLCONF = 'urja_setu_backend.urls'
 
+# Prometheus metrics (api/metrics.py), scraped from /metrics. Set METRICS_AUTH_TOKEN
+# to require 'Authorization: Bearer <token>'; otherwise only the listed IPs may scrape.
+METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'True') == 'True'
+METRICS_AUTH_TOKEN = os.getenv('METRICS_AUTH_TOKEN', '')
+METRICS_ALLOWED_IPS = [ip.strip() for ip in os.getenv('METRICS_ALLOWED_IPS', '127.0.0.1,::1').split(',') if ip.strip()]
+
+# On-demand request profiling (api/profiling.py): admins send 'X-Profile: 1' or
+# '?profile=1'; this share of those requests is profiled and saved to PROFILING_DIR.
+PROFILING_ENABLED = os.getenv('PROFILING_ENABLED', 'False') == 'True'
+PROFILING_SAMPLE_RATE = float(os.getenv('PROFILING_SAMPLE_RATE', '1.0'))
+PROFILING_DIR = os.getenv('PROFILING_DIR', str(BASE_DIR / 'profiles'))
+
+# JSON response compression (api/compression.py), negotiated on Accept-Encoding. Brotli is
+# offered when the optional 'brotli' package is installed; gzip is always available.
+COMPRESSION_ENABLED = os.getenv('COMPRESSION_ENABLED', 'True') == 'True'
+COMPRESSION_MIN_BYTES = int(os.getenv('COMPRESSION_MIN_BYTES', '1024'))
+COMPRESSION_GZIP_LEVEL = int(os.getenv('COMPRESSION_GZIP_LEVEL', '6'))
+COMPRESSION_BROTLI_QUALITY = int(os.getenv('COMPRESSION_BROTLI_QUALITY', '5'))
+
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
@@ -93,8 +117,43 @@ WSGI_APPLICATION = 'urja_setu_backend.wsgi.application'
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'NAME': os.getenv('SQLITE_PATH', BASE_DIR / 'db.sqlite3'),
+        'OPTIONS': {
+            # Seconds the sqlite3 driver waits on a locked database before raising.
+            'timeout': int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', '5000')) / 1000,
+        },
+    }
+}
+if django.VERSION >= (5, 1):
+    # Take the write lock when a transaction starts instead of upgrading a read
+    # lock mid-transaction, which fails immediately with "database is locked".
+    DATABASES['default']['OPTIONS']['transaction_mode'] = 'IMMEDIATE'
+
+# Optional read replica. When REPLICA_DATABASE_PATH is set, heavy read-only views
+# (admin report list, dashboard, PDF export, analytics) read from this alias via
+# api.routers.ReplicaRouter. Users are pinned to 'default' for
+# REPLICA_STICKY_SECONDS after their own writes; the pin lives in the cache, so
+# multi-process deployments need a shared CACHES backend for it to span workers.
+REPLICA_DATABASE_ALIAS = 'replica'
+REPLICA_STICKY_SECONDS = int(os.getenv('REPLICA_STICKY_SECONDS', '10'))
+if os.getenv('REPLICA_DATABASE_PATH'):
+    DATABASES[REPLICA_DATABASE_ALIAS] = {
+        **DATABASES['default'],
+        'NAME': os.getenv('REPLICA_DATABASE_PATH'),
+        'TEST': {'MIRROR': 'default'},
     }
+DATABASE_ROUTERS = ['api.routers.ReplicaRouter']
+
+# Per-connection SQLite pragmas, applied by api/db.py when a connection opens.
+# WAL lets the analysis threads write while gunicorn workers keep reading.
+SQLITE_PRAGMAS_ENABLED = os.getenv('SQLITE_PRAGMAS_ENABLED', 'True') == 'True'
+SQLITE_PRAGMAS = {
+    'journal_mode': os.getenv('SQLITE_JOURNAL_MODE', 'WAL'),
+    'busy_timeout': int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', '5000')),
+    'synchronous': os.getenv('SQLITE_SYNCHRONOUS', 'NORMAL'),
+    'mmap_size': int(os.getenv('SQLITE_MMAP_SIZE', str(256 * 1024 * 1024))),
+    'cache_size': int(os.getenv('SQLITE_CACHE_SIZE', '-64000')), # Negative = KiB, so about 64 MB
+    'temp_store': os.getenv('SQLITE_TEMP_STORE', 'MEMORY'),
 }
 
 
@@ -156,6 +215,19 @@ REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
         'rest_framework.authentication.TokenAuthentication',
     ],
+    # orjson-backed JSON (api/renderers.py); falls back to DRF's encoder without orjson.
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    # Per-user and global limits on report and suggestion creation (api/admission.py).
+    # Counts live in the default cache, per process unless CACHES is shared.
+    'DEFAULT_THROTTLE_RATES': {
+        'report_create': os.getenv('THROTTLE_REPORT_CREATE', '30/hour'),
+        'report_create_global': os.getenv('THROTTLE_REPORT_CREATE_GLOBAL', '600/minute'),
+        'suggestion_create': os.getenv('THROTTLE_SUGGESTION_CREATE', '20/hour'),
+        'suggestion_create_global': os.getenv('THROTTLE_SUGGESTION_CREATE_GLOBAL', '300/minute'),
+    },
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
 }
 
@@ -164,6 +236,92 @@ REST_FRAMEWORK = {
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Uploads are stored once per unique content under media/blobs/ (api/storage.py).
+STORAGES = {
+    'default': {'BACKEND': os.getenv('MEDIA_STORAGE_BACKEND', 'api.storage.ContentAddressedStorage')},
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+}
+# Media serving (api/media.py). URLs in API responses are signed so <img> tags
+# work without a token; a signature stays valid for one to two TTL periods.
+# Set MEDIA_ACCEL_REDIRECT_PREFIX (nginx internal location) or MEDIA_X_SENDFILE
+# (Apache/lighttpd) to let the front proxy send the file after Django checks access.
+MEDIA_SIGNED_URLS = os.getenv('MEDIA_SIGNED_URLS', 'True') == 'True'
+MEDIA_URL_SIGNATURE_TTL = int(os.getenv('MEDIA_URL_SIGNATURE_TTL', '86400'))
+MEDIA_IMMUTABLE_MAX_AGE = int(os.getenv('MEDIA_IMMUTABLE_MAX_AGE', '31536000'))
+MEDIA_MUTABLE_MAX_AGE = int(os.getenv('MEDIA_MUTABLE_MAX_AGE', '3600'))
+MEDIA_ACCEL_REDIRECT_PREFIX = os.getenv('MEDIA_ACCEL_REDIRECT_PREFIX', '')
+MEDIA_X_SENDFILE = os.getenv('MEDIA_X_SENDFILE', 'False') == 'True'
+# Defaults for `manage.py recompress_media` (photos of old Closed reports).
+MEDIA_RECOMPRESS_AGE_DAYS = int(os.getenv('MEDIA_RECOMPRESS_AGE_DAYS', '90'))
+MEDIA_RECOMPRESS_FORMAT = os.getenv('MEDIA_RECOMPRESS_FORMAT', 'webp')
+MEDIA_RECOMPRESS_MAX_DIMENSION = int(os.getenv('MEDIA_RECOMPRESS_MAX_DIMENSION', '1600'))
+MEDIA_RECOMPRESS_QUALITY = int(os.getenv('MEDIA_RECOMPRESS_QUALITY', '75'))
+MEDIA_THUMBNAIL_SIZE = int(os.getenv('MEDIA_THUMBNAIL_SIZE', '320'))
+# Report search (api/search.py) counts and ranks at most this many of the newest matches.
+REPORT_SEARCH_MAX_RESULTS = int(os.getenv('REPORT_SEARCH_MAX_RESULTS', '1000'))
+# `manage.py archive_reports` moves Closed reports untouched for this long into
+# the archive tables (api.models.ArchivedReport).
+REPORT_ARCHIVE_AFTER_DAYS = int(os.getenv('REPORT_ARCHIVE_AFTER_DAYS', '365'))
+# Unreferenced blobs younger than this are kept, since their report may still be saving.
+MEDIA_BLOB_GC_GRACE_SECONDS = int(os.getenv('MEDIA_BLOB_GC_GRACE_SECONDS', '3600'))
+
+# Offline technician syncs (reports/sync/) carry many photos in one request.
+DATA_UPLOAD_MAX_NUMBER_FILES = int(os.getenv('DATA_UPLOAD_MAX_NUMBER_FILES', '200'))
+# Largest request body accepted by the streaming upload endpoint (api/async_upload.py).
+REPORT_UPLOAD_MAX_BYTES = int(os.getenv('REPORT_UPLOAD_MAX_BYTES', str(25 * 1024 * 1024)))
+# Resumable uploads (reports/uploads/, api/uploads.py): largest chunk per PATCH, and how
+# long an idle upload is kept before `manage.py prune_report_uploads` removes it.
+REPORT_UPLOAD_CHUNK_MAX_BYTES = int(os.getenv('REPORT_UPLOAD_CHUNK_MAX_BYTES', str(8 * 1024 * 1024)))
+REPORT_UPLOAD_EXPIRY_HOURS = int(os.getenv('REPORT_UPLOAD_EXPIRY_HOURS', '24'))
+# Threads per process running report image analysis (api.tasks.enqueue_analysis).
+AI_ANALYSIS_WORKERS = int(os.getenv('AI_ANALYSIS_WORKERS', '2'))
+# Backpressure on new reports (api/admission.py). Depth counts reports with an image queued
+# in the last AI_BACKLOG_QUEUED_WINDOW_SECONDS; lag is the mean queue wait of analysis
+# runs finished in the last AI_BACKLOG_WINDOW_SECONDS. Past the DEFER thresholds reports
+# are stored but analysed later; past the REJECT thresholds they get 429 + Retry-After.
+# 0 disables a threshold.
+AI_BACKLOG_DEFER_SECONDS = int(os.getenv('AI_BACKLOG_DEFER_SECONDS', '120'))
+AI_BACKLOG_DEFER_DEPTH = int(os.getenv('AI_BACKLOG_DEFER_DEPTH', '200'))
+AI_BACKLOG_REJECT_SECONDS = int(os.getenv('AI_BACKLOG_REJECT_SECONDS', '900'))
+AI_BACKLOG_REJECT_DEPTH = int(os.getenv('AI_BACKLOG_REJECT_DEPTH', '5000'))
+AI_BACKLOG_RETRY_AFTER_SECONDS = int(os.getenv('AI_BACKLOG_RETRY_AFTER_SECONDS', '60'))
+AI_BACKLOG_WINDOW_SECONDS = int(os.getenv('AI_BACKLOG_WINDOW_SECONDS', '300'))
+AI_BACKLOG_QUEUED_WINDOW_SECONDS = int(os.getenv('AI_BACKLOG_QUEUED_WINDOW_SECONDS', '3600'))
+AI_BACKLOG_CACHE_SECONDS = int(os.getenv('AI_BACKLOG_CACHE_SECONDS', '5'))
+
+# Resolution analytics (stats/resolution/, api/analytics.py): results are cached
+# per distinct filter set for this long, so dashboards re-polling stay cheap.
+ANALYTICS_CACHE_SECONDS = int(os.getenv('ANALYTICS_CACHE_SECONDS', '300'))
+
+
+# Incident clustering: a new report joins an open incident if it lies within
+# INCIDENT_CLUSTER_RADIUS_M metres of it and the incident was last reported
+# within INCIDENT_CLUSTER_WINDOW_MINUTES. Set INCIDENT_IMAGE_HASH_MAX_DISTANCE
+# (0-64 bits) to additionally require visually similar images.
+INCIDENT_CLUSTER_RADIUS_M = float(os.getenv('INCIDENT_CLUSTER_RADIUS_M', '150'))
+INCIDENT_CLUSTER_WINDOW_MINUTES = int(os.getenv('INCIDENT_CLUSTER_WINDOW_MINUTES', '60'))
+INCIDENT_IMAGE_HASH_MAX_DISTANCE = int(os.getenv('INCIDENT_IMAGE_HASH_MAX_DISTANCE')) if os.getenv('INCIDENT_IMAGE_HASH_MAX_DISTANCE') else None
+
+# Suggestions whose estimated text similarity (MinHash, api/minhash.py) with an
+# earlier suggestion reaches this value join that suggestion's cluster.
+SUGGESTION_CLUSTER_SIMILARITY = float(os.getenv('SUGGESTION_CLUSTER_SIMILARITY', '0.5'))
+
+# Automatic technician assignment (api/assignment.py). A technician's score is
+# distance_km * DISTANCE_WEIGHT + open_reports * LOAD_WEIGHT, minus the
+# SPECIALIZATION_BONUS when their specialization matches the AI classification.
+AUTO_ASSIGN_DISTANCE_WEIGHT = float(os.getenv('AUTO_ASSIGN_DISTANCE_WEIGHT', '1.0'))
+AUTO_ASSIGN_LOAD_WEIGHT = float(os.getenv('AUTO_ASSIGN_LOAD_WEIGHT', '5.0'))
+AUTO_ASSIGN_SPECIALIZATION_BONUS = float(os.getenv('AUTO_ASSIGN_SPECIALIZATION_BONUS', '15.0'))
+AUTO_ASSIGN_UNKNOWN_DISTANCE_KM = float(os.getenv('AUTO_ASSIGN_UNKNOWN_DISTANCE_KM', '50'))
+AUTO_ASSIGN_MAX_OPEN_REPORTS = int(os.getenv('AUTO_ASSIGN_MAX_OPEN_REPORTS', '20'))
+
+# Route ordering of a technician's queue (api/routing.py, ?from=lat,lng).
+# Orderings are cached until the queue changes or the crew moves to a new
+# start point at ROUTE_START_PRECISION decimal places (3 is roughly 100 m).
+ROUTE_CACHE_TIMEOUT = int(os.getenv('ROUTE_CACHE_TIMEOUT', '3600'))
+ROUTE_START_PRECISION = int(os.getenv('ROUTE_START_PRECISION', '3'))
+ROUTE_2OPT_MAX_PASSES = int(os.getenv('ROUTE_2OPT_MAX_PASSES', '10'))
+
 
 # EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend' # Comment this out
 
@@ -172,4 +330,16 @@ EMAIL_HOST = 'smtp.gmail.com'
 EMAIL_PORT = 587
 EMAIL_USE_TLS = True
 EMAIL_HOST_USER = os.getenv('EMAIL_HOST_USER')
-EMAIL_HOST_PASSWORD = os.getenv('EMAIL_HOST_PASSWORD')
\ No newline at end of file
+EMAIL_HOST_PASSWORD = os.getenv('EMAIL_HOST_PASSWORD')
+EMAIL_TIMEOUT = int(os.getenv('EMAIL_TIMEOUT', '20'))
+DEFAULT_FROM_EMAIL = os.getenv('DEFAULT_FROM_EMAIL', 'noreply@urjasetu.com')
+
+# Email outbox (api/outbox.py). Requests queue rows; an in-process thread (or
+# `python manage.py send_outbox --loop` in its own process) sends them in
+# batches over one SMTP connection, retrying with exponential backoff.
+EMAIL_OUTBOX_SENDER_THREAD = os.getenv('EMAIL_OUTBOX_SENDER_THREAD', 'True') == 'True'
+EMAIL_OUTBOX_BATCH_SIZE = int(os.getenv('EMAIL_OUTBOX_BATCH_SIZE', '50'))
+EMAIL_OUTBOX_MAX_ATTEMPTS = int(os.getenv('EMAIL_OUTBOX_MAX_ATTEMPTS', '6'))
+EMAIL_OUTBOX_RETRY_BASE_SECONDS = int(os.getenv('EMAIL_OUTBOX_RETRY_BASE_SECONDS', '30'))
+EMAIL_OUTBOX_LEASE_SECONDS = int(os.getenv('EMAIL_OUTBOX_LEASE_SECONDS', '300'))
+EMAIL_OUTBOX_POLL_SECONDS = int(os.getenv('EMAIL_OUTBOX_POLL_SECONDS', '30'))
\ No newline at end of file
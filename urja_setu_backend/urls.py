@@ -1,10 +1,11 @@
 # urja_setu_backend/urls.py
 
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, re_path, include
 from django.conf import settings # <-- Add this import
-from django.conf.urls.static import static # <-- Add this import
 from drf_spectacular.views import SpectacularAPIView, SpectacularRedocView, SpectacularSwaggerView # <-- Add these imports
+from api.views import MediaServeView
+from api.metrics import metrics_view
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -16,7 +17,10 @@ urlpatterns = [
     # Optional UI:
     path('api/schema/swagger-ui/', SpectacularSwaggerView.as_view(url_name='schema'), name='swagger-ui'),
     path('api/schema/redoc/', SpectacularRedocView.as_view(url_name='schema'), name='redoc'),
-]
-# Add this line to serve media files in development
-if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
\ No newline at end of file
+
+    # Prometheus scrape endpoint (api/metrics.py).
+    path('metrics', metrics_view, name='metrics'),
+
+    # Report media, permission-checked (api/media.py). Offloaded to the front proxy when configured.
+    re_path(rf'^{settings.MEDIA_URL.lstrip("/")}(?P<name>.+)$', MediaServeView.as_view(), name='media'),
+]
\ No newline at end of file